@@ -5,6 +5,7 @@ Prevents unrealistic market movements and systemic risks
 """
 
 import asyncio
+import math
 import time
 import uuid
 from typing import Dict, List, Optional, Tuple, Set, Callable
@@ -13,9 +14,15 @@ from decimal import Decimal
 from enum import Enum
 import numpy as np
 from collections import defaultdict, deque
+from itertools import islice
 import logging
 from abc import ABC, abstractmethod
 
+try:
+    from .retention_store import RetentionStore, FLOAT
+except ImportError:  # Run as a script from inside compliance/
+    from retention_store import RetentionStore, FLOAT
+
 logger = logging.getLogger(__name__)
 
 class BreakType(Enum):
@@ -81,8 +88,119 @@ class HaltEvent:
     resolved_time: Optional[float] = None
     is_active: bool = True
 
+class WindowedSeries:
+    """
+    Time-windowed series with a running sum
+    Points arrive in timestamp order, so expiring the window only ever pops
+    from the left: the oldest retained point is the window's start value
+    """
+    
+    __slots__ = ("window_seconds", "max_points", "timestamps", "values", "total")
+    
+    def __init__(self, window_seconds: float, max_points: int):
+        self.window_seconds = window_seconds
+        self.max_points = max_points
+        self.timestamps: deque = deque()
+        self.values: deque = deque()
+        self.total = 0.0
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def append(self, value: float, timestamp: float) -> None:
+        self.timestamps.append(timestamp)
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.max_points:
+            self._pop()
+    
+    def evict(self, current_time: float) -> None:
+        """Drop points older than the window as of current_time"""
+        cutoff_time = current_time - self.window_seconds
+        timestamps = self.timestamps
+        while timestamps and timestamps[0] < cutoff_time:
+            self._pop()
+    
+    def _pop(self) -> None:
+        self.timestamps.popleft()
+        self.total -= self.values.popleft()
+        if not self.values:
+            self.total = 0.0  # Don't carry rounding residue into the next window
+
+class RollingVariance:
+    """
+    Rolling population variance of log returns over the last N prices
+    Welford updates on add and remove; the accumulators are recomputed from
+    the window once per window's worth of removals to bound float drift
+    """
+    
+    __slots__ = ("window_points", "returns", "count", "mean", "m2", "last_price", "_removals")
+    
+    def __init__(self, window_points: int):
+        self.window_points = window_points
+        self.returns: deque = deque()  # None where the previous price was not positive
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.last_price: Optional[float] = None
+        self._removals = 0
+    
+    def push(self, price: float) -> None:
+        previous = self.last_price
+        self.last_price = price
+        if previous is None:
+            return
+        
+        value = math.log(price / previous) if previous > 0 and price > 0 else None
+        self.returns.append(value)
+        if value is not None:
+            self._add(value)
+        
+        if len(self.returns) > self.window_points - 1:
+            expired = self.returns.popleft()
+            if expired is not None:
+                self._remove(expired)
+    
+    def std(self) -> Optional[float]:
+        if self.count < 2:
+            return None
+        return math.sqrt(max(self.m2, 0.0) / self.count)
+    
+    def _add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def _remove(self, value: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+        
+        self._removals += 1
+        if self._removals >= self.window_points:
+            self._resync()
+    
+    def _resync(self) -> None:
+        values = [value for value in self.returns if value is not None]
+        self.count = len(values)
+        self.mean = math.fsum(values) / self.count if values else 0.0
+        self.m2 = math.fsum((value - self.mean) ** 2 for value in values)
+        self._removals = 0
+
 class MarketDataTracker:
-    """Tracks market data for circuit breaker analysis"""
+    """
+    Tracks market data for circuit breaker analysis
+    Windowed statistics are maintained incrementally per (symbol, window) and
+    shared by every rule that asks for the same window; a window's state is
+    seeded from history the first time it is requested
+    """
     
     def __init__(self, max_history_points: int = 10000):
         self.max_history = max_history_points
@@ -95,71 +213,77 @@ class MarketDataTracker:
         self.volume_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_history_points))
         self.volume_timestamps: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_history_points))
         
-        # Trade tracking
-        self.trade_history: Dict[str, List] = defaultdict(list)
+        # Trade tracking (last hour per symbol)
+        self.trade_history = RetentionStore([("price", FLOAT), ("quantity", FLOAT)], retention_seconds=3600)
         
         # Market-wide metrics
         self.market_index_history: deque = deque(maxlen=max_history_points)
         self.market_timestamps: deque = deque(maxlen=max_history_points)
         
+        # Streaming window state: symbol -> window -> state
+        self._price_windows: Dict[str, Dict[int, WindowedSeries]] = defaultdict(dict)
+        self._volume_windows: Dict[str, Dict[int, WindowedSeries]] = defaultdict(dict)
+        self._volatility_windows: Dict[str, Dict[int, RollingVariance]] = defaultdict(dict)
+        
     def update_price(self, symbol: str, price: Decimal, timestamp: float = None) -> None:
         """Update price data for circuit breaker monitoring"""
         if timestamp is None:
             timestamp = time.time()
             
-        self.price_history[symbol].append(float(price))
+        price = float(price)
+        self.price_history[symbol].append(price)
         self.price_timestamps[symbol].append(timestamp)
+        
+        for window in self._price_windows[symbol].values():
+            window.append(price, timestamp)
+        for volatility in self._volatility_windows[symbol].values():
+            volatility.push(price)
     
     def update_volume(self, symbol: str, volume: Decimal, timestamp: float = None) -> None:
         """Update volume data"""
         if timestamp is None:
             timestamp = time.time()
             
-        self.volume_history[symbol].append(float(volume))
+        volume = float(volume)
+        self.volume_history[symbol].append(volume)
         self.volume_timestamps[symbol].append(timestamp)
+        
+        for window in self._volume_windows[symbol].values():
+            window.append(volume, timestamp)
     
     def record_trade(self, symbol: str, price: Decimal, quantity: Decimal, timestamp: float = None) -> None:
         """Record individual trade for analysis"""
         if timestamp is None:
             timestamp = time.time()
-            
-        trade_record = {
-            'price': float(price),
-            'quantity': float(quantity),
-            'timestamp': timestamp
-        }
         
-        # Keep only recent trades (last hour)
-        cutoff_time = timestamp - 3600
-        self.trade_history[symbol] = [
-            trade for trade in self.trade_history[symbol] 
-            if trade['timestamp'] > cutoff_time
-        ]
-        
-        self.trade_history[symbol].append(trade_record)
+        # Trades older than an hour expire with their bucket
+        self.trade_history.append(symbol, timestamp, price, quantity)
+    
+    def _window(self, windows: Dict[int, WindowedSeries], window_seconds: int,
+                values: deque, timestamps: deque) -> WindowedSeries:
+        """Get a shared time window, seeding it from history on first use"""
+        window = windows.get(window_seconds)
+        if window is None:
+            window = WindowedSeries(window_seconds, self.max_history)
+            for value, timestamp in zip(values, timestamps):
+                window.append(value, timestamp)
+            windows[window_seconds] = window
+        return window
     
     def get_price_change(self, symbol: str, window_seconds: int) -> Optional[float]:
         """Calculate price change over specified window"""
         if symbol not in self.price_history or len(self.price_history[symbol]) < 2:
             return None
         
-        current_time = time.time()
-        cutoff_time = current_time - window_seconds
+        window = self._window(self._price_windows[symbol], window_seconds,
+                              self.price_history[symbol], self.price_timestamps[symbol])
+        window.evict(time.time())
         
-        prices = list(self.price_history[symbol])
-        timestamps = list(self.price_timestamps[symbol])
-        
-        # Find prices within the window
-        recent_prices = []
-        for i, ts in enumerate(timestamps):
-            if ts >= cutoff_time:
-                recent_prices.append(prices[i])
-        
-        if len(recent_prices) < 2:
+        if len(window) < 2:
             return None
         
-        start_price = recent_prices[0]
-        current_price = recent_prices[-1]
+        start_price = window.values[0]
+        current_price = window.values[-1]
         
         if start_price > 0:
             return (current_price - start_price) / start_price
@@ -171,41 +295,33 @@ class MarketDataTracker:
         if symbol not in self.price_history or len(self.price_history[symbol]) < window_points:
             return None
         
-        prices = list(self.price_history[symbol])[-window_points:]
-        
-        # Calculate log returns
-        returns = []
-        for i in range(1, len(prices)):
-            if prices[i-1] > 0:
-                returns.append(np.log(prices[i] / prices[i-1]))
-        
-        if len(returns) < 2:
-            return None
+        volatility = self._volatility_windows[symbol].get(window_points)
+        if volatility is None:
+            volatility = RollingVariance(window_points)
+            history = self.price_history[symbol]
+            for price in islice(history, len(history) - window_points, None):
+                volatility.push(price)
+            self._volatility_windows[symbol][window_points] = volatility
         
-        return float(np.std(returns))
+        return volatility.std()
     
     def get_volume_ratio(self, symbol: str, window_seconds: int) -> Optional[float]:
         """Calculate volume ratio compared to historical average"""
         if symbol not in self.volume_history:
             return None
         
-        current_time = time.time()
-        cutoff_time = current_time - window_seconds
-        
-        volumes = list(self.volume_history[symbol])
-        timestamps = list(self.volume_timestamps[symbol])
-        
         # Recent volume
-        recent_volume = 0
-        for i, ts in enumerate(timestamps):
-            if ts >= cutoff_time:
-                recent_volume += volumes[i]
+        window = self._window(self._volume_windows[symbol], window_seconds,
+                              self.volume_history[symbol], self.volume_timestamps[symbol])
+        window.evict(time.time())
+        recent_volume = window.total
         
         # Historical average (last 30 periods)
+        volumes = self.volume_history[symbol]
         if len(volumes) < 30:
             return None
         
-        historical_avg = sum(volumes[-30:]) / 30
+        historical_avg = sum(islice(reversed(volumes), 30)) / 30
         
         if historical_avg > 0:
             return recent_volume / historical_avg
@@ -289,12 +405,8 @@ class CircuitBreakerAnalyzer:
         if symbol not in self.data_tracker.trade_history:
             return None
         
-        recent_trades = self.data_tracker.trade_history[symbol]
-        if len(recent_trades) < 2:
-            return None
-        
         # Look for trades that are significantly outside normal range
-        prices = [trade['price'] for trade in recent_trades[-20:]]  # Last 20 trades
+        prices = self.data_tracker.trade_history.column(symbol, "price", last=20)  # Last 20 trades
         
         if len(prices) < 10:
             return None
@@ -302,7 +414,7 @@ class CircuitBreakerAnalyzer:
         # Calculate price statistics
         mean_price = np.mean(prices[:-1])  # Exclude latest trade
         std_price = np.std(prices[:-1])
-        latest_price = prices[-1]
+        latest_price = float(prices[-1])
         
         # Check if latest trade is more than 5 standard deviations away
         if std_price > 0:
@@ -322,6 +434,9 @@ class CircuitBreakerAnalyzer:
 class CircuitBreakerSystem:
     """
     Main circuit breaker system managing all market protection rules
+    Rules are compiled into a dispatch index (global rules plus per-symbol
+    rules, each bound to its checker) that is rebuilt only when rules are
+    added, removed, toggled, exhausted for the day or the daily counts reset
     """
     
     def __init__(self):
@@ -345,21 +460,82 @@ class CircuitBreakerSystem:
         self.false_positive_count = 0
         self.system_uptime_start = time.time()
         
+        # Rule dispatch index: break types without a checker are never dispatched
+        self._checkers: Dict[BreakType, Callable] = {
+            BreakType.PRICE_LIMIT: self.analyzer.check_price_limit_trigger,
+            BreakType.VOLATILITY: self.analyzer.check_volatility_trigger,
+            BreakType.VOLUME_SPIKE: self.analyzer.check_volume_spike_trigger,
+            BreakType.ERROR_TRADE: self.analyzer.check_error_trade_trigger,
+        }
+        self._global_rules: List[Tuple[int, CircuitBreakerRule, Callable]] = []
+        self._symbol_rules: Dict[str, List[Tuple[int, CircuitBreakerRule, Callable]]] = defaultdict(list)
+        self._dispatch: Dict[str, List[Tuple[int, CircuitBreakerRule, Callable]]] = {}
+        self._index_dirty = True
+        
         logger.info("Circuit Breaker System initialized")
     
     def add_rule(self, rule: CircuitBreakerRule) -> None:
         """Add a new circuit breaker rule"""
         self.rules[rule.rule_id] = rule
+        self._index_dirty = True
         logger.info(f"Added circuit breaker rule: {rule.rule_id} ({rule.break_type.value})")
     
     def remove_rule(self, rule_id: str) -> bool:
         """Remove a circuit breaker rule"""
         if rule_id in self.rules:
             del self.rules[rule_id]
+            self._index_dirty = True
             logger.info(f"Removed circuit breaker rule: {rule_id}")
             return True
         return False
     
+    def set_rule_active(self, rule_id: str, is_active: bool) -> bool:
+        """Enable or disable a rule (use this rather than setting rule.is_active directly)"""
+        rule = self.rules.get(rule_id)
+        if rule is None:
+            return False
+        rule.is_active = is_active
+        self._index_dirty = True
+        return True
+    
+    def reset_daily_counts(self) -> None:
+        """Start a new trading day: clear trigger counts and re-admit exhausted rules"""
+        self.daily_trigger_counts.clear()
+        self._index_dirty = True
+    
+    def _compile_rules(self) -> None:
+        """Rebuild the dispatch index from the active, non-exhausted rules"""
+        self._global_rules = []
+        self._symbol_rules = defaultdict(list)
+        self._dispatch = {}
+        
+        for sequence, rule in enumerate(self.rules.values()):
+            checker = self._checkers.get(rule.break_type)
+            if checker is None or not rule.is_active:
+                continue
+            if self.daily_trigger_counts[rule.rule_id] >= rule.max_triggers_per_day:
+                continue
+            
+            entry = (sequence, rule, checker)
+            if rule.symbol is None:
+                self._global_rules.append(entry)
+            else:
+                self._symbol_rules[rule.symbol].append(entry)
+        
+        self._index_dirty = False
+    
+    def _rules_for(self, symbol: str) -> List[Tuple[int, CircuitBreakerRule, Callable]]:
+        """Global and symbol rules for a symbol, in the order they were added"""
+        if self._index_dirty:
+            self._compile_rules()
+        
+        rules = self._dispatch.get(symbol)
+        if rules is None:
+            symbol_rules = self._symbol_rules.get(symbol)
+            rules = sorted(self._global_rules + symbol_rules) if symbol_rules else self._global_rules
+            self._dispatch[symbol] = rules
+        return rules
+    
     def register_halt_callback(self, callback: Callable) -> None:
         """Register callback for when trading is halted"""
         self.halt_callbacks.append(callback)
@@ -406,29 +582,9 @@ class CircuitBreakerSystem:
     async def _check_circuit_breaker_rules(self, symbol: str) -> None:
         """Check all circuit breaker rules for a symbol"""
         
-        for rule in self.rules.values():
-            if not rule.is_active:
-                continue
-            
-            # Skip if rule is symbol-specific and doesn't match
-            if rule.symbol is not None and rule.symbol != symbol:
-                continue
-            
-            # Check daily trigger limit
-            if self.daily_trigger_counts[rule.rule_id] >= rule.max_triggers_per_day:
-                continue
-            
-            # Check specific trigger conditions
-            trigger_data = None
-            
-            if rule.break_type == BreakType.PRICE_LIMIT:
-                trigger_data = self.analyzer.check_price_limit_trigger(rule, symbol)
-            elif rule.break_type == BreakType.VOLATILITY:
-                trigger_data = self.analyzer.check_volatility_trigger(rule, symbol)
-            elif rule.break_type == BreakType.VOLUME_SPIKE:
-                trigger_data = self.analyzer.check_volume_spike_trigger(rule, symbol)
-            elif rule.break_type == BreakType.ERROR_TRADE:
-                trigger_data = self.analyzer.check_error_trade_trigger(rule, symbol)
+        # A trigger may mark the index dirty mid-loop; this pass keeps its snapshot
+        for _, rule, checker in self._rules_for(symbol):
+            trigger_data = checker(rule, symbol)
             
             # Trigger circuit breaker if conditions are met
             if trigger_data and trigger_data.get('trigger_met'):
@@ -458,6 +614,10 @@ class CircuitBreakerSystem:
         self.total_halts_triggered += 1
         self.daily_trigger_counts[rule.rule_id] += 1
         
+        # Drop the rule from dispatch until the daily reset once it is exhausted
+        if self.daily_trigger_counts[rule.rule_id] >= rule.max_triggers_per_day:
+            self._index_dirty = True
+        
         # Notify external systems
         for callback in self.halt_callbacks:
             try:
@@ -14,6 +14,12 @@ from enum import Enum
 import json
 import logging
 from abc import ABC, abstractmethod
+import numpy as np
+
+try:
+    from .retention_store import RetentionStore, FLOAT, CATEGORY, OBJECT
+except ImportError:  # Run as a script from inside compliance/
+    from retention_store import RetentionStore, FLOAT, CATEGORY, OBJECT
 
 logger = logging.getLogger(__name__)
 
@@ -117,141 +123,195 @@ class TradingBehaviorAnalyzer:
     """Analyzes AI agent trading behavior for compliance violations"""
     
     def __init__(self):
-        self.trade_history: Dict[str, List] = {}  # agent_id -> trades
-        self.order_history: Dict[str, List] = {}  # agent_id -> orders
+        # agent_id -> trades (last 30 days)
+        self.trade_history = RetentionStore([
+            ('symbol', CATEGORY),
+            ('side', CATEGORY),
+            ('quantity', FLOAT),
+            ('price', FLOAT),
+            ('order_id', OBJECT)
+        ], retention_seconds=30 * 24 * 3600)
+        
+        # agent_id -> orders (last 7 days)
+        self.order_history = RetentionStore([
+            ('order_id', OBJECT),
+            ('symbol', CATEGORY),
+            ('side', CATEGORY),
+            ('quantity', FLOAT),
+            ('price', FLOAT),
+            ('order_type', CATEGORY),
+            ('status', CATEGORY)
+        ], retention_seconds=7 * 24 * 3600)
+        
         self.position_history: Dict[str, List] = {}  # agent_id -> positions
         
     def record_trade(self, agent_id: str, trade_data: Dict) -> None:
         """Record a trade for compliance analysis"""
-        if agent_id not in self.trade_history:
-            self.trade_history[agent_id] = []
-        
-        trade_record = {
-            'timestamp': time.time(),
-            'symbol': trade_data.get('symbol'),
-            'side': trade_data.get('side'),
-            'quantity': float(trade_data.get('quantity', 0)),
-            'price': float(trade_data.get('price', 0)),
-            'order_id': trade_data.get('order_id')
-        }
-        
-        self.trade_history[agent_id].append(trade_record)
-        
-        # Keep only recent history (last 30 days)
-        cutoff_time = time.time() - (30 * 24 * 3600)
-        self.trade_history[agent_id] = [
-            trade for trade in self.trade_history[agent_id]
-            if trade['timestamp'] > cutoff_time
-        ]
+        self.trade_history.append(
+            agent_id,
+            time.time(),
+            trade_data.get('symbol'),
+            trade_data.get('side'),
+            trade_data.get('quantity', 0),
+            trade_data.get('price', 0),
+            trade_data.get('order_id')
+        )
     
     def record_order(self, agent_id: str, order_data: Dict) -> None:
         """Record an order for compliance analysis"""
-        if agent_id not in self.order_history:
-            self.order_history[agent_id] = []
-        
-        order_record = {
-            'timestamp': time.time(),
-            'order_id': order_data.get('order_id'),
-            'symbol': order_data.get('symbol'),
-            'side': order_data.get('side'),
-            'quantity': float(order_data.get('quantity', 0)),
-            'price': float(order_data.get('price', 0)),
-            'order_type': order_data.get('order_type'),
-            'status': order_data.get('status', 'pending')
-        }
-        
-        self.order_history[agent_id].append(order_record)
-        
-        # Keep only recent history
-        cutoff_time = time.time() - (7 * 24 * 3600)  # 7 days for orders
-        self.order_history[agent_id] = [
-            order for order in self.order_history[agent_id]
-            if order['timestamp'] > cutoff_time
+        self.order_history.append(
+            agent_id,
+            time.time(),
+            order_data.get('order_id'),
+            order_data.get('symbol'),
+            order_data.get('side'),
+            order_data.get('quantity', 0),
+            order_data.get('price', 0),
+            order_data.get('order_type'),
+            order_data.get('status', 'pending')
+        )
+    
+    def _gather(self, store: RetentionStore, since: float,
+                agents: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """Concatenate every agent's columns since a cutoff, tagging rows with an agent index"""
+        keys = store.keys() if agents is None else [agent for agent in agents if agent in store]
+        per_agent = [store.columns(key, since) for key in keys]
+        lengths = [len(columns['timestamp']) for columns in per_agent]
+        
+        columns = {}
+        for name in ['timestamp'] + store.field_names:
+            parts = [agent_columns[name] for agent_columns in per_agent]
+            columns[name] = np.concatenate(parts) if parts else np.empty(0)
+        
+        agent_index = np.repeat(np.arange(len(keys)), lengths)
+        return keys, agent_index, columns
+    
+    def detect_wash_trading_batch(self, window_seconds: int = 3600, current_time: Optional[float] = None,
+                                  since: Optional[float] = None,
+                                  agents: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Detect buy-sell-buy-sell runs within 5 minutes for all agents at once
+        Trades are ordered by (agent, symbol, arrival) and the pattern is
+        matched over shifted side arrays. With since, only runs completed
+        after that time are reported
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        store = self.trade_history
+        buy, sell = store.code_for('buy'), store.code_for('sell')
+        if buy is None or sell is None:
+            return {}
+        
+        keys, agent_index, columns = self._gather(store, current_time - window_seconds, agents)
+        if len(agent_index) < 4:
+            return {}
+        
+        # lexsort is stable, so trades keep arrival order within each (agent, symbol)
+        order = np.lexsort((columns['symbol'], agent_index))
+        agents_sorted = agent_index[order]
+        symbols = columns['symbol'][order]
+        sides = columns['side'][order]
+        timestamps = columns['timestamp'][order]
+        
+        # Rows i and i+3 in the same group means the whole run is in that group
+        same_group = (agents_sorted[:-3] == agents_sorted[3:]) & (symbols[:-3] == symbols[3:])
+        pattern = ((sides[:-3] == buy) & (sides[1:-2] == sell) &
+                   (sides[2:-1] == buy) & (sides[3:] == sell))
+        time_span = timestamps[3:] - timestamps[:-3]
+        hits = same_group & pattern & (time_span < 300)
+        if since is not None:
+            hits &= timestamps[3:] > since
+        
+        violations: Dict[str, List[Dict]] = {}
+        for i in np.flatnonzero(hits):
+            rows = order[i:i + 4]
+            violations.setdefault(keys[agents_sorted[i]], []).append({
+                'type': 'wash_trading',
+                'symbol': store.labels(symbols[i:i + 1])[0],
+                'trades': self._trade_rows(columns, rows),
+                'time_span': float(time_span[i])
+            })
+        return violations
+    
+    def _trade_rows(self, columns: Dict[str, np.ndarray], rows: np.ndarray) -> List[Dict]:
+        """Rebuild trade record dicts for selected rows"""
+        store = self.trade_history
+        symbols = store.labels(columns['symbol'][rows])
+        sides = store.labels(columns['side'][rows])
+        return [
+            {
+                'timestamp': float(columns['timestamp'][row]),
+                'symbol': symbols[j],
+                'side': sides[j],
+                'quantity': float(columns['quantity'][row]),
+                'price': float(columns['price'][row]),
+                'order_id': columns['order_id'][row]
+            }
+            for j, row in enumerate(rows)
         ]
     
+    def detect_layering_batch(self, current_time: Optional[float] = None,
+                              since: Optional[float] = None,
+                              agents: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Flag (agent, symbol) pairs with over 20 orders in the last hour and >80% cancelled
+        With since, pairs that were already flagged as of that time are not
+        reported again, so an ongoing pattern is reported once
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        store = self.order_history
+        window_start = current_time - 3600
+        gather_from = window_start if since is None else min(window_start, since - 3600)
+        keys, agent_index, columns = self._gather(store, gather_from, agents)
+        if len(agent_index) == 0:
+            return {}
+        
+        # Group rows per (agent, symbol) with one pass
+        symbols = columns['symbol']
+        group_keys = agent_index * (int(symbols.max()) + 1) + symbols
+        groups, first_rows, group_of_row = np.unique(group_keys, return_index=True, return_inverse=True)
+        cancel_code = store.code_for('cancelled')
+        cancelled = (columns['status'] == cancel_code) if cancel_code is not None else np.zeros(len(symbols), bool)
+        
+        timestamps = columns['timestamp']
+        counts, cancel_ratios, flagged = self._layering_flags(
+            group_of_row, len(groups), cancelled, timestamps > window_start
+        )
+        if since is not None:
+            flagged &= ~self._layering_flags(
+                group_of_row, len(groups), cancelled, (timestamps > since - 3600) & (timestamps <= since)
+            )[2]
+        
+        violations: Dict[str, List[Dict]] = {}
+        for g in np.flatnonzero(flagged):
+            row = first_rows[g]
+            violations.setdefault(keys[agent_index[row]], []).append({
+                'type': 'layering',
+                'symbol': store.labels(symbols[row:row + 1])[0],
+                'order_count': int(counts[g]),
+                'cancel_ratio': float(cancel_ratios[g])
+            })
+        return violations
+    
+    @staticmethod
+    def _layering_flags(group_of_row: np.ndarray, group_count: int, cancelled: np.ndarray,
+                        in_window: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-group order counts, cancel ratios and layering flags over the rows in a window"""
+        counts = np.bincount(group_of_row, weights=in_window, minlength=group_count)
+        cancel_counts = np.bincount(group_of_row, weights=cancelled & in_window, minlength=group_count)
+        cancel_ratios = np.divide(cancel_counts, counts, out=np.zeros(group_count), where=counts > 0)
+        return counts, cancel_ratios, (counts > 20) & (cancel_ratios > 0.8)
+    
     def detect_wash_trading(self, agent_id: str, window_seconds: int = 3600) -> List[Dict]:
         """Detect potential wash trading patterns"""
-        if agent_id not in self.trade_history:
-            return []
-        
-        trades = self.trade_history[agent_id]
-        current_time = time.time()
-        cutoff_time = current_time - window_seconds
-        
-        # Get recent trades
-        recent_trades = [t for t in trades if t['timestamp'] > cutoff_time]
-        
-        violations = []
-        
-        # Look for rapid buy/sell patterns in same instrument
-        by_symbol = {}
-        for trade in recent_trades:
-            symbol = trade['symbol']
-            if symbol not in by_symbol:
-                by_symbol[symbol] = []
-            by_symbol[symbol].append(trade)
-        
-        for symbol, symbol_trades in by_symbol.items():
-            if len(symbol_trades) < 4:  # Need at least 4 trades
-                continue
-            
-            # Look for alternating buy/sell pattern
-            for i in range(len(symbol_trades) - 3):
-                trades_subset = symbol_trades[i:i+4]
-                
-                # Check if it's buy-sell-buy-sell pattern within short time
-                if (trades_subset[0]['side'] == 'buy' and
-                    trades_subset[1]['side'] == 'sell' and
-                    trades_subset[2]['side'] == 'buy' and
-                    trades_subset[3]['side'] == 'sell'):
-                    
-                    time_span = trades_subset[3]['timestamp'] - trades_subset[0]['timestamp']
-                    
-                    if time_span < 300:  # Within 5 minutes
-                        violations.append({
-                            'type': 'wash_trading',
-                            'symbol': symbol,
-                            'trades': trades_subset,
-                            'time_span': time_span
-                        })
-        
-        return violations
+        return self.detect_wash_trading_batch(window_seconds, agents=[agent_id]).get(agent_id, [])
     
     def detect_layering(self, agent_id: str) -> List[Dict]:
         """Detect layering/spoofing patterns"""
-        if agent_id not in self.order_history:
-            return []
-        
-        orders = self.order_history[agent_id]
-        violations = []
-        
-        # Group orders by symbol
-        by_symbol = {}
-        for order in orders:
-            symbol = order['symbol']
-            if symbol not in by_symbol:
-                by_symbol[symbol] = []
-            by_symbol[symbol].append(order)
-        
-        for symbol, symbol_orders in by_symbol.items():
-            # Look for pattern: many orders on one side, then cancellation, then trade on other side
-            symbol_orders.sort(key=lambda x: x['timestamp'])
-            
-            # Analyze order patterns (simplified detection)
-            recent_orders = [o for o in symbol_orders if time.time() - o['timestamp'] < 3600]
-            
-            if len(recent_orders) > 20:  # High order frequency
-                cancel_ratio = len([o for o in recent_orders if o['status'] == 'cancelled']) / len(recent_orders)
-                
-                if cancel_ratio > 0.8:  # High cancellation ratio
-                    violations.append({
-                        'type': 'layering',
-                        'symbol': symbol,
-                        'order_count': len(recent_orders),
-                        'cancel_ratio': cancel_ratio
-                    })
-        
-        return violations
+        return self.detect_layering_batch(agents=[agent_id]).get(agent_id, [])
     
     def check_position_concentration(self, agent_id: str, total_market_cap: Dict[str, Decimal]) -> List[Dict]:
         """Check if agent has excessive concentration in any instrument"""
@@ -298,6 +358,11 @@ class RegulatoryComplianceEngine:
         self.violations_detected = 0
         self.false_positives = 0
         
+        # Scheduled batch surveillance (replaces per-trade wash/layering checks while running)
+        self.surveillance_interval = 60.0
+        self._surveillance_task: Optional[asyncio.Task] = None
+        self._last_surveillance_time: Optional[float] = None
+        
         logger.info("Regulatory Compliance Engine initialized")
     
     def add_compliance_rule(self, rule: ComplianceRule) -> None:
@@ -454,8 +519,35 @@ class RegulatoryComplianceEngine:
     async def _run_behavioral_analysis(self, agent_id: str) -> None:
         """Run behavioral analysis to detect violations"""
         
+        # Wash trading and layering run in batch on a schedule when surveillance is started
+        if self._surveillance_task is None:
+            wash_violations = self.behavior_analyzer.detect_wash_trading(agent_id)
+            layering_violations = self.behavior_analyzer.detect_layering(agent_id)
+            await self._record_manipulation_violations(agent_id, wash_violations, layering_violations)
+        
+        # Check position concentration
+        # Mock total market cap data
+        mock_market_caps = {
+            'BTC/USD': Decimal('1000000000'),  # $1B market
+            'ETH/USD': Decimal('500000000')    # $500M market
+        }
+        
+        concentration_violations = self.behavior_analyzer.check_position_concentration(agent_id, mock_market_caps)
+        for violation in concentration_violations:
+            await self._record_violation(
+                agent_id,
+                "position_concentration",
+                RegulationType.POSITION_LIMITS,
+                ViolationSeverity.MEDIUM,
+                "Excessive position concentration",
+                violation
+            )
+    
+    async def _record_manipulation_violations(self, agent_id: str, wash_violations: List[Dict],
+                                              layering_violations: List[Dict]) -> None:
+        """Record wash trading and layering findings for an agent"""
+        
         # Check for wash trading
-        wash_violations = self.behavior_analyzer.detect_wash_trading(agent_id)
         for violation in wash_violations:
             await self._record_violation(
                 agent_id, 
@@ -467,7 +559,6 @@ class RegulatoryComplianceEngine:
             )
         
         # Check for layering
-        layering_violations = self.behavior_analyzer.detect_layering(agent_id)
         for violation in layering_violations:
             await self._record_violation(
                 agent_id,
@@ -477,24 +568,52 @@ class RegulatoryComplianceEngine:
                 "Potential layering/spoofing detected",
                 violation
             )
-        
-        # Check position concentration
-        # Mock total market cap data
-        mock_market_caps = {
-            'BTC/USD': Decimal('1000000000'),  # $1B market
-            'ETH/USD': Decimal('500000000')    # $500M market
-        }
-        
-        concentration_violations = self.behavior_analyzer.check_position_concentration(agent_id, mock_market_caps)
-        for violation in concentration_violations:
-            await self._record_violation(
-                agent_id,
-                "position_concentration",
-                RegulationType.POSITION_LIMITS,
-                ViolationSeverity.MEDIUM,
-                "Excessive position concentration",
-                violation
-            )
+    
+    async def run_surveillance(self, current_time: Optional[float] = None) -> int:
+        """
+        Run wash trading and layering detection across all agents in one pass
+        Wash trading runs and layering patterns already reported by an
+        earlier pass are skipped
+        Returns the number of violations recorded
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        analyzer = self.behavior_analyzer
+        wash = analyzer.detect_wash_trading_batch(current_time=current_time, since=self._last_surveillance_time)
+        layering = analyzer.detect_layering_batch(current_time=current_time, since=self._last_surveillance_time)
+        self._last_surveillance_time = current_time
+        
+        for agent_id in set(wash) | set(layering):
+            await self._record_manipulation_violations(agent_id, wash.get(agent_id, []), layering.get(agent_id, []))
+        
+        return sum(map(len, wash.values())) + sum(map(len, layering.values()))
+    
+    async def _surveillance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.surveillance_interval)
+            try:
+                await self.run_surveillance()
+            except Exception as e:
+                logger.error(f"Error in batch surveillance: {e}")
+    
+    def start_surveillance(self, interval: Optional[float] = None) -> None:
+        """Run batch surveillance on a schedule instead of after every trade"""
+        if interval is not None:
+            self.surveillance_interval = interval
+        if self._surveillance_task is None:
+            self._surveillance_task = asyncio.create_task(self._surveillance_loop())
+    
+    async def stop_surveillance(self) -> None:
+        """Stop scheduled surveillance and fall back to per-trade checks"""
+        if self._surveillance_task is None:
+            return
+        self._surveillance_task.cancel()
+        try:
+            await self._surveillance_task
+        except asyncio.CancelledError:
+            pass
+        self._surveillance_task = None
     
     async def _record_violation(self, agent_id: str, rule_id: str, violation_type: RegulationType, severity: ViolationSeverity, description: str, evidence: Dict) -> None:
         """Record a compliance violation"""
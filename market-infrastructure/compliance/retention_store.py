@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Time-Bucketed Retention Store
+Shared record history for surveillance and circuit breaker recorders
+"""
+
+import bisect
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Field kinds
+FLOAT = "f"     # Stored as C doubles
+CATEGORY = "c"  # Low-cardinality values stored as interned int codes
+OBJECT = "o"    # Arbitrary Python objects (ids and the like)
+
+class RetentionStore:
+    """
+    Per-key record history with time-based retention
+    Records are appended into fixed-width time buckets of compact columns;
+    retention drops whole buckets from the front, so keeping a rolling window
+    costs O(1) amortised per record instead of rebuilding the history. Reads
+    trim the partially expired front bucket so the window stays exact
+    """
+    
+    def __init__(self, fields: Iterable[Tuple[str, str]], retention_seconds: float,
+                 bucket_seconds: Optional[float] = None):
+        self.fields = list(fields)
+        self.field_names = [name for name, _ in self.fields]
+        self.field_index = {name: i for i, name in enumerate(self.field_names)}
+        self.retention_seconds = retention_seconds
+        self.bucket_seconds = bucket_seconds or max(retention_seconds / 64, 1.0)
+        
+        # key -> deque of buckets; a bucket is [bucket index, timestamps, *columns]
+        self._buckets: Dict[Any, deque] = {}
+        self._cutoffs: Dict[Any, float] = {}
+        
+        # Shared category interning
+        self._codes: Dict[Any, int] = {}
+        self._labels: List[Any] = []
+    
+    def __contains__(self, key) -> bool:
+        return key in self._buckets
+    
+    def keys(self) -> List:
+        return list(self._buckets)
+    
+    def _code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._labels)
+            self._codes[value] = code
+            self._labels.append(value)
+        return code
+    
+    def code_for(self, value) -> Optional[int]:
+        """Category code for a value, or None if it was never recorded"""
+        return self._codes.get(value)
+    
+    def _new_bucket(self, bucket_index: int) -> list:
+        bucket = [bucket_index, array('d')]
+        for _, kind in self.fields:
+            if kind == FLOAT:
+                bucket.append(array('d'))
+            elif kind == CATEGORY:
+                bucket.append(array('q'))
+            else:
+                bucket.append([])
+        return bucket
+    
+    def append(self, key, timestamp: float, *values) -> None:
+        """Append a record (values in field order) and expire old buckets for the key"""
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = deque()
+            self._buckets[key] = buckets
+        
+        bucket_index = int(timestamp // self.bucket_seconds)
+        if not buckets or buckets[-1][0] < bucket_index:
+            buckets.append(self._new_bucket(bucket_index))
+        bucket = buckets[-1]
+        
+        bucket[1].append(timestamp)
+        for i, (_, kind) in enumerate(self.fields):
+            value = values[i]
+            if kind == FLOAT:
+                bucket[i + 2].append(float(value))
+            elif kind == CATEGORY:
+                bucket[i + 2].append(self._code(value))
+            else:
+                bucket[i + 2].append(value)
+        
+        self.expire(key, timestamp)
+    
+    def expire(self, key, current_time: float) -> None:
+        """Apply retention as of current_time, dropping fully expired buckets"""
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            return
+        
+        cutoff_time = current_time - self.retention_seconds
+        if cutoff_time > self._cutoffs.get(key, float('-inf')):
+            self._cutoffs[key] = cutoff_time
+        
+        # A bucket is fully expired once its last record is at or before the cutoff
+        while buckets and buckets[0][1][-1] <= cutoff_time:
+            buckets.popleft()
+    
+    def _segments(self, key, since: Optional[float] = None) -> List[Tuple[list, int]]:
+        """(bucket, first live row) pairs, oldest first"""
+        buckets = self._buckets.get(key)
+        if not buckets:
+            return []
+        
+        cutoff_time = self._cutoffs.get(key, float('-inf'))
+        if since is not None and since > cutoff_time:
+            cutoff_time = since
+        
+        segments = []
+        for bucket in buckets:
+            timestamps = bucket[1]
+            if timestamps[-1] <= cutoff_time:
+                continue
+            start = bisect.bisect_right(timestamps, cutoff_time) if timestamps[0] <= cutoff_time else 0
+            segments.append((bucket, start))
+        return segments
+    
+    def count(self, key, since: Optional[float] = None) -> int:
+        """Number of retained records for a key (optionally only those after since)"""
+        return sum(len(bucket[1]) - start for bucket, start in self._segments(key, since))
+    
+    def column(self, key, field: str, since: Optional[float] = None,
+               last: Optional[int] = None) -> np.ndarray:
+        """One field (or "timestamp") as a chronological array; categories come back as codes"""
+        if field == "timestamp":
+            position, dtype = 1, np.float64
+        else:
+            i = self.field_index[field]
+            position = i + 2
+            dtype = {FLOAT: np.float64, CATEGORY: np.int64, OBJECT: object}[self.fields[i][1]]
+        
+        # Walk back from the newest bucket so tail reads stay O(last)
+        parts = []
+        remaining = last
+        for bucket, start in reversed(self._segments(key, since)):
+            values = bucket[position]
+            if remaining is not None:
+                start = max(start, len(values) - remaining)
+                remaining -= len(values) - start
+            
+            # Slices are copies, so live buckets never export their buffers
+            if dtype is object:
+                parts.append(np.array(values[start:], dtype=object))
+            else:
+                parts.append(np.frombuffer(values[start:], dtype=dtype))
+            
+            if remaining is not None and remaining <= 0:
+                break
+        
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(parts[::-1])
+    
+    def columns(self, key, since: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """All fields plus "timestamp" as chronological arrays"""
+        names = ["timestamp"] + self.field_names
+        return {name: self.column(key, name, since) for name in names}
+    
+    def labels(self, codes: np.ndarray) -> List:
+        """Decode category codes back to their values"""
+        return [self._labels[code] for code in codes]
+    
+    def records(self, key, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Retained records for a key as dicts, oldest first"""
+        rows = []
+        for bucket, start in self._segments(key, since):
+            columns = [bucket[1]] + bucket[2:]
+            for row in range(start, len(bucket[1])):
+                record = {"timestamp": columns[0][row]}
+                for i, (name, kind) in enumerate(self.fields):
+                    value = columns[i + 1][row]
+                    record[name] = self._labels[value] if kind == CATEGORY else value
+                rows.append(record)
+        return rows
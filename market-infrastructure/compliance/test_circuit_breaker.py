@@ -0,0 +1,225 @@
+"""
+Test Suite for the Circuit Breaker System
+Covers the streaming market data statistics and the rule dispatch index
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import types
+import unittest
+from decimal import Decimal
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from circuit_breaker import (
+    MarketDataTracker, CircuitBreakerSystem, CircuitBreakerRule, BreakType
+)
+
+def reference_price_change(tracker: MarketDataTracker, symbol: str, window_seconds: int):
+    """Price change recomputed from the full history"""
+    cutoff_time = time.time() - window_seconds
+    prices = [price for price, timestamp in zip(tracker.price_history[symbol], tracker.price_timestamps[symbol])
+              if timestamp >= cutoff_time]
+    if len(prices) < 2 or prices[0] <= 0:
+        return None
+    return (prices[-1] - prices[0]) / prices[0]
+
+def reference_volatility(tracker: MarketDataTracker, symbol: str, window_points: int):
+    """Population std of log returns over the last window_points prices"""
+    prices = list(tracker.price_history[symbol])
+    if len(prices) < window_points:
+        return None
+    prices = prices[-window_points:]
+    returns = [np.log(prices[i] / prices[i - 1]) for i in range(1, len(prices)) if prices[i - 1] > 0]
+    return float(np.std(returns)) if len(returns) >= 2 else None
+
+def reference_volume_ratio(tracker: MarketDataTracker, symbol: str, window_seconds: int):
+    """Windowed volume over the average of the last 30 volumes"""
+    cutoff_time = time.time() - window_seconds
+    volumes = list(tracker.volume_history[symbol])
+    recent = sum(volume for volume, timestamp in zip(volumes, tracker.volume_timestamps[symbol])
+                 if timestamp >= cutoff_time)
+    if len(volumes) < 30:
+        return None
+    average = sum(volumes[-30:]) / 30
+    return recent / average if average > 0 else None
+
+async def linear_rule_check(system: CircuitBreakerSystem, symbol: str) -> None:
+    """Rule evaluation as it ran before the dispatch index: filter every rule on every update"""
+    for rule in system.rules.values():
+        if not rule.is_active:
+            continue
+        if rule.symbol is not None and rule.symbol != symbol:
+            continue
+        if system.daily_trigger_counts[rule.rule_id] >= rule.max_triggers_per_day:
+            continue
+        
+        trigger_data = None
+        if rule.break_type == BreakType.PRICE_LIMIT:
+            trigger_data = system.analyzer.check_price_limit_trigger(rule, symbol)
+        elif rule.break_type == BreakType.VOLATILITY:
+            trigger_data = system.analyzer.check_volatility_trigger(rule, symbol)
+        elif rule.break_type == BreakType.VOLUME_SPIKE:
+            trigger_data = system.analyzer.check_volume_spike_trigger(rule, symbol)
+        elif rule.break_type == BreakType.ERROR_TRADE:
+            trigger_data = system.analyzer.check_error_trade_trigger(rule, symbol)
+        
+        if trigger_data and trigger_data.get('trigger_met'):
+            await system._trigger_circuit_breaker(rule, symbol, trigger_data)
+
+def make_rules() -> list:
+    """Global, per-symbol, inactive and checker-less rules; halts lift on the next update"""
+    return [
+        CircuitBreakerRule("market_wide", BreakType.MARKET_WIDE, None, price_threshold_pct=-1.0,
+                           price_window_seconds=300, halt_duration_seconds=0),
+        CircuitBreakerRule("price_2pct", BreakType.PRICE_LIMIT, None, price_threshold_pct=2.0,
+                           price_window_seconds=300, halt_duration_seconds=0, max_triggers_per_day=4),
+        CircuitBreakerRule("btc_price_1pct", BreakType.PRICE_LIMIT, "BTC/USD", price_threshold_pct=1.0,
+                           price_window_seconds=60, halt_duration_seconds=0, max_triggers_per_day=3),
+        CircuitBreakerRule("volatility", BreakType.VOLATILITY, None, volatility_threshold=0.01,
+                           volatility_window=20, halt_duration_seconds=0, max_triggers_per_day=2),
+        CircuitBreakerRule("eth_volume", BreakType.VOLUME_SPIKE, "ETH/USD", volume_multiplier=1.5,
+                           volume_window_seconds=300, halt_duration_seconds=0, max_triggers_per_day=6),
+        CircuitBreakerRule("eth_price_off", BreakType.PRICE_LIMIT, "ETH/USD", price_threshold_pct=0.1,
+                           price_window_seconds=300, halt_duration_seconds=0, is_active=False),
+    ]
+
+class TestMarketDataTracker(unittest.TestCase):
+    """Incremental window statistics agree with a full recomputation"""
+    
+    def assertClose(self, actual, expected):
+        if expected is None:
+            self.assertIsNone(actual)
+        else:
+            self.assertAlmostEqual(actual, expected, places=9)
+    
+    def test_streaming_statistics_match_recomputation(self):
+        rng = random.Random(4)
+        tracker = MarketDataTracker(max_history_points=500)
+        start = time.time() - 1200
+        price = 100.0
+        
+        for i in range(1500):
+            timestamp = start + i * 0.8
+            price *= 1 + rng.gauss(0, 0.002)
+            tracker.update_price("BTC/USD", Decimal(str(round(price, 4))), timestamp)
+            tracker.update_volume("BTC/USD", Decimal(rng.randint(1, 100)), timestamp)
+            
+            if i % 37 == 0:
+                for window_seconds in (60, 300):
+                    self.assertClose(tracker.get_price_change("BTC/USD", window_seconds),
+                                     reference_price_change(tracker, "BTC/USD", window_seconds))
+                    self.assertClose(tracker.get_volume_ratio("BTC/USD", window_seconds),
+                                     reference_volume_ratio(tracker, "BTC/USD", window_seconds))
+                for window_points in (20, 50):
+                    self.assertClose(tracker.get_volatility("BTC/USD", window_points),
+                                     reference_volatility(tracker, "BTC/USD", window_points))
+    
+    def test_rules_sharing_a_window_share_state(self):
+        tracker = MarketDataTracker()
+        now = time.time()
+        for i in range(5):
+            tracker.update_price("ETH/USD", Decimal(100 + i), now - 10 + i)
+        
+        tracker.get_price_change("ETH/USD", 300)
+        tracker.get_price_change("ETH/USD", 300)
+        tracker.get_price_change("ETH/USD", 60)
+        
+        self.assertEqual(sorted(tracker._price_windows["ETH/USD"]), [60, 300])
+        self.assertAlmostEqual(tracker.get_price_change("ETH/USD", 300), 0.04)
+    
+    def test_window_expires_old_points(self):
+        tracker = MarketDataTracker()
+        now = time.time()
+        tracker.update_price("SOL/USD", Decimal('50'), now - 500)
+        tracker.update_price("SOL/USD", Decimal('100'), now - 20)
+        tracker.update_price("SOL/USD", Decimal('110'), now - 10)
+        
+        self.assertAlmostEqual(tracker.get_price_change("SOL/USD", 60), 0.1)
+        self.assertIsNone(tracker.get_volatility("SOL/USD", 50))
+
+class TestRuleDispatchIndex(unittest.TestCase):
+    """Compiled rule index triggers the same halts as filtering every rule"""
+    
+    def make_systems(self):
+        indexed, linear = CircuitBreakerSystem(), CircuitBreakerSystem()
+        for system in (indexed, linear):
+            for rule in make_rules():
+                system.add_rule(rule)
+        linear._check_circuit_breaker_rules = types.MethodType(linear_rule_check, linear)
+        return indexed, linear
+    
+    def test_same_halts_as_linear_evaluation(self):
+        indexed, linear = self.make_systems()
+        rng = random.Random(9)
+        prices = {"BTC/USD": 100.0, "ETH/USD": 50.0, "SOL/USD": 20.0}
+        
+        async def scenario():
+            for i in range(1200):
+                symbol = rng.choice(list(prices))
+                prices[symbol] *= 1 + rng.gauss(0, 0.01 if rng.random() < 0.9 else 0.04)
+                price = Decimal(str(round(prices[symbol], 4)))
+                volume = Decimal(rng.choice((1, 1, 1, 20)))
+                for system in (indexed, linear):
+                    await system.process_market_data(symbol, price, volume)
+                
+                if i == 400:
+                    for system in (indexed, linear):
+                        system.set_rule_active("eth_price_off", True)
+                        system.set_rule_active("volatility", False)
+                if i == 800:
+                    for system in (indexed, linear):
+                        system.reset_daily_counts()
+                        system.remove_rule("btc_price_1pct")
+        
+        asyncio.run(scenario())
+        
+        halts = [(event.rule_id, event.symbol) for event in indexed.halt_history]
+        self.assertGreater(len(halts), 10)
+        self.assertEqual(halts, [(event.rule_id, event.symbol) for event in linear.halt_history])
+        for rule_id in linear.rules:
+            self.assertEqual(indexed.daily_trigger_counts[rule_id], linear.daily_trigger_counts[rule_id])
+    
+    def test_exhausted_rules_leave_dispatch_until_reset(self):
+        system = CircuitBreakerSystem()
+        for rule in make_rules():
+            system.add_rule(rule)
+        
+        self.assertEqual([rule.rule_id for _, rule, _ in system._rules_for("BTC/USD")],
+                         ["price_2pct", "btc_price_1pct", "volatility"])
+        self.assertEqual([rule.rule_id for _, rule, _ in system._rules_for("ETH/USD")],
+                         ["price_2pct", "volatility", "eth_volume"])
+        
+        async def scenario():
+            for i in range(6):
+                # Every update moves far enough to trip the price rules
+                await system.process_market_data("BTC/USD", Decimal(100 + 10 * (i % 2)))
+        
+        asyncio.run(scenario())
+        
+        self.assertEqual(system.daily_trigger_counts["btc_price_1pct"], 3)
+        self.assertEqual([rule.rule_id for _, rule, _ in system._rules_for("BTC/USD")],
+                         ["price_2pct", "volatility"])
+        
+        system.reset_daily_counts()
+        self.assertEqual([rule.rule_id for _, rule, _ in system._rules_for("BTC/USD")],
+                         ["price_2pct", "btc_price_1pct", "volatility"])
+    
+    def test_new_rules_are_dispatched(self):
+        system = CircuitBreakerSystem()
+        system.add_rule(make_rules()[1])
+        self.assertEqual(len(system._rules_for("SOL/USD")), 1)
+        
+        system.add_rule(CircuitBreakerRule("sol_errors", BreakType.ERROR_TRADE, "SOL/USD"))
+        
+        self.assertEqual([rule.rule_id for _, rule, _ in system._rules_for("SOL/USD")],
+                         ["price_2pct", "sol_errors"])
+        self.assertEqual(len(system._rules_for("BTC/USD")), 1)
+
+if __name__ == "__main__":
+    unittest.main()
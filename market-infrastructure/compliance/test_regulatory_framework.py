@@ -0,0 +1,146 @@
+"""
+Test Suite for the Regulatory Compliance Framework
+Covers batch wash trading and layering surveillance
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from regulatory_framework import TradingBehaviorAnalyzer, RegulatoryComplianceEngine
+
+AGENTS = ["agent_0", "agent_1", "agent_2", "agent_3"]
+SYMBOLS = ["BTC/USD", "ETH/USD", "SOL/USD"]
+
+def reference_wash_trading(analyzer: TradingBehaviorAnalyzer, agent_id: str, current_time: float,
+                           window_seconds: int = 3600) -> list:
+    """Per-agent scan over trade records, as detection ran before batching"""
+    by_symbol = {}
+    for trade in analyzer.trade_history.records(agent_id, since=current_time - window_seconds):
+        by_symbol.setdefault(trade['symbol'], []).append(trade)
+    
+    violations = []
+    for symbol, trades in by_symbol.items():
+        for i in range(len(trades) - 3):
+            run = trades[i:i + 4]
+            if [trade['side'] for trade in run] == ['buy', 'sell', 'buy', 'sell']:
+                time_span = run[3]['timestamp'] - run[0]['timestamp']
+                if time_span < 300:
+                    violations.append({'type': 'wash_trading', 'symbol': symbol,
+                                       'trades': run, 'time_span': time_span})
+    return violations
+
+def reference_layering(analyzer: TradingBehaviorAnalyzer, agent_id: str, current_time: float) -> list:
+    """Per-agent order counts and cancel ratios over the last hour"""
+    by_symbol = {}
+    for order in analyzer.order_history.records(agent_id):
+        if current_time - order['timestamp'] < 3600:
+            by_symbol.setdefault(order['symbol'], []).append(order)
+    
+    violations = []
+    for symbol, orders in by_symbol.items():
+        cancel_ratio = sum(order['status'] == 'cancelled' for order in orders) / len(orders)
+        if len(orders) > 20 and cancel_ratio > 0.8:
+            violations.append({'type': 'layering', 'symbol': symbol,
+                               'order_count': len(orders), 'cancel_ratio': cancel_ratio})
+    return violations
+
+def populate(analyzer: TradingBehaviorAnalyzer, seed: int, start: float, count: int = 2000) -> None:
+    """Random trades with frequent buy/sell alternation and bursts of cancelled orders"""
+    rng = random.Random(seed)
+    timestamp = start
+    for i in range(count):
+        timestamp += rng.choice((1, 5, 40, 150))
+        agent_id = rng.choice(AGENTS)
+        symbol = rng.choice(SYMBOLS)
+        side = 'buy' if rng.random() < 0.5 else 'sell'
+        analyzer.trade_history.append(agent_id, timestamp, symbol, side, rng.randint(1, 10), 100.0, f"t{i}")
+        
+        # agent_0 cancels almost everything it sends
+        cancel_rate = 0.95 if agent_id == "agent_0" else 0.5
+        status = 'cancelled' if rng.random() < cancel_rate else 'filled'
+        analyzer.order_history.append(agent_id, timestamp, f"o{i}", symbol, side, 1, 100.0, 'limit', status)
+
+def by_symbol_and_time(violations: list) -> list:
+    return sorted(violations, key=lambda v: (v['symbol'], v.get('trades', [{}])[0].get('timestamp', 0)))
+
+class TestBatchSurveillance(unittest.TestCase):
+    """Batch detection reports what per-agent detection reports"""
+    
+    def test_wash_trading_matches_per_agent_scan(self):
+        analyzer = TradingBehaviorAnalyzer()
+        now = time.time()
+        populate(analyzer, seed=1, start=now - 40000, count=1000)
+        
+        batch = analyzer.detect_wash_trading_batch(current_time=now)
+        
+        self.assertTrue(batch)
+        for agent_id in AGENTS:
+            self.assertEqual(by_symbol_and_time(batch.get(agent_id, [])),
+                             by_symbol_and_time(reference_wash_trading(analyzer, agent_id, now)))
+    
+    def test_layering_matches_per_agent_scan(self):
+        analyzer = TradingBehaviorAnalyzer()
+        now = time.time()
+        populate(analyzer, seed=2, start=now - 12000, count=1500)
+        
+        batch = analyzer.detect_layering_batch(current_time=now)
+        
+        self.assertIn("agent_0", batch)
+        for agent_id in AGENTS:
+            expected = reference_layering(analyzer, agent_id, now)
+            actual = batch.get(agent_id, [])
+            self.assertEqual(sorted(v['symbol'] for v in actual), sorted(v['symbol'] for v in expected))
+            for violation in expected:
+                match = next(v for v in actual if v['symbol'] == violation['symbol'])
+                self.assertEqual(match['order_count'], violation['order_count'])
+                self.assertAlmostEqual(match['cancel_ratio'], violation['cancel_ratio'])
+    
+    def test_single_agent_wrappers_use_the_batch(self):
+        analyzer = TradingBehaviorAnalyzer()
+        now = time.time()
+        for i, side in enumerate(['buy', 'sell', 'buy', 'sell']):
+            analyzer.trade_history.append("agent_1", now - 100 + i, "BTC/USD", side, 1, 100.0, f"t{i}")
+        
+        violations = analyzer.detect_wash_trading("agent_1")
+        
+        self.assertEqual(len(violations), 1)
+        self.assertEqual([trade['order_id'] for trade in violations[0]['trades']], ["t0", "t1", "t2", "t3"])
+        self.assertEqual(analyzer.detect_wash_trading("agent_2"), [])
+        self.assertEqual(analyzer.detect_layering("agent_1"), [])
+
+class TestScheduledSurveillance(unittest.TestCase):
+    """Repeated surveillance passes report each pattern once"""
+    
+    def test_patterns_are_not_reported_again(self):
+        engine = RegulatoryComplianceEngine()
+        analyzer = engine.behavior_analyzer
+        now = time.time()
+        for i, side in enumerate(['buy', 'sell', 'buy', 'sell']):
+            analyzer.trade_history.append("agent_1", now - 200 + i, "BTC/USD", side, 1, 100.0, f"t{i}")
+        for i in range(25):
+            analyzer.order_history.append("agent_2", now - 300 + i, f"o{i}", "ETH/USD", 'buy', 1, 100.0,
+                                       'limit', 'cancelled')
+        
+        async def scenario():
+            first = await engine.run_surveillance(current_time=now)
+            second = await engine.run_surveillance(current_time=now + 60)
+            
+            # A new run on top of the old trades is reported on the next pass
+            for i, side in enumerate(['buy', 'sell']):
+                analyzer.trade_history.append("agent_1", now + 100 + i, "BTC/USD", side, 1, 100.0, f"n{i}")
+            third = await engine.run_surveillance(current_time=now + 120)
+            return first, second, third
+        
+        self.assertEqual(asyncio.run(scenario()), (2, 0, 1))
+        self.assertEqual(sorted((v.agent_id, v.rule_id) for v in engine.violations),
+                         [("agent_1", "wash_trading_detection"), ("agent_1", "wash_trading_detection"),
+                          ("agent_2", "layering_detection")])
+
+if __name__ == "__main__":
+    unittest.main()
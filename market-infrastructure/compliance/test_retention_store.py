@@ -0,0 +1,82 @@
+"""
+Test Suite for the Time-Bucketed Retention Store
+Covers exact retention windows, tail reads and category columns
+"""
+
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from retention_store import RetentionStore, FLOAT, CATEGORY, OBJECT
+
+def make_store(retention_seconds: float = 100, bucket_seconds: float = 7) -> RetentionStore:
+    return RetentionStore([("price", FLOAT), ("side", CATEGORY), ("order_id", OBJECT)],
+                          retention_seconds=retention_seconds, bucket_seconds=bucket_seconds)
+
+class TestRetentionStore(unittest.TestCase):
+    """Bucketed history reads the same records as a filtered list"""
+    
+    def test_windows_match_a_filtered_list(self):
+        rng = random.Random(3)
+        store = make_store()
+        history = []
+        timestamp = 0.0
+        
+        for i in range(3000):
+            timestamp += rng.choice((0.0, 0.1, 0.5, 2.0, 15.0))
+            record = {"timestamp": timestamp, "price": rng.uniform(90, 110),
+                      "side": rng.choice(("buy", "sell")), "order_id": f"o{i}"}
+            store.append("agent_1", timestamp, record["price"], record["side"], record["order_id"])
+            history.append(record)
+            
+            if i % 41 == 0:
+                retained = [r for r in history if r["timestamp"] > timestamp - 100]
+                self.assertEqual(store.records("agent_1"), retained)
+                self.assertEqual(store.count("agent_1"), len(retained))
+                
+                since = timestamp - rng.uniform(0, 150)
+                recent = [r for r in retained if r["timestamp"] > since]
+                self.assertEqual(store.count("agent_1", since), len(recent))
+                np.testing.assert_array_equal(store.column("agent_1", "price", since),
+                                              [r["price"] for r in recent])
+                self.assertEqual(store.labels(store.column("agent_1", "side", since)),
+                                 [r["side"] for r in recent])
+                
+                last = rng.randint(1, 40)
+                np.testing.assert_array_equal(store.column("agent_1", "timestamp", last=last),
+                                              [r["timestamp"] for r in retained[-last:]])
+        
+        # Only the buckets overlapping the retention window are kept
+        self.assertLessEqual(len(store._buckets["agent_1"]), 100 // 7 + 2)
+    
+    def test_expire_applies_to_reads(self):
+        store = make_store()
+        store.append("agent_1", 10.0, 100, "buy", "o1")
+        store.append("agent_1", 50.0, 101, "sell", "o2")
+        
+        store.expire("agent_1", 120.0)
+        
+        self.assertEqual([r["order_id"] for r in store.records("agent_1")], ["o2"])
+        store.expire("agent_1", 150.0)
+        self.assertEqual(store.count("agent_1"), 0)
+        self.assertEqual(len(store.column("agent_1", "price")), 0)
+    
+    def test_keys_and_categories(self):
+        store = make_store()
+        store.append("agent_1", 1.0, 100, "buy", "o1")
+        store.append("agent_2", 2.0, 100, "sell", "o2")
+        
+        self.assertEqual(store.keys(), ["agent_1", "agent_2"])
+        self.assertIn("agent_2", store)
+        self.assertNotIn("agent_3", store)
+        self.assertEqual(store.labels([store.code_for("sell"), store.code_for("buy")]), ["sell", "buy"])
+        self.assertIsNone(store.code_for("cancelled"))
+        self.assertEqual(store.columns("agent_1")["order_id"].tolist(), ["o1"])
+
+if __name__ == "__main__":
+    unittest.main()
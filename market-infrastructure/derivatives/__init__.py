@@ -26,6 +26,7 @@ from .options_market import (
     Greeks,
     OptionPosition,
     BlackScholesCalculator,
+    OptionChain,
     OptionType,
     OptionStyle,
     ExerciseStatus
@@ -50,6 +51,8 @@ from .structured_products import (
     StructuredProduct,
     CDOEngine,
     ExoticOptionsEngine,
+    MonteCarloEngine,
+    MonteCarloResult,
     WeatherDerivatives,
     UnderlyingAsset,
     Tranche,
@@ -107,6 +110,7 @@ __all__ = [
     'Greeks',
     'OptionPosition',
     'BlackScholesCalculator',
+    'OptionChain',
     'OptionType',
     'OptionStyle', 
     'ExerciseStatus',
@@ -129,6 +133,8 @@ __all__ = [
     'StructuredProduct',
     'CDOEngine',
     'ExoticOptionsEngine', 
+    'MonteCarloEngine',
+    'MonteCarloResult',
     'WeatherDerivatives',
     'UnderlyingAsset',
     'Tranche',
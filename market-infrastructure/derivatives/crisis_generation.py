@@ -319,9 +319,8 @@ class EconomicBubbleEngine:
 class FinancialContagionEngine:
     """Engine for modeling financial contagion across markets and institutions"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         self.institutions: Dict[str, Dict] = {}
-        self.contagion_matrix: np.ndarray = None
         self.contagion_events: List[Dict] = []
         self.transmission_channels: Dict[ContagionChannel, float] = {
             ContagionChannel.DIRECT_EXPOSURE: 0.3,
@@ -330,6 +329,21 @@ class FinancialContagionEngine:
             ContagionChannel.CONFIDENCE_CHANNEL: 0.15,
             ContagionChannel.PORTFOLIO_REBALANCING: 0.1,
         }
+        # Without a seed, draws are seeded from the module random stream per call,
+        # so random.seed() keeps whole crisis runs reproducible
+        self.rng = np.random.default_rng(seed) if seed is not None else None
+        
+        # Institution order shared by the matrix and the attribute arrays
+        self.institution_index: Dict[str, int] = {}
+        self._contagion_matrix: Optional[np.ndarray] = None
+        self._matrix_stale = False
+        
+    @property
+    def contagion_matrix(self) -> Optional[np.ndarray]:
+        """Contagion transmission matrix, rebuilt lazily after network changes"""
+        if self._matrix_stale:
+            self._build_contagion_matrix()
+        return self._contagion_matrix
         
     def add_institution(self, institution_id: str, asset_size: float,
                        leverage_ratio: float, liquidity_ratio: float):
@@ -344,9 +358,10 @@ class FinancialContagionEngine:
             'funding_sources': {},
             'contagion_susceptibility': 0.0
         }
+        self.institution_index.setdefault(institution_id, len(self.institution_index))
         
-        # Rebuild contagion matrix
-        self._build_contagion_matrix()
+        # Rebuild contagion matrix on next use
+        self._matrix_stale = True
         
     def add_exposure(self, from_institution: str, to_institution: str,
                     exposure_amount: float, exposure_type: str = "credit"):
@@ -363,144 +378,257 @@ class FinancialContagionEngine:
             'risk_weight': 1.0
         }
         
-        # Rebuild contagion matrix
-        self._build_contagion_matrix()
+        # Rebuild contagion matrix on next use
+        self._matrix_stale = True
+        
+    def _attribute_array(self, attribute: str) -> np.ndarray:
+        """One per-institution attribute as an array in matrix order"""
+        return np.fromiter(
+            (inst[attribute] for inst in self.institutions.values()),
+            dtype=float, count=len(self.institutions)
+        )
+        
+    def _exposure_array(self) -> np.ndarray:
+        """Exposure amounts as a dense from x to matrix"""
+        n_institutions = len(self.institutions)
+        exposures = np.zeros((n_institutions, n_institutions))
+        for i, inst in enumerate(self.institutions.values()):
+            for target, exposure in inst['exposures'].items():
+                exposures[i, self.institution_index[target]] = exposure['amount']
+        return exposures
         
     def _build_contagion_matrix(self):
         """Build contagion transmission matrix"""
+        self._matrix_stale = False
         n_institutions = len(self.institutions)
         if n_institutions == 0:
             return
             
-        institution_list = list(self.institutions.keys())
-        self.contagion_matrix = np.zeros((n_institutions, n_institutions))
-        
-        for i, inst1 in enumerate(institution_list):
-            for j, inst2 in enumerate(institution_list):
-                if i != j:
-                    # Calculate contagion probability based on exposures
-                    exposure_prob = self._calculate_exposure_contagion(inst1, inst2)
-                    funding_prob = self._calculate_funding_contagion(inst1, inst2)
-                    market_prob = self._calculate_market_contagion(inst1, inst2)
-                    confidence_prob = self._calculate_confidence_contagion(inst1, inst2)
-                    
-                    total_prob = (
-                        exposure_prob * self.transmission_channels[ContagionChannel.DIRECT_EXPOSURE] +
-                        funding_prob * self.transmission_channels[ContagionChannel.FUNDING_LIQUIDITY] +
-                        market_prob * self.transmission_channels[ContagionChannel.MARKET_LIQUIDITY] +
-                        confidence_prob * self.transmission_channels[ContagionChannel.CONFIDENCE_CHANNEL]
-                    )
-                    
-                    self.contagion_matrix[i, j] = min(1.0, total_prob)
-                    
-    def _calculate_exposure_contagion(self, from_inst: str, to_inst: str) -> float:
-        """Calculate contagion probability through direct exposures"""
-        exposures = self.institutions[from_inst]['exposures']
-        if to_inst not in exposures:
-            return 0.0
-            
-        exposure_amount = exposures[to_inst]['amount']
-        from_assets = self.institutions[from_inst]['asset_size']
-        
-        # Exposure as percentage of assets
-        exposure_ratio = exposure_amount / from_assets
-        
-        # Higher exposure = higher contagion probability
-        return min(1.0, exposure_ratio * 2.0)
+        asset_size = self._attribute_array('asset_size')
+        leverage = self._attribute_array('leverage_ratio')
+        liquidity = self._attribute_array('liquidity_ratio')
+        health = self._attribute_array('health_score')
+        stress = self._attribute_array('stress_level')
         
-    def _calculate_funding_contagion(self, from_inst: str, to_inst: str) -> float:
-        """Calculate contagion probability through funding liquidity"""
-        from_liquidity = self.institutions[from_inst]['liquidity_ratio']
-        to_leverage = self.institutions[to_inst]['leverage_ratio']
+        # Rows are the shocked institution, columns the one it infects
+        # Direct exposures as a share of the lender's assets
+        exposure_prob = np.minimum(1.0, self._exposure_array() / asset_size[:, None] * 2.0)
         
         # Lower liquidity and higher leverage = higher contagion
-        return (1 - from_liquidity) * (to_leverage / 20.0)
+        funding_prob = (1 - liquidity)[:, None] * (leverage / 20.0)[None, :]
         
-    def _calculate_market_contagion(self, from_inst: str, to_inst: str) -> float:
-        """Calculate contagion probability through market liquidity"""
-        from_size = self.institutions[from_inst]['asset_size']
-        to_size = self.institutions[to_inst]['asset_size']
+        # Larger institutions have higher market impact (normalised to trillions)
+        market_prob = np.minimum(0.5, (asset_size[:, None] + asset_size[None, :]) / (2 * 1e12))
         
-        # Larger institutions have higher market impact
-        size_factor = (from_size + to_size) / (2 * 1e12)  # Normalize to trillions
-        return min(0.5, size_factor)
+        # Lower health and higher stress = higher confidence contagion
+        confidence_prob = (1 - health)[:, None] * stress[None, :]
         
-    def _calculate_confidence_contagion(self, from_inst: str, to_inst: str) -> float:
-        """Calculate contagion probability through confidence channel"""
-        from_health = self.institutions[from_inst]['health_score']
-        to_stress = self.institutions[to_inst]['stress_level']
+        total_prob = (
+            exposure_prob * self.transmission_channels[ContagionChannel.DIRECT_EXPOSURE] +
+            funding_prob * self.transmission_channels[ContagionChannel.FUNDING_LIQUIDITY] +
+            market_prob * self.transmission_channels[ContagionChannel.MARKET_LIQUIDITY] +
+            confidence_prob * self.transmission_channels[ContagionChannel.CONFIDENCE_CHANNEL]
+        )
         
-        # Lower health and higher stress = higher confidence contagion
-        return (1 - from_health) * to_stress
+        self._contagion_matrix = np.minimum(1.0, total_prob)
+        np.fill_diagonal(self._contagion_matrix, 0.0)
+        
+    def _random_generator(self) -> np.random.Generator:
+        """Generator for one simulation call"""
+        if self.rng is not None:
+            return self.rng
+        return np.random.default_rng(random.getrandbits(64))
+        
+    def _transmission_operators(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Log-survival matrix and its contagion-weighted counterpart"""
+        matrix = self.contagion_matrix
+        log_survival = np.log1p(-np.minimum(matrix, 1.0 - 1e-12))
+        return log_survival, matrix * log_survival
+        
+    @staticmethod
+    def _contagion_round(affected: np.ndarray, stress: np.ndarray,
+                         log_survival: np.ndarray, weighted_survival: np.ndarray,
+                         shock_severity: float,
+                         rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        One contagion round for a (trials x institutions) state
+        Approximates the per-pair draws of simulate_contagion so trials scale
+        as matrix products: every affected source acts on every unaffected
+        target with (1 - p)^(1 + source stress) survival (exact when stress
+        is 0), so a target's survival across sources is one masked
+        matrix-vector product in log space. The shock a newly affected target
+        takes is the contagion probability averaged by each source's share of
+        that hazard (exactly p for a single source)
+        """
+        pressure = np.where(affected, 1.0 + stress, 0.0)
+        hazard = pressure @ log_survival
+        infection_prob = np.where(affected, 0.0, -np.expm1(hazard))
+        newly_affected = rng.random(affected.shape) < infection_prob
+        
+        mean_contagion = np.divide(pressure @ weighted_survival, hazard,
+                                   out=np.zeros_like(hazard), where=hazard < 0)
+        shock = shock_severity * mean_contagion * 0.7
+        return newly_affected, infection_prob, shock
         
     def simulate_contagion(self, initial_shock_institution: str, 
                           shock_severity: float = 0.5) -> List[Dict]:
-        """Simulate contagion spreading from initial shock"""
+        """
+        Simulate contagion spreading from initial shock
+        Each round every affected source tries every unaffected target with
+        probability p * (1 + source stress); all pairs are drawn in one batch
+        """
         if initial_shock_institution not in self.institutions:
             raise ValueError(f"Institution {initial_shock_institution} not found")
             
+        matrix = self.contagion_matrix
+        rng = self._random_generator()
+        
         # Initialize shock
         self.institutions[initial_shock_institution]['health_score'] *= (1 - shock_severity)
         self.institutions[initial_shock_institution]['stress_level'] = shock_severity
         
         contagion_rounds = []
         institution_list = list(self.institutions.keys())
-        affected_institutions = {initial_shock_institution}
+        asset_size = self._attribute_array('asset_size')
+        total_assets = asset_size.sum()
+        stress = self._attribute_array('stress_level')
+        affected = np.zeros(len(institution_list), dtype=bool)
+        affected[self.institution_index[initial_shock_institution]] = True
         
         round_num = 0
         while round_num < 10:  # Maximum 10 rounds
             round_num += 1
-            new_infections = set()
             round_data = {
                 'round': round_num,
                 'newly_affected': [],
-                'total_affected': len(affected_institutions),
-                'system_stress': self._calculate_system_stress()
+                'total_affected': int(affected.sum()),
+                'system_stress': float(stress @ asset_size / total_assets) if total_assets > 0 else 0.0
             }
             
-            for affected_inst in affected_institutions:
-                inst_index = institution_list.index(affected_inst)
-                
-                for j, target_inst in enumerate(institution_list):
-                    if target_inst not in affected_institutions:
-                        contagion_prob = self.contagion_matrix[inst_index, j]
-                        
-                        # Amplify probability based on source institution stress
-                        source_stress = self.institutions[affected_inst]['stress_level']
-                        adjusted_prob = contagion_prob * (1 + source_stress)
-                        
-                        if random.random() < adjusted_prob:
-                            # Contagion spreads
-                            shock_transmission = shock_severity * contagion_prob * 0.7
-                            self.institutions[target_inst]['health_score'] *= (1 - shock_transmission)
-                            self.institutions[target_inst]['stress_level'] = shock_transmission
-                            
-                            new_infections.add(target_inst)
-                            round_data['newly_affected'].append({
-                                'institution': target_inst,
-                                'source': affected_inst,
-                                'transmission_prob': adjusted_prob,
-                                'shock_size': shock_transmission
-                            })
-                            
-                            # Record contagion event
-                            self.contagion_events.append({
-                                'timestamp': datetime.now(),
-                                'source': affected_inst,
-                                'target': target_inst,
-                                'channel': 'multi_channel',
-                                'probability': adjusted_prob,
-                                'shock_size': shock_transmission
-                            })
-            
-            if not new_infections:
+            # Sources x unaffected targets, amplified by source stress
+            sources = np.flatnonzero(affected)
+            targets = np.flatnonzero(~affected)
+            contagion_prob = matrix[np.ix_(sources, targets)]
+            adjusted_prob = contagion_prob * (1 + stress[sources])[:, None]
+            hits = rng.random(adjusted_prob.shape) < adjusted_prob
+            if not hits.any():
                 break
                 
-            affected_institutions.update(new_infections)
+            # Hits are applied in source order; a target hit twice takes both shocks
+            for row, column in zip(*np.nonzero(hits)):
+                source_inst = institution_list[sources[row]]
+                target_inst = institution_list[targets[column]]
+                transmission_prob = float(adjusted_prob[row, column])
+                
+                # Contagion spreads
+                shock_transmission = shock_severity * float(contagion_prob[row, column]) * 0.7
+                self.institutions[target_inst]['health_score'] *= (1 - shock_transmission)
+                self.institutions[target_inst]['stress_level'] = shock_transmission
+                stress[targets[column]] = shock_transmission
+                
+                round_data['newly_affected'].append({
+                    'institution': target_inst,
+                    'source': source_inst,
+                    'transmission_prob': transmission_prob,
+                    'shock_size': shock_transmission
+                })
+                
+                # Record contagion event
+                self.contagion_events.append({
+                    'timestamp': datetime.now(),
+                    'source': source_inst,
+                    'target': target_inst,
+                    'channel': 'multi_channel',
+                    'probability': transmission_prob,
+                    'shock_size': shock_transmission
+                })
+                
+            affected[targets[hits.any(axis=0)]] = True
             contagion_rounds.append(round_data)
             
         return contagion_rounds
         
+    def simulate_contagion_trials(self, initial_shock_institution: str,
+                                  shock_severity: float = 0.5, trials: int = 1000,
+                                  max_rounds: int = 10, seed: Optional[int] = None) -> Dict:
+        """
+        Monte Carlo contagion from one initial shock across many trials
+        All trials advance together as (trials x institutions) state arrays
+        using the matrix-product approximation in _contagion_round;
+        institution state is left untouched so trials can be rerun freely
+        """
+        if initial_shock_institution not in self.institutions:
+            raise ValueError(f"Institution {initial_shock_institution} not found")
+            
+        rng = self._random_generator() if seed is None else np.random.default_rng(seed)
+        log_survival, weighted_survival = self._transmission_operators()
+        institution_list = list(self.institutions.keys())
+        n_institutions = len(institution_list)
+        shock_index = self.institution_index[initial_shock_institution]
+        
+        asset_size = self._attribute_array('asset_size')
+        total_assets = asset_size.sum()
+        initial_health = self._attribute_array('health_score')
+        initial_stress = self._attribute_array('stress_level')
+        initial_health[shock_index] *= (1 - shock_severity)
+        initial_stress[shock_index] = shock_severity
+        
+        affected_counts = np.zeros(trials, dtype=np.int64)
+        rounds = np.zeros(trials, dtype=np.int64)
+        system_stress = np.zeros(trials)
+        health_loss = np.zeros(trials)
+        infections = np.zeros(n_institutions, dtype=np.int64)
+        
+        # Bound the state arrays to a few million entries per batch
+        batch_size = max(1, 4_000_000 // n_institutions)
+        for start in range(0, trials, batch_size):
+            batch = slice(start, min(trials, start + batch_size))
+            n_trials = batch.stop - batch.start
+            
+            health = np.tile(initial_health, (n_trials, 1))
+            stress = np.tile(initial_stress, (n_trials, 1))
+            affected = np.zeros((n_trials, n_institutions), dtype=bool)
+            affected[:, shock_index] = True
+            spreading = np.ones(n_trials, dtype=bool)
+            
+            for _ in range(max_rounds):
+                newly_affected, _, shock = self._contagion_round(
+                    affected, stress, log_survival, weighted_survival, shock_severity, rng
+                )
+                
+                # A trial stops once a round passes without new infections
+                newly_affected &= spreading[:, None]
+                spreading = newly_affected.any(axis=1)
+                if not spreading.any():
+                    break
+                    
+                rounds[batch] += spreading
+                health = np.where(newly_affected, health * (1 - shock), health)
+                stress = np.where(newly_affected, shock, stress)
+                affected |= newly_affected
+                
+            affected_counts[batch] = affected.sum(axis=1)
+            infections += affected.sum(axis=0)
+            if total_assets > 0:
+                system_stress[batch] = stress @ asset_size / total_assets
+                health_loss[batch] = (initial_health - health) @ asset_size / total_assets
+                
+        infection_probability = infections / trials if trials else np.zeros(n_institutions)
+        
+        return {
+            'initial_shock_institution': initial_shock_institution,
+            'shock_severity': shock_severity,
+            'trials': trials,
+            'affected_counts': affected_counts,
+            'rounds': rounds,
+            'system_stress': system_stress,
+            'health_loss': health_loss,
+            'mean_affected': float(affected_counts.mean()) if trials else 0.0,
+            'mean_system_stress': float(system_stress.mean()) if trials else 0.0,
+            'system_stress_99': float(np.percentile(system_stress, 99)) if trials else 0.0,
+            'infection_probability': dict(zip(institution_list, infection_probability.tolist()))
+        }
+        
     def _calculate_system_stress(self) -> float:
         """Calculate overall system stress level"""
         if not self.institutions:
@@ -777,9 +905,9 @@ class CrisisInterventionEngine:
 class CrisisGenerationOrchestrator:
     """Main orchestrator for crisis generation and management"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         self.bubble_engine = EconomicBubbleEngine()
-        self.contagion_engine = FinancialContagionEngine()
+        self.contagion_engine = FinancialContagionEngine(seed=seed)
         self.risk_analyzer = SystemicRiskAnalyzer()
         self.intervention_engine = CrisisInterventionEngine()
         
@@ -15,6 +15,8 @@ import json
 import logging
 from datetime import datetime, timedelta
 import math
+import numpy as np
+from scipy.special import ndtr
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -49,6 +51,7 @@ class OptionContract:
     implied_volatility: Optional[Decimal] = None
     open_interest: int = 0
     volume: int = 0
+    last_premium: Optional[Decimal] = None  # Last traded premium, used for surface calibration
     
     # Greeks (calculated dynamically)
     delta: Optional[Decimal] = None
@@ -78,6 +81,10 @@ class OptionPosition:
     exercise_status: ExerciseStatus = ExerciseStatus.OPEN
     timestamp: datetime = field(default_factory=datetime.now)
 
+# Reference point for expiry arithmetic on naive datetimes (matches datetime subtraction)
+_EPOCH = datetime(1970, 1, 1)
+_SECONDS_PER_YEAR = 24 * 3600 * 365.25
+
 class BlackScholesCalculator:
     """Black-Scholes option pricing model with Greeks"""
     
@@ -188,12 +195,306 @@ class BlackScholesCalculator:
             vega=Decimal(str(vega)).quantize(Decimal('0.01')),
             rho=Decimal(str(rho)).quantize(Decimal('0.01'))
         )
+    
+    @staticmethod
+    def calculate_chain(S, K, T, r: float, sigma, is_call) -> Dict[str, np.ndarray]:
+        """
+        Price and compute Greeks for arrays of contracts in one pass
+        Inputs broadcast against each other. d1/d2 and the normal terms are
+        evaluated once and shared by the premium and every Greek; conventions
+        match calculate_option_price/calculate_greeks (0.01 premium floor,
+        intrinsic value and zero Greeks once expired), unrounded floats
+        """
+        S, K, T, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=float), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(sigma, dtype=float), np.asarray(is_call, dtype=bool)
+        )
+        sign = np.where(is_call, 1.0, -1.0)
+        live = T > 0
+        T_live = np.where(live, T, 1.0)
+        
+        # Shared d1/d2
+        sqrt_T = np.sqrt(T_live)
+        vol_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T_live) / vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        
+        pdf_d1 = np.exp(-0.5 * d1 * d1) / math.sqrt(2 * math.pi)
+        cdf_d1 = ndtr(d1)
+        cdf_signed_d1 = ndtr(sign * d1)  # N(d1) for calls, N(-d1) for puts
+        cdf_signed_d2 = ndtr(sign * d2)
+        discounted_strike = K * np.exp(-r * T_live)
+        
+        price = sign * (S * cdf_signed_d1 - discounted_strike * cdf_signed_d2)
+        delta = np.where(is_call, cdf_d1, cdf_d1 - 1)
+        gamma = pdf_d1 / (S * vol_sqrt_T)
+        theta = (-(S * pdf_d1 * sigma) / (2 * sqrt_T) - sign * r * discounted_strike * cdf_signed_d2) / 365
+        vega = S * pdf_d1 * sqrt_T / 100
+        rho = sign * K * T_live * np.exp(-r * T_live) * cdf_signed_d2 / 100
+        
+        zero = np.zeros_like(price)
+        return {
+            "premium": np.where(live, np.maximum(price, 0.01), np.maximum(sign * (S - K), 0.0)),
+            "delta": np.where(live, delta, zero),
+            "gamma": np.where(live, gamma, zero),
+            "theta": np.where(live, theta, zero),
+            "vega": np.where(live, vega, zero),
+            "rho": np.where(live, rho, zero)
+        }
+    
+    @staticmethod
+    def _price_and_vega(S: np.ndarray, K: np.ndarray, T: np.ndarray, r: float,
+                        sigma: np.ndarray, is_call: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Unfloored premium and raw vega (per unit of volatility) for live contracts"""
+        sign = np.where(is_call, 1.0, -1.0)
+        sqrt_T = np.sqrt(T)
+        vol_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        price = sign * (S * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+        vega = S * np.exp(-0.5 * d1 * d1) / math.sqrt(2 * math.pi) * sqrt_T
+        return price, vega
+    
+    @classmethod
+    def implied_volatility_chain(cls, premium, S, K, T, r: float, is_call,
+                                 tolerance: float = 1e-9, max_iterations: int = 100) -> np.ndarray:
+        """
+        Implied volatility for arrays of premiums in one batched solve
+        Every contract takes a Newton step on vega each iteration; where the step
+        would leave its bracket, vega vanishes or the steps stop shrinking it
+        bisects instead. tolerance is relative to the premium. Premiums outside
+        the no-arbitrage bounds or not reachable within the bracket come back NaN
+        """
+        arrays = np.broadcast_arrays(
+            np.asarray(premium, dtype=float), np.asarray(S, dtype=float), np.asarray(K, dtype=float),
+            np.asarray(T, dtype=float), np.asarray(is_call, dtype=bool)
+        )
+        shape = arrays[0].shape
+        premium, S, K, T, is_call = (a.ravel() for a in arrays)
+        
+        # No-arbitrage bounds: above discounted intrinsic value, below spot (calls) or discounted strike (puts)
+        discounted_strike = K * np.exp(-r * np.maximum(T, 0.0))
+        lower_bound = np.maximum(np.where(is_call, S - discounted_strike, discounted_strike - S), 0.0)
+        upper_bound = np.where(is_call, S, discounted_strike)
+        valid = (T > 0) & (premium > lower_bound) & (premium < upper_bound)
+        
+        low = np.full(premium.shape, 1e-4)
+        high = np.full(premium.shape, 5.0)
+        last_step = high - low
+        
+        # Manaster-Koehler starting point
+        T_safe = np.where(T > 0, T, 1.0)
+        sigma = np.clip(np.sqrt(2 * np.abs(np.log(S / K) + r * T_safe) / T_safe), 0.05, 2.0)
+        
+        active = np.flatnonzero(valid)
+        for _ in range(max_iterations):
+            if not len(active):
+                break
+            
+            price, vega = cls._price_and_vega(S[active], K[active], T[active], r, sigma[active], is_call[active])
+            error = price - premium[active]
+            
+            # Price is increasing in volatility, so the sign of the error tightens the bracket
+            high[active] = np.where(error > 0, sigma[active], high[active])
+            low[active] = np.where(error < 0, sigma[active], low[active])
+            
+            # Newton inside the bracket while its steps keep halving, bisection otherwise
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton_step = error / vega
+            newton = sigma[active] - newton_step
+            use_newton = ((vega > 1e-12) & (newton > low[active]) & (newton < high[active])
+                          & (np.abs(newton_step) <= 0.5 * last_step[active]))
+            step = np.where(use_newton, newton, 0.5 * (low[active] + high[active]))
+            
+            converged = ((np.abs(error) <= tolerance * premium[active])
+                         | (high[active] - low[active] <= tolerance))
+            last_step[active] = np.abs(step - sigma[active])
+            sigma[active] = np.where(converged, sigma[active], step)
+            active = active[~converged]
+        
+        # Out of iterations, or pinned against the bracket edge, counts as unsolved
+        valid[active] = False
+        valid &= (sigma > 2e-4) & (sigma < 4.999)
+        return np.where(valid, sigma, np.nan).reshape(shape)
+
+class VolatilitySurface:
+    """
+    Implied volatility grid for one underlying by strike and expiry
+    Lookups interpolate linearly in strike and expiry and hold the edge
+    values flat outside the grid (sticky strike)
+    """
+    
+    def __init__(self, underlying: str, strikes: np.ndarray, expiries: np.ndarray, volatilities: np.ndarray):
+        self.underlying = underlying
+        self.strikes = np.asarray(strikes, dtype=float)    # Ascending
+        self.expiries = np.asarray(expiries, dtype=float)  # Ascending, seconds since _EPOCH
+        self.volatilities = np.asarray(volatilities, dtype=float)  # Shape (expiries, strikes)
+        self.calibrated_at: Optional[datetime] = None
+    
+    @staticmethod
+    def _bracket(axis: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lower/upper grid indices and interpolation weight per value"""
+        if len(axis) == 1:
+            zeros = np.zeros(len(values), dtype=np.int64)
+            return zeros, zeros, np.zeros(len(values))
+        values = np.clip(values, axis[0], axis[-1])
+        upper = np.clip(np.searchsorted(axis, values, side='right'), 1, len(axis) - 1)
+        lower = upper - 1
+        weight = (values - axis[lower]) / (axis[upper] - axis[lower])
+        return lower, upper, weight
+    
+    def volatility(self, strikes: np.ndarray, expiries: np.ndarray) -> np.ndarray:
+        """Interpolated volatility at arrays of (strike, expiry) points"""
+        strikes = np.asarray(strikes, dtype=float)
+        expiries = np.asarray(expiries, dtype=float)
+        k0, k1, wk = self._bracket(self.strikes, strikes)
+        e0, e1, we = self._bracket(self.expiries, expiries)
+        
+        grid = self.volatilities
+        near = grid[e0, k0] * (1 - wk) + grid[e0, k1] * wk
+        far = grid[e1, k0] * (1 - wk) + grid[e1, k1] * wk
+        return near * (1 - we) + far * we
+    
+    def with_points(self, strikes: np.ndarray, expiries: np.ndarray, volatilities: np.ndarray) -> 'VolatilitySurface':
+        """
+        New surface on the union of both grids: nodes take the mean of the given
+        points landing on them, every other node keeps this surface's volatility
+        """
+        strike_axis = np.union1d(self.strikes, strikes)
+        expiry_axis = np.union1d(self.expiries, expiries)
+        
+        grid_strikes, grid_expiries = np.meshgrid(strike_axis, expiry_axis)
+        grid = self.volatility(grid_strikes.ravel(), grid_expiries.ravel()).reshape(grid_strikes.shape)
+        
+        # Average calls and puts (or repeated quotes) that share a node
+        rows = np.searchsorted(expiry_axis, expiries)
+        columns = np.searchsorted(strike_axis, strikes)
+        totals = np.zeros_like(grid)
+        counts = np.zeros_like(grid)
+        np.add.at(totals, (rows, columns), volatilities)
+        np.add.at(counts, (rows, columns), 1)
+        quoted = counts > 0
+        grid[quoted] = totals[quoted] / counts[quoted]
+        
+        return VolatilitySurface(self.underlying, strike_axis, expiry_axis, grid)
+
+class OptionChain:
+    """Contracts of one underlying laid out as arrays for vectorised pricing"""
+    
+    def __init__(self, underlying: str):
+        self.underlying = underlying
+        self.contracts: List[OptionContract] = []
+        self.positions: Dict[str, int] = {}
+        self.strikes = np.empty(0)
+        self.expiries = np.empty(0)  # Seconds since _EPOCH
+        self.is_call = np.empty(0, dtype=bool)
+        
+        # Pricing key each contract was last priced at: (spot version, surface version, time bucket)
+        self.priced_keys = np.full((0, 3), -1, dtype=np.int64)
+        self._stale = False
+    
+    def add(self, contract: OptionContract) -> int:
+        position = self.positions.get(contract.symbol)
+        if position is None:
+            position = len(self.contracts)
+            self.contracts.append(contract)
+            self.positions[contract.symbol] = position
+            self._stale = True
+        return position
+    
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(strikes, expiries, is_call) aligned with contracts"""
+        if self._stale:
+            self.strikes = np.array([float(c.strike_price) for c in self.contracts])
+            self.expiries = np.array([(c.expiry_date - _EPOCH).total_seconds() for c in self.contracts])
+            self.is_call = np.array([c.option_type == OptionType.CALL for c in self.contracts], dtype=bool)
+            
+            missing = len(self.contracts) - len(self.priced_keys)
+            if missing:
+                self.priced_keys = np.vstack([self.priced_keys, np.full((missing, 3), -1, dtype=np.int64)])
+            self._stale = False
+        return self.strikes, self.expiries, self.is_call
+    
+    def stale_positions(self, positions: np.ndarray, key: Tuple[int, int, int]) -> np.ndarray:
+        """Subset of positions not priced at the given key"""
+        self.arrays()
+        return positions[np.any(self.priced_keys[positions] != key, axis=1)]
+
+class PortfolioGreeks:
+    """
+    Position-weighted Greeks for one agent, kept per underlying
+    Totals are adjusted incrementally as positions change and only recomputed
+    for an underlying once its pricing key has moved on
+    """
+    
+    GREEKS = ("delta", "gamma", "theta", "vega", "rho")
+    
+    def __init__(self):
+        # underlying -> contract symbol -> quantity * contract size
+        self.multipliers: Dict[str, Dict[str, Decimal]] = {}
+        self.totals: Dict[str, Dict[str, Decimal]] = {}
+        self.keys: Dict[str, Tuple[int, int, int]] = {}
+    
+    def recompute(self, underlying: str, contracts: Dict[str, OptionContract], key: Tuple[int, int, int]) -> None:
+        totals = {greek: Decimal('0') for greek in self.GREEKS}
+        for symbol, multiplier in self.multipliers.get(underlying, {}).items():
+            contract = contracts[symbol]
+            for greek in self.GREEKS:
+                totals[greek] += getattr(contract, greek) * multiplier
+        self.totals[underlying] = totals
+        self.keys[underlying] = key
+    
+    def apply_change(self, contract: OptionContract, quantity_change: int,
+                     key: Optional[Tuple[int, int, int]]) -> None:
+        """
+        Record a position change; key is the pricing key the contract's Greeks
+        are current at (None forces a recompute on the next read)
+        """
+        underlying = contract.underlying
+        held = self.multipliers.setdefault(underlying, {})
+        change = Decimal(str(quantity_change)) * contract.contract_size
+        
+        multiplier = held.get(contract.symbol, Decimal('0')) + change
+        if multiplier == 0:
+            held.pop(contract.symbol, None)
+        else:
+            held[contract.symbol] = multiplier
+        
+        if key is not None and self.keys.get(underlying) == key:
+            totals = self.totals[underlying]
+            for greek in self.GREEKS:
+                totals[greek] += getattr(contract, greek) * change
+        else:
+            self.keys.pop(underlying, None)
 
 class OptionsMarket:
     """Advanced options market with Black-Scholes pricing and Greeks"""
     
-    def __init__(self):
+    # Base implied volatility per underlying, used to seed the surfaces
+    VOLATILITY_MAP = {
+        'AAPL': Decimal('0.25'),   # 25%
+        'MSFT': Decimal('0.22'),   # 22%
+        'GOOGL': Decimal('0.28'),  # 28%
+        'TSLA': Decimal('0.45'),   # 45%
+        'SPY': Decimal('0.18'),    # 18%
+        'QQQ': Decimal('0.20'),    # 20%
+        'BTC': Decimal('0.80'),    # 80%
+        'ETH': Decimal('0.75')     # 75%
+    }
+    
+    def __init__(self, pricing_time_bucket: float = 60.0):
         self.contracts: Dict[str, OptionContract] = {}
+        self.chains: Dict[str, OptionChain] = {}
+        self.surfaces: Dict[str, VolatilitySurface] = {}
+        
+        # Pricing cache: a contract's pricing stays valid while its underlying's
+        # spot and surface versions and the time bucket are unchanged
+        self.pricing_time_bucket = pricing_time_bucket
+        self.spot_versions: Dict[str, int] = {}
+        self.surface_versions: Dict[str, int] = {}
+        self._priced_spots: Dict[str, Decimal] = {}
+        self._priced_rate: Optional[Decimal] = None
+        self.portfolio_greeks: Dict[str, PortfolioGreeks] = {}
         self.positions: Dict[str, Dict[str, OptionPosition]] = {}
         self.underlying_prices: Dict[str, Decimal] = {}
         self.risk_free_rate: Decimal = Decimal('0.05')  # 5% risk-free rate
@@ -264,6 +565,8 @@ class OptionsMarket:
             strike = (current_price * Decimal(str(multiplier))).quantize(strike_interval)
             strikes.append(strike)
         
+        chain = self.chains.setdefault(underlying, OptionChain(underlying))
+        
         # Create contracts for each combination
         for expiry in expiry_dates:
             for strike in strikes:
@@ -283,61 +586,237 @@ class OptionsMarket:
                         option_style=OptionStyle.AMERICAN
                     )
                     
-                    # Calculate initial pricing and Greeks
-                    self._update_option_pricing(contract)
-                    
                     self.contracts[symbol] = contract
+                    chain.add(contract)
+        
+        # Calculate initial pricing and Greeks for the whole chain at once
+        self._price_chain(chain)
     
-    def _update_option_pricing(self, contract: OptionContract):
-        """Update option pricing and Greeks using Black-Scholes"""
-        
-        underlying_price = self.underlying_prices.get(contract.underlying, Decimal('100'))
-        time_to_expiry = self._calculate_time_to_expiry(contract.expiry_date)
-        
-        # Estimate implied volatility based on underlying
-        volatility_map = {
-            'AAPL': Decimal('0.25'),   # 25%
-            'MSFT': Decimal('0.22'),   # 22%
-            'GOOGL': Decimal('0.28'),  # 28%
-            'TSLA': Decimal('0.45'),   # 45%
-            'SPY': Decimal('0.18'),    # 18%
-            'QQQ': Decimal('0.20'),    # 20%
-            'BTC': Decimal('0.80'),    # 80%
-            'ETH': Decimal('0.75')     # 75%
-        }
+    def _chain_position(self, contract: OptionContract) -> Tuple[OptionChain, int]:
+        """Chain and array position of a contract (registering it if needed)"""
+        chain = self.chains.get(contract.underlying)
+        if chain is None:
+            chain = self.chains[contract.underlying] = OptionChain(contract.underlying)
+        return chain, chain.add(contract)
+    
+    def _seed_surface(self, chain: OptionChain) -> VolatilitySurface:
+        """
+        Starting surface on the chain's own strikes and expiries: base volatility
+        near the money and 20% higher on the out-of-the-money wings
+        """
+        strikes, expiries, _ = chain.arrays()
+        strike_axis = np.unique(strikes)
+        expiry_axis = np.unique(expiries)
         
-        implied_vol = volatility_map.get(contract.underlying, Decimal('0.25'))
+        base = float(self.VOLATILITY_MAP.get(chain.underlying, Decimal('0.25')))
+        spot = float(self.underlying_prices.get(chain.underlying, Decimal('100')))
+        wing = (strike_axis < spot * 0.95) | (strike_axis > spot / 0.95)
+        smile = np.where(wing, base * 1.2, base)
         
-        # Adjust volatility based on moneyness and time to expiry
-        moneyness = underlying_price / contract.strike_price
-        if contract.option_type == OptionType.PUT:
-            moneyness = contract.strike_price / underlying_price
+        return VolatilitySurface(chain.underlying, strike_axis, expiry_axis,
+                                 np.tile(smile, (len(expiry_axis), 1)))
+    
+    def _surface(self, chain: OptionChain) -> VolatilitySurface:
+        surface = self.surfaces.get(chain.underlying)
+        if surface is None:
+            surface = self.surfaces[chain.underlying] = self._seed_surface(chain)
+        return surface
+    
+    def set_underlying_price(self, underlying: str, price: Decimal) -> None:
+        """Move an underlying's spot; only that underlying's contracts get repriced"""
+        self.underlying_prices[underlying] = price
+        self._pricing_key(underlying)
+    
+    def _pricing_key(self, underlying: str) -> Tuple[int, int, int]:
+        """Current (spot version, surface version, time bucket) for an underlying"""
+        # Direct writes to underlying_prices count as spot moves too
+        spot = self.underlying_prices.get(underlying, Decimal('100'))
+        if self._priced_spots.get(underlying) != spot:
+            self._priced_spots[underlying] = spot
+            self.spot_versions[underlying] = self.spot_versions.get(underlying, 0) + 1
+        
+        # A rate change invalidates every surface
+        if self._priced_rate != self.risk_free_rate:
+            self._priced_rate = self.risk_free_rate
+            for name in set(self.surface_versions) | set(self.chains):
+                self.surface_versions[name] = self.surface_versions.get(name, 0) + 1
+        
+        return (
+            self.spot_versions[underlying],
+            self.surface_versions.get(underlying, 0),
+            int(time.time() // self.pricing_time_bucket)
+        )
+    
+    def _ensure_priced(self, chain: OptionChain, positions: np.ndarray) -> Tuple[int, int, int]:
+        """Reprice only the given contracts whose cached pricing is stale; returns the key"""
+        key = self._pricing_key(chain.underlying)
+        stale = chain.stale_positions(positions, key)
+        if len(stale):
+            self._price_chain(chain, stale, key)
+        return key
+    
+    def _price_chain(self, chain: OptionChain, positions: Optional[np.ndarray] = None,
+                     key: Optional[Tuple[int, int, int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Reprice contracts of a chain (all of them by default) in one vectorised
+        call and write premiums, implied vols and Greeks back to the contracts
+        """
+        if key is None:
+            key = self._pricing_key(chain.underlying)
+        strikes, expiries, is_call = chain.arrays()
+        if positions is not None:
+            strikes, expiries, is_call = strikes[positions], expiries[positions], is_call[positions]
+        else:
+            positions = np.arange(len(chain.contracts))
         
-        # Volatility smile - higher vol for OTM options
-        if moneyness < Decimal('0.95'):
-            implied_vol *= Decimal('1.2')  # 20% higher for OTM
-        elif moneyness > Decimal('1.05'):
-            implied_vol *= Decimal('1.1')  # 10% higher for ITM
+        spot = float(self.underlying_prices.get(chain.underlying, Decimal('100')))
+        time_to_expiry = self._time_to_expiry_years(expiries)
+        sigma = self._surface(chain).volatility(strikes, expiries)
         
-        # Calculate premium and Greeks
-        premium = BlackScholesCalculator.calculate_option_price(
-            underlying_price, contract.strike_price, time_to_expiry,
-            self.risk_free_rate, implied_vol, contract.option_type
+        result = BlackScholesCalculator.calculate_chain(
+            spot, strikes, time_to_expiry, float(self.risk_free_rate), sigma, is_call
         )
         
-        greeks = BlackScholesCalculator.calculate_greeks(
-            underlying_price, contract.strike_price, time_to_expiry,
-            self.risk_free_rate, implied_vol, contract.option_type
+        # Decimal conversion only when writing back to the contracts
+        four_places, two_places = Decimal('0.0001'), Decimal('0.01')
+        for position, volatility, premium, delta, gamma, theta, vega, rho in zip(
+            positions.tolist(), sigma.tolist(), result["premium"].tolist(), result["delta"].tolist(),
+            result["gamma"].tolist(), result["theta"].tolist(), result["vega"].tolist(), result["rho"].tolist()
+        ):
+            contract = chain.contracts[position]
+            contract.premium = Decimal(repr(premium))
+            contract.implied_volatility = Decimal(repr(volatility))
+            contract.delta = Decimal(repr(delta)).quantize(four_places)
+            contract.gamma = Decimal(repr(gamma)).quantize(four_places)
+            contract.theta = Decimal(repr(theta)).quantize(two_places)
+            contract.vega = Decimal(repr(vega)).quantize(two_places)
+            contract.rho = Decimal(repr(rho)).quantize(two_places)
+        
+        chain.priced_keys[positions] = key
+        return result
+    
+    @staticmethod
+    def _time_to_expiry_years(expiries: np.ndarray) -> np.ndarray:
+        """Years to expiry for expiry timestamps (same 8.76 hour floor as _calculate_time_to_expiry)"""
+        now = (datetime.now() - _EPOCH).total_seconds()
+        return np.maximum((expiries - now) / _SECONDS_PER_YEAR, 0.001)
+    
+    def calibrate_surfaces(self, quotes: Optional[Dict[str, Decimal]] = None,
+                           underlyings: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Back out implied volatilities from premiums and rebuild the surfaces
+        quotes maps contract symbols to premiums; without it each contract's
+        last traded premium is used. Every quote in the market is inverted in
+        a single batched solve; grid nodes without a usable quote keep their
+        current volatility. Only recalibrated underlyings get repriced
+        """
+        tick = 0.01
+        start_time = time.perf_counter()
+        names = underlyings if underlyings is not None else list(self.chains)
+        
+        # Gather quotes across all chains into flat arrays
+        gathered = []
+        for underlying in names:
+            chain = self.chains.get(underlying)
+            if chain is None:
+                continue
+            positions, premiums = [], []
+            for position, contract in enumerate(chain.contracts):
+                premium = quotes.get(contract.symbol) if quotes is not None else contract.last_premium
+                # Quotes at the minimum premium say nothing about volatility
+                if premium is not None and premium > tick:
+                    positions.append(position)
+                    premiums.append(float(premium))
+            if positions:
+                gathered.append((chain, np.array(positions), np.array(premiums)))
+        
+        if not gathered:
+            return {"status": "no_quotes", "underlyings": [], "quotes": 0, "solved": 0, "used": 0}
+        
+        strikes, expiries, is_call, spots, premiums = [], [], [], [], []
+        for chain, positions, chain_premiums in gathered:
+            chain_strikes, chain_expiries, chain_is_call = chain.arrays()
+            strikes.append(chain_strikes[positions])
+            expiries.append(chain_expiries[positions])
+            is_call.append(chain_is_call[positions])
+            spots.append(np.full(len(positions), float(self.underlying_prices.get(chain.underlying, Decimal('100')))))
+            premiums.append(chain_premiums)
+        
+        strikes, expiries, is_call = np.concatenate(strikes), np.concatenate(expiries), np.concatenate(is_call)
+        spots, time_to_expiry = np.concatenate(spots), self._time_to_expiry_years(expiries)
+        rate = float(self.risk_free_rate)
+        volatilities = BlackScholesCalculator.implied_volatility_chain(
+            np.concatenate(premiums), spots, strikes, time_to_expiry, rate, is_call
         )
+        solved = np.flatnonzero(~np.isnan(volatilities))
         
-        # Update contract
-        contract.premium = premium
-        contract.implied_volatility = implied_vol
-        contract.delta = greeks.delta
-        contract.gamma = greeks.gamma
-        contract.theta = greeks.theta
-        contract.vega = greeks.vega
-        contract.rho = greeks.rho
+        # Neither do quotes whose premium moves by less than a tick per vol point
+        _, vega = BlackScholesCalculator._price_and_vega(
+            spots[solved], strikes[solved], time_to_expiry[solved], rate, volatilities[solved], is_call[solved]
+        )
+        usable = np.zeros(len(volatilities), dtype=bool)
+        usable[solved] = vega * 0.01 >= tick
+        
+        # Split the solve back out per underlying
+        calibrated = []
+        offset = 0
+        for chain, positions, _ in gathered:
+            segment = slice(offset, offset + len(positions))
+            offset += len(positions)
+            points = usable[segment]
+            if not points.any():
+                continue
+            
+            surface = self._surface(chain).with_points(
+                strikes[segment][points], expiries[segment][points], volatilities[segment][points]
+            )
+            surface.calibrated_at = datetime.now()
+            self.surfaces[chain.underlying] = surface
+            self.surface_versions[chain.underlying] = self.surface_versions.get(chain.underlying, 0) + 1
+            calibrated.append(chain.underlying)
+        
+        return {
+            "status": "calibrated" if calibrated else "unsolved",
+            "underlyings": calibrated,
+            "quotes": len(volatilities),
+            "solved": len(solved),
+            "used": int(np.count_nonzero(usable)),
+            "elapsed_ms": (time.perf_counter() - start_time) * 1000
+        }
+    
+    def get_volatility_surface(self, underlying: str) -> Dict[str, Any]:
+        """Surface grid for an underlying (volatilities indexed [expiry][strike])"""
+        chain = self.chains.get(underlying)
+        if chain is None:
+            return {"error": "Unknown underlying"}
+        
+        surface = self._surface(chain)
+        return {
+            "underlying": underlying,
+            "strikes": [str(Decimal(repr(k))) for k in surface.strikes.tolist()],
+            "expiries": [(_EPOCH + timedelta(seconds=e)).isoformat() for e in surface.expiries.tolist()],
+            "volatilities": surface.volatilities.round(6).tolist(),
+            "calibrated_at": surface.calibrated_at.isoformat() if surface.calibrated_at else None
+        }
+    
+    def reprice_underlying(self, underlying: str) -> int:
+        """Reprice every contract on an underlying (e.g. after a spot move); returns the count"""
+        chain = self.chains.get(underlying)
+        if chain is None or not chain.contracts:
+            return 0
+        self._price_chain(chain)
+        return len(chain.contracts)
+    
+    def _update_option_pricing(self, contract: OptionContract) -> Tuple[int, int, int]:
+        """Update option pricing and Greeks (cached until spot, surface or time bucket move)"""
+        chain, position = self._chain_position(contract)
+        return self._ensure_priced(chain, np.array([position]))
+    
+    def _record_position_change(self, agent_id: str, contract: OptionContract,
+                                quantity_change: int, key: Optional[Tuple[int, int, int]]) -> None:
+        if quantity_change:
+            book = self.portfolio_greeks.setdefault(agent_id, PortfolioGreeks())
+            book.apply_change(contract, quantity_change, key)
     
     def _calculate_time_to_expiry(self, expiry_date: datetime) -> Decimal:
         """Calculate time to expiry in years"""
@@ -356,7 +835,7 @@ class OptionsMarket:
         contract = self.contracts[contract_symbol]
         
         # Update pricing before execution
-        self._update_option_pricing(contract)
+        pricing_key = self._update_option_pricing(contract)
         
         execution_premium = premium or contract.premium
         
@@ -378,6 +857,7 @@ class OptionsMarket:
             )
         
         position = self.positions[agent_id][contract_symbol]
+        previous_quantity = position.quantity
         
         # Update position
         if position.quantity == 0:
@@ -397,7 +877,9 @@ class OptionsMarket:
                     position.premium_paid = Decimal('0')
         
         position.current_premium = execution_premium
+        contract.last_premium = execution_premium
         position.unrealized_pnl = (position.current_premium - position.premium_paid) * position.quantity * contract.contract_size
+        self._record_position_change(agent_id, contract, position.quantity - previous_quantity, pricing_key)
         
         # Update contract statistics
         contract.volume += abs(quantity)
@@ -454,6 +936,7 @@ class OptionsMarket:
         # Update position
         position.quantity -= quantity
         position.exercise_status = ExerciseStatus.EXERCISED
+        self._record_position_change(agent_id, contract, -quantity, self._update_option_pricing(contract))
         
         # Calculate realized P&L
         cost_basis = position.premium_paid * quantity * contract.contract_size
@@ -476,15 +959,20 @@ class OptionsMarket:
         
         chain = {"calls": [], "puts": []}
         
-        for symbol, contract in self.contracts.items():
-            if contract.underlying != underlying:
-                continue
-            
-            if expiry_date and contract.expiry_date.date() != expiry_date.date():
-                continue
-            
-            # Update pricing
-            self._update_option_pricing(contract)
+        option_chain = self.chains.get(underlying)
+        contracts = option_chain.contracts if option_chain else []
+        selected = [
+            position for position, contract in enumerate(contracts)
+            if not expiry_date or contract.expiry_date.date() == expiry_date.date()
+        ]
+        
+        # Reprice whatever is stale among the selected contracts in one call
+        if selected:
+            self._ensure_priced(option_chain, np.array(selected))
+        
+        for position in selected:
+            contract = contracts[position]
+            symbol = contract.symbol
             
             option_data = {
                 "symbol": symbol,
@@ -521,38 +1009,24 @@ class OptionsMarket:
     def calculate_portfolio_greeks(self, agent_id: str) -> Dict[str, Decimal]:
         """Calculate portfolio-level Greeks for an agent"""
         
-        if agent_id not in self.positions:
-            return {
-                "delta": Decimal('0'),
-                "gamma": Decimal('0'),
-                "theta": Decimal('0'),
-                "vega": Decimal('0'),
-                "rho": Decimal('0')
-            }
+        portfolio_greeks = {greek: Decimal('0') for greek in PortfolioGreeks.GREEKS}
         
-        portfolio_greeks = {
-            "delta": Decimal('0'),
-            "gamma": Decimal('0'),
-            "theta": Decimal('0'),
-            "vega": Decimal('0'),
-            "rho": Decimal('0')
-        }
+        book = self.portfolio_greeks.get(agent_id)
+        if book is None:
+            return portfolio_greeks
         
-        for contract_symbol, position in self.positions[agent_id].items():
-            if position.quantity == 0:
+        for underlying, held in book.multipliers.items():
+            if not held:
                 continue
             
-            contract = self.contracts[contract_symbol]
-            self._update_option_pricing(contract)
-            
-            # Weight Greeks by position size
-            multiplier = Decimal(str(position.quantity)) * contract.contract_size
+            # Reprice stale held contracts, then refresh totals only if the key moved
+            chain = self.chains[underlying]
+            key = self._ensure_priced(chain, np.array([chain.positions[symbol] for symbol in held]))
+            if book.keys.get(underlying) != key:
+                book.recompute(underlying, self.contracts, key)
             
-            portfolio_greeks["delta"] += contract.delta * multiplier
-            portfolio_greeks["gamma"] += contract.gamma * multiplier
-            portfolio_greeks["theta"] += contract.theta * multiplier
-            portfolio_greeks["vega"] += contract.vega * multiplier
-            portfolio_greeks["rho"] += contract.rho * multiplier
+            for greek, value in book.totals[underlying].items():
+                portfolio_greeks[greek] += value
         
         return portfolio_greeks
     
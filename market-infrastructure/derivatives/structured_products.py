@@ -16,6 +16,9 @@ import logging
 from datetime import datetime, timedelta
 import math
 import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.special import ndtr, ndtri
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -105,12 +108,206 @@ class StructuredProduct:
     returns: List[Decimal] = field(default_factory=list)
     volatility: Decimal = field(default=Decimal('0'))
     max_drawdown: Decimal = field(default=Decimal('0'))
+    valuation_error: Decimal = field(default=Decimal('0'))  # Monte Carlo standard error of fair_value
+
+@dataclass
+class MonteCarloResult:
+    """Monte Carlo estimate (one value per payoff column) with standard errors"""
+    values: np.ndarray
+    standard_errors: np.ndarray
+    paths: int
+    chunks: int
+    elapsed_seconds: float
+    within_budget: bool  # Every requested path was simulated before the time budget ran out
+    
+    @property
+    def value(self) -> float:
+        return float(self.values[0])
+    
+    @property
+    def standard_error(self) -> float:
+        return float(self.standard_errors[0])
+
+# Monte Carlo kernels live at module level so chunks can be shipped to a process
+# pool. Each takes (rng, samples, params, antithetic) and returns (payoffs,
+# controls): payoffs has one row per sample with antithetic pairs already
+# averaged, controls is None or one value per sample
+
+def _standard_normals(rng: np.random.Generator, samples: int, shape: Tuple[int, ...],
+                      antithetic: bool) -> np.ndarray:
+    """Normals for the samples; antithetic draws are stacked as [z, -z]"""
+    z = rng.standard_normal((samples,) + shape)
+    return np.concatenate([z, -z]) if antithetic else z
+
+def _pair_mean(values: np.ndarray, samples: int, antithetic: bool) -> np.ndarray:
+    return 0.5 * (values[:samples] + values[samples:]) if antithetic else values
+
+def _gbm_prices(rng: np.random.Generator, samples: int, params: Dict[str, Any],
+                antithetic: bool) -> np.ndarray:
+    """Geometric Brownian motion prices at each step (paths x steps)"""
+    steps, vol = params["steps"], params["vol"]
+    dt = params["T"] / steps
+    z = _standard_normals(rng, samples, (steps,), antithetic)
+    log_increments = (params["rate"] - 0.5 * vol * vol) * dt + vol * math.sqrt(dt) * z
+    return params["spot"] * np.exp(np.cumsum(log_increments, axis=1))
+
+def _vanilla_payoff(prices: np.ndarray, strike: float, is_call: bool) -> np.ndarray:
+    return np.maximum(prices - strike, 0.0) if is_call else np.maximum(strike - prices, 0.0)
+
+def _barrier_kernel(rng, samples, params, antithetic):
+    """Knock-in/knock-out payoff with daily monitoring; control is the vanilla payoff"""
+    prices = _gbm_prices(rng, samples, params, antithetic)
+    discount = math.exp(-params["rate"] * params["T"])
+    vanilla = discount * _vanilla_payoff(prices[:, -1], params["strike"], params["is_call"])
+    
+    barrier = params["barrier"]
+    if barrier > params["spot"]:
+        hit = prices.max(axis=1) >= barrier
+    else:
+        hit = prices.min(axis=1) <= barrier
+    payoff = np.where(hit, vanilla, 0.0) if params["knock_in"] else np.where(hit, 0.0, vanilla)
+    
+    return (_pair_mean(payoff, samples, antithetic)[:, None],
+            _pair_mean(vanilla, samples, antithetic))
+
+def _asian_kernel(rng, samples, params, antithetic):
+    """Arithmetic average payoff; control is the geometric average payoff"""
+    prices = _gbm_prices(rng, samples, params, antithetic)[:, -params["window"]:]
+    discount = math.exp(-params["rate"] * params["T"])
+    arithmetic = discount * _vanilla_payoff(prices.mean(axis=1), params["strike"], params["is_call"])
+    geometric = discount * _vanilla_payoff(np.exp(np.log(prices).mean(axis=1)), params["strike"], params["is_call"])
+    
+    return (_pair_mean(arithmetic, samples, antithetic)[:, None],
+            _pair_mean(geometric, samples, antithetic))
+
+def _variance_swap_kernel(rng, samples, params, antithetic):
+    """Realised variance payoff in variance points; control is the mean squared shock"""
+    steps, vol = params["steps"], params["vol"]
+    dt = params["T"] / steps
+    z = _standard_normals(rng, samples, (steps,), antithetic)
+    log_returns = (params["rate"] - 0.5 * vol * vol) * dt + vol * math.sqrt(dt) * z
+    
+    realized_variance = (log_returns * log_returns).sum(axis=1) / params["T"] * 10000
+    payoff = math.exp(-params["rate"] * params["T"]) * (realized_variance - params["variance_strike"])
+    
+    return (_pair_mean(payoff, samples, antithetic)[:, None],
+            _pair_mean((z * z).mean(axis=1), samples, antithetic))
+
+def _tranche_loss_kernel(rng, samples, params, antithetic):
+    """
+    Gaussian-copula defaults over the horizon; payoffs are each tranche's loss
+    as a fraction of pool notional, control is the pool loss
+    """
+    latent = _standard_normals(rng, samples, (len(params["thresholds"]),), antithetic) @ params["cholesky"].T
+    defaulted = latent <= params["thresholds"]
+    pool_loss = defaulted @ params["loss_given_default"]
+    
+    attachment, detachment = params["attachment"], params["detachment"]
+    tranche_loss = np.clip(pool_loss[:, None] - attachment, 0.0, detachment - attachment)
+    
+    return (_pair_mean(tranche_loss, samples, antithetic),
+            _pair_mean(pool_loss, samples, antithetic))
+
+def _simulate_chunk(kernel, params: Dict[str, Any], seed: np.random.SeedSequence,
+                    samples: int, antithetic: bool) -> tuple:
+    """Run one chunk and reduce it to the sums the estimator needs"""
+    payoffs, controls = kernel(np.random.default_rng(seed), samples, params, antithetic)
+    if controls is None:
+        controls = np.zeros(len(payoffs))
+    return (
+        len(payoffs),
+        payoffs.sum(axis=0),
+        (payoffs * payoffs).sum(axis=0),
+        controls.sum(),
+        (controls * controls).sum(),
+        (payoffs * controls[:, None]).sum(axis=0)
+    )
+
+class MonteCarloEngine:
+    """
+    Shared vectorised Monte Carlo engine for exotic and structured products
+    Paths are simulated in fixed-size chunks so memory stays bounded. Each chunk
+    draws from its own generator spawned off the engine seed, so a seeded run
+    gives the same numbers inline or on a process pool. No new chunks start
+    once the time budget is spent (at least one always runs)
+    """
+    
+    def __init__(self, seed: Optional[int] = None, paths: int = 50000, chunk_size: int = 10000,
+                 time_budget: float = 1.0, antithetic: bool = True, workers: int = 0):
+        self.paths = paths
+        self.chunk_size = chunk_size
+        self.time_budget = time_budget
+        self.antithetic = antithetic
+        self.workers = workers
+        self._seeds = np.random.SeedSequence(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def run(self, kernel, params: Dict[str, Any], control_mean: Optional[float] = None,
+            paths: Optional[int] = None, time_budget: Optional[float] = None) -> MonteCarloResult:
+        """
+        Estimate the expected payoffs of a kernel; with control_mean the kernel's
+        control is applied as a control variate with the optimal coefficient
+        """
+        start_time = time.perf_counter()
+        paths = paths or self.paths
+        budget = self.time_budget if time_budget is None else time_budget
+        
+        paths_per_sample = 2 if self.antithetic else 1
+        samples_per_chunk = max(self.chunk_size // paths_per_sample, 1)
+        chunk_count = max(math.ceil(paths / (samples_per_chunk * paths_per_sample)), 1)
+        seeds = self._seeds.spawn(1)[0].spawn(chunk_count)
+        
+        # Run chunks inline, or a pool-sized wave at a time, until done or out of time
+        sums = []
+        wave = max(self.workers, 1)
+        while len(sums) < chunk_count:
+            batch = seeds[len(sums):len(sums) + wave]
+            if self.workers > 0:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                futures = [self._pool.submit(_simulate_chunk, kernel, params, seed, samples_per_chunk, self.antithetic)
+                           for seed in batch]
+                sums.extend(future.result() for future in futures)
+            else:
+                sums.extend(_simulate_chunk(kernel, params, seed, samples_per_chunk, self.antithetic)
+                            for seed in batch)
+            if time.perf_counter() - start_time >= budget:
+                break
+        
+        n = sum(s[0] for s in sums)
+        mean = sum(s[1] for s in sums) / n
+        variance = sum(s[2] for s in sums) / n - mean * mean
+        
+        if control_mean is not None:
+            control = sum(s[3] for s in sums) / n
+            control_variance = sum(s[4] for s in sums) / n - control * control
+            if control_variance > 0:
+                covariance = sum(s[5] for s in sums) / n - mean * control
+                beta = covariance / control_variance
+                mean = mean - beta * (control - control_mean)
+                variance = variance - covariance * covariance / control_variance
+        
+        return MonteCarloResult(
+            values=mean,
+            standard_errors=np.sqrt(np.maximum(variance, 0.0) / max(n - 1, 1)),
+            paths=n * paths_per_sample,
+            chunks=len(sums),
+            elapsed_seconds=time.perf_counter() - start_time,
+            within_budget=len(sums) == chunk_count
+        )
+    
+    def close(self) -> None:
+        """Shut down the process pool, if one was started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
 class CDOEngine:
     """Collateralized Debt Obligation implementation"""
     
-    def __init__(self):
+    def __init__(self, monte_carlo: Optional[MonteCarloEngine] = None):
         self.cdos: Dict[str, StructuredProduct] = {}
+        self.monte_carlo = monte_carlo or MonteCarloEngine()
         self.correlation_matrix: Dict[Tuple[str, str], Decimal] = {}
         
         # Initialize default asset pool
@@ -263,60 +460,59 @@ class CDOEngine:
     def _calculate_cdo_valuation(self, cdo: StructuredProduct):
         """Calculate CDO valuation using Monte Carlo simulation"""
         
-        # Simplified valuation - in practice would use sophisticated Monte Carlo
-        total_expected_loss = Decimal('0')
+        years = max((cdo.maturity_date - datetime.now()).total_seconds() / (365.25 * 24 * 3600), 0.0)
+        recovery_rate = 0.4
         
-        for asset in cdo.underlying_assets:
-            expected_loss = asset.weight * asset.default_probability * (Decimal('1') - Decimal('0.4'))  # 40% recovery
-            total_expected_loss += expected_loss
+        # Default by maturity when the asset's latent Gaussian falls below its threshold
+        annual_default = np.array([float(a.default_probability) for a in cdo.underlying_assets])
+        horizon_default = 1 - (1 - annual_default) ** years
+        loss_given_default = np.array([float(a.weight) for a in cdo.underlying_assets]) * (1 - recovery_rate)
         
-        # Apply correlation adjustment
-        correlation_adj = self._calculate_correlation_adjustment(cdo.underlying_assets)
-        adjusted_expected_loss = total_expected_loss * correlation_adj
+        params = {
+            "thresholds": ndtri(horizon_default),
+            "cholesky": np.linalg.cholesky(self._correlation_matrix(cdo.underlying_assets)),
+            "loss_given_default": loss_given_default,
+            "attachment": np.array([float(t.attachment_point) for t in cdo.tranches]),
+            "detachment": np.array([float(t.detachment_point) for t in cdo.tranches])
+        }
+        result = self.monte_carlo.run(_tranche_loss_kernel, params,
+                                      control_mean=float(horizon_default @ loss_given_default))
         
-        # Value each tranche
-        for tranche in cdo.tranches:
-            # Calculate expected loss for this tranche
-            tranche_loss = max(Decimal('0'), 
-                             min(adjusted_expected_loss - tranche.attachment_point,
-                                 tranche.detachment_point - tranche.attachment_point))
-            
-            tranche.losses = tranche_loss * cdo.notional
+        # Value each tranche from its expected loss
+        for tranche, expected_loss in zip(cdo.tranches, result.values.tolist()):
+            tranche.losses = Decimal(repr(max(expected_loss, 0.0))) * cdo.notional
             tranche.outstanding = max(Decimal('0'), tranche.notional - tranche.losses)
         
         # Calculate total CDO value
         cdo.current_value = sum(t.outstanding for t in cdo.tranches)
         cdo.fair_value = cdo.current_value
+        cdo.valuation_error = Decimal(repr(float(np.sqrt((result.standard_errors ** 2).sum())))) * cdo.notional
     
-    def _calculate_correlation_adjustment(self, assets: List[UnderlyingAsset]) -> Decimal:
-        """Calculate correlation adjustment factor"""
-        
-        if len(assets) <= 1:
-            return Decimal('1.0')
-        
-        # Simplified correlation calculation
-        avg_correlation = Decimal('0')
-        count = 0
-        
-        for i, asset1 in enumerate(assets):
-            for j, asset2 in enumerate(assets):
-                if i < j:
-                    corr = self.correlation_matrix.get((asset1.asset_id, asset2.asset_id), Decimal('0.3'))
-                    avg_correlation += corr
-                    count += 1
-        
-        if count > 0:
-            avg_correlation /= count
-        
-        # Higher correlation increases systemic risk
-        return Decimal('1.0') + avg_correlation * Decimal('0.5')
+    def _correlation_matrix(self, assets: List[UnderlyingAsset]) -> np.ndarray:
+        """Asset correlation matrix, repaired to the nearest valid one if needed"""
+        
+        matrix = np.array([
+            [1.0 if i == j else float(self.correlation_matrix.get((a.asset_id, b.asset_id), Decimal('0.3')))
+             for j, b in enumerate(assets)]
+            for i, a in enumerate(assets)
+        ])
+        
+        # Pairwise estimates need not be positive definite: clip eigenvalues, restore unit diagonal
+        eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+        if eigenvalues.min() < 1e-8:
+            matrix = eigenvectors @ np.diag(np.maximum(eigenvalues, 1e-8)) @ eigenvectors.T
+            scale = np.sqrt(np.diag(matrix))
+            matrix = matrix / np.outer(scale, scale)
+        return matrix
 
 class ExoticOptionsEngine:
     """Implementation of exotic options and structured derivatives"""
     
-    def __init__(self):
+    def __init__(self, monte_carlo: Optional[MonteCarloEngine] = None):
         self.exotic_options: Dict[str, StructuredProduct] = {}
         self.market_data: Dict[str, Decimal] = {}
+        self.monte_carlo = monte_carlo or MonteCarloEngine()
+        self.risk_free_rate = 0.05
         
         # Initialize market data
         self._initialize_market_data()
@@ -473,94 +669,135 @@ class ExoticOptionsEngine:
         
         return swap_id
     
+    @staticmethod
+    def _years_to_maturity(product: StructuredProduct) -> float:
+        return max((product.maturity_date - datetime.now()).total_seconds() / (365.25 * 24 * 3600), 0.0)
+    
+    @staticmethod
+    def _set_value(product: StructuredProduct, value: float, standard_error: float = 0.0):
+        product.current_value = Decimal(repr(value))
+        product.fair_value = product.current_value
+        product.valuation_error = Decimal(repr(standard_error))
+    
     def _price_barrier_option(self, option: StructuredProduct):
-        """Price barrier option using closed-form approximation"""
+        """Price barrier option by Monte Carlo with daily barrier monitoring"""
         
-        S = option.underlying_assets[0].current_price
-        K = option.barrier_data["strike"]
-        B = option.barrier_data["barrier"]
-        vol = option.underlying_assets[0].volatility
-        T = (option.maturity_date - datetime.now()).days / 365.25
-        r = Decimal("0.05")  # Risk-free rate
+        asset = option.underlying_assets[0]
+        data = option.barrier_data
+        S, K, B = float(asset.current_price), float(data["strike"]), float(data["barrier"])
+        vol = float(asset.volatility)
+        T = self._years_to_maturity(option)
+        r = self.risk_free_rate
+        knock_in = data["barrier_type"] == "knock_in"
         
-        # Simplified Black-Scholes adjustment for barrier
-        vanilla_price = self._black_scholes_price(S, K, T, r, vol, option.barrier_data["option_type"])
+        vanilla_price = self._black_scholes_value(S, K, T, r, vol, data["option_type"])
         
-        # Barrier adjustment (simplified)
-        if option.barrier_data["barrier_type"] == "knock_out":
-            # Reduce price for knock-out feature
-            barrier_adj = Decimal("0.7") if abs(S - B) / S < Decimal("0.1") else Decimal("0.9")
-        else:  # knock_in
-            # Increase price for knock-in feature
-            barrier_adj = Decimal("1.3") if abs(S - B) / S < Decimal("0.1") else Decimal("1.1")
+        # A knocked-in option is now a vanilla, a knocked-out one is worthless
+        if data["has_knocked"]:
+            self._set_value(option, vanilla_price if knock_in else 0.0)
+            return
         
-        option.current_value = vanilla_price * barrier_adj
-        option.fair_value = option.current_value
+        # Expired without touching the barrier
+        if T <= 0:
+            self._set_value(option, 0.0 if knock_in else vanilla_price)
+            return
+        
+        params = {
+            "spot": S, "strike": K, "barrier": B, "vol": vol, "rate": r, "T": T,
+            "steps": max(round(T * 365.25), 1),
+            "is_call": data["option_type"] == "call",
+            "knock_in": knock_in
+        }
+        result = self.monte_carlo.run(_barrier_kernel, params, control_mean=vanilla_price)
+        self._set_value(option, max(result.value, 0.0), result.standard_error)
     
     def _price_asian_option(self, option: StructuredProduct):
-        """Price Asian option using approximation"""
+        """Price arithmetic Asian option by Monte Carlo with a geometric-average control"""
         
-        S = option.underlying_assets[0].current_price
-        K = option.asian_data["strike"]
-        vol = option.underlying_assets[0].volatility
-        T = (option.maturity_date - datetime.now()).days / 365.25
-        r = Decimal("0.05")
+        asset = option.underlying_assets[0]
+        data = option.asian_data
+        S, K, vol = float(asset.current_price), float(data["strike"]), float(asset.volatility)
+        T = self._years_to_maturity(option)
+        r = self.risk_free_rate
         
-        # Reduce volatility for Asian option (path dependence reduces volatility)
-        asian_vol = vol * Decimal("0.6")  # Simplified reduction
-        
-        asian_price = self._black_scholes_price(S, K, T, r, asian_vol, option.asian_data["option_type"])
-        
-        option.current_value = asian_price
-        option.fair_value = asian_price
+        if T <= 0:
+            average = float(data["current_average"])
+            self._set_value(option, self._black_scholes_value(average, K, T, r, vol, data["option_type"]))
+            return
+        
+        # Daily observations, averaged over the final averaging period
+        steps = max(round(T * 365.25), 1)
+        window = min(max(data["averaging_period_days"], 1), steps)
+        
+        params = {
+            "spot": S, "strike": K, "vol": vol, "rate": r, "T": T,
+            "steps": steps, "window": window,
+            "is_call": data["option_type"] == "call"
+        }
+        geometric_price = self._geometric_asian_value(S, K, T, r, vol, steps, window, data["option_type"])
+        result = self.monte_carlo.run(_asian_kernel, params, control_mean=geometric_price)
+        self._set_value(option, max(result.value, 0.0), result.standard_error)
     
     def _price_variance_swap(self, swap: StructuredProduct):
-        """Price variance swap"""
+        """Price variance swap as the discounted expected realised variance payoff"""
         
-        vol = swap.underlying_assets[0].volatility
-        variance_strike = swap.variance_data["variance_strike"]
-        T = (swap.maturity_date - datetime.now()).days / 365.25
+        vol = float(swap.underlying_assets[0].volatility)
+        variance_strike = float(swap.variance_data["variance_strike"])
+        T = self._years_to_maturity(swap)
         
-        # Current implied variance
-        implied_variance = vol * vol * 100 * 100  # Convert to variance points
-        
-        # Expected payout
-        expected_payout = (implied_variance - variance_strike) * swap.notional * T
+        if T <= 0:
+            payout = (float(swap.variance_data["realized_variance"]) - variance_strike) * float(swap.notional)
+            swap.variance_data["expected_payout"] = Decimal(repr(payout))
+            self._set_value(swap, payout)
+            return
+        
+        params = {
+            "spot": float(swap.underlying_assets[0].current_price), "vol": vol,
+            "rate": self.risk_free_rate, "T": T, "steps": max(round(T * 365.25), 1),
+            "variance_strike": variance_strike
+        }
+        result = self.monte_carlo.run(_variance_swap_kernel, params, control_mean=1.0)
         
-        swap.variance_data["expected_payout"] = expected_payout
-        swap.current_value = expected_payout
-        swap.fair_value = expected_payout
+        notional = float(swap.notional)
+        swap.variance_data["expected_payout"] = Decimal(repr(result.value * notional))
+        self._set_value(swap, result.value * notional, result.standard_error * notional)
     
-    def _black_scholes_price(self, S: Decimal, K: Decimal, T: Decimal, r: Decimal, 
-                           vol: Decimal, option_type: str) -> Decimal:
-        """Simplified Black-Scholes pricing"""
+    @staticmethod
+    def _black_scholes_value(S: float, K: float, T: float, r: float, vol: float, option_type: str) -> float:
+        """Unfloored Black-Scholes value (intrinsic value once expired)"""
         
         if T <= 0:
-            if option_type == "call":
-                return max(S - K, Decimal('0'))
-            else:
-                return max(K - S, Decimal('0'))
+            return max(S - K, 0.0) if option_type == "call" else max(K - S, 0.0)
         
-        # Convert to float for math operations
-        S_f = float(S)
-        K_f = float(K)
-        T_f = float(T)
-        r_f = float(r)
-        vol_f = float(vol)
+        d1 = (math.log(S / K) + (r + 0.5 * vol * vol) * T) / (vol * math.sqrt(T))
+        d2 = d1 - vol * math.sqrt(T)
         
-        d1 = (math.log(S_f / K_f) + (r_f + 0.5 * vol_f * vol_f) * T_f) / (vol_f * math.sqrt(T_f))
-        d2 = d1 - vol_f * math.sqrt(T_f)
+        if option_type == "call":
+            return S * ndtr(d1) - K * math.exp(-r * T) * ndtr(d2)
+        return K * math.exp(-r * T) * ndtr(-d2) - S * ndtr(-d1)
+    
+    @staticmethod
+    def _geometric_asian_value(S: float, K: float, T: float, r: float, vol: float,
+                               steps: int, window: int, option_type: str) -> float:
+        """Closed form for a discretely sampled geometric-average option over the last window steps"""
         
-        # Simplified normal CDF approximation
-        def norm_cdf(x):
-            return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+        dt = T / steps
+        start = T - window * dt
         
-        if option_type == "call":
-            price = S_f * norm_cdf(d1) - K_f * math.exp(-r_f * T_f) * norm_cdf(d2)
-        else:  # put
-            price = K_f * math.exp(-r_f * T_f) * norm_cdf(-d2) - S_f * norm_cdf(-d1)
+        # log of the geometric average is normal
+        mean_time = start + dt * (window + 1) / 2
+        variance_time = start + dt * (window + 1) * (2 * window + 1) / (6 * window)
+        mean = math.log(S) + (r - 0.5 * vol * vol) * mean_time
+        variance = vol * vol * variance_time
         
-        return Decimal(str(max(price, 0.01)))
+        d2 = (mean - math.log(K)) / math.sqrt(variance)
+        d1 = d2 + math.sqrt(variance)
+        forward = math.exp(mean + 0.5 * variance)
+        discount = math.exp(-r * T)
+        
+        if option_type == "call":
+            return discount * (forward * ndtr(d1) - K * ndtr(d2))
+        return discount * (K * ndtr(-d2) - forward * ndtr(-d1))
 
 class WeatherDerivatives:
     """Weather derivatives and catastrophe bonds"""
@@ -724,9 +961,11 @@ class WeatherDerivatives:
 class StructuredProductsMarket:
     """Comprehensive structured products market orchestrator"""
     
-    def __init__(self):
-        self.cdo_engine = CDOEngine()
-        self.exotic_options = ExoticOptionsEngine()
+    def __init__(self, monte_carlo: Optional[MonteCarloEngine] = None):
+        # One Monte Carlo engine (seed, path count, time budget) shared by every pricer
+        self.monte_carlo = monte_carlo or MonteCarloEngine()
+        self.cdo_engine = CDOEngine(self.monte_carlo)
+        self.exotic_options = ExoticOptionsEngine(self.monte_carlo)
         self.weather_derivatives = WeatherDerivatives()
         
         self.all_products: Dict[str, StructuredProduct] = {}
@@ -8,15 +8,16 @@ import asyncio
 import sys
 import os
 from decimal import Decimal
+import numpy as np
 
 # Add the derivatives directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import all market modules
 from futures_market import FuturesMarket
-from options_market import OptionsMarket
+from options_market import OptionsMarket, BlackScholesCalculator, OptionType
 from swaps_market import SwapsMarket
-from structured_products import StructuredProductsMarket
+from structured_products import StructuredProductsMarket, ExoticOptionsEngine, MonteCarloEngine, _variance_swap_kernel
 
 async def test_futures_market():
     """Test futures market implementation"""
@@ -61,6 +62,119 @@ async def test_options_market():
     
     return True
 
+async def test_option_chain_pricing():
+    """Test vectorised chain pricing against the scalar Black-Scholes path"""
+    print("🧮 Testing Option Chain Pricing...")
+    
+    options_market = OptionsMarket()
+    
+    # Every contract on the underlying is repriced in one call after a spot move
+    options_market.underlying_prices["TSLA"] = Decimal("262.50")
+    repriced = options_market.reprice_underlying("TSLA")
+    assert repriced == len(options_market.chains["TSLA"].contracts) == 260
+    
+    for contract in options_market.chains["TSLA"].contracts[::37]:
+        T = options_market._calculate_time_to_expiry(contract.expiry_date)
+        args = (Decimal("262.50"), contract.strike_price, T, options_market.risk_free_rate,
+                contract.implied_volatility, contract.option_type)
+        premium = BlackScholesCalculator.calculate_option_price(*args)
+        greeks = BlackScholesCalculator.calculate_greeks(*args)
+        
+        assert abs(contract.premium - premium) <= premium * Decimal("1e-6")
+        assert contract.delta == greeks.delta and contract.gamma == greeks.gamma
+        assert contract.vega == greeks.vega
+    
+    # Expired contracts are worth intrinsic value with zero Greeks
+    expired = BlackScholesCalculator.calculate_chain(100.0, [90.0, 110.0], 0.0, 0.05, 0.2, [True, False])
+    assert list(expired["premium"]) == [10.0, 10.0]
+    assert list(expired["delta"]) == [0.0, 0.0]
+    
+    print(f"✅ Repriced {repriced} TSLA contracts in one vectorised call")
+    
+    return True
+
+async def test_portfolio_greeks_cache():
+    """Test cached repricing and incrementally maintained portfolio Greeks"""
+    print("📐 Testing Portfolio Greeks Cache...")
+    
+    options_market = OptionsMarket()
+    spot = options_market.underlying_prices["AAPL"]
+    aapl = sorted(options_market.chains["AAPL"].contracts, key=lambda c: abs(c.strike_price - spot))[:3]
+    msft = options_market.chains["MSFT"].contracts[:2]
+    
+    for contract in aapl + msft:
+        result = await options_market.place_option_order("fund_001", contract.symbol, 4)
+        assert result["status"] == "filled"
+    await options_market.place_option_order("fund_001", aapl[0].symbol, -4)
+    
+    def full_recompute():
+        totals = {greek: Decimal("0") for greek in ("delta", "gamma", "theta", "vega", "rho")}
+        for symbol, position in options_market.positions["fund_001"].items():
+            contract = options_market.contracts[symbol]
+            for greek in totals:
+                totals[greek] += getattr(contract, greek) * position.quantity * contract.contract_size
+        return totals
+    
+    greeks = options_market.calculate_portfolio_greeks("fund_001")
+    assert greeks == full_recompute()
+    
+    # A spot move only invalidates contracts on that underlying
+    msft_key = tuple(options_market.chains["MSFT"].priced_keys[0])
+    options_market.set_underlying_price("AAPL", options_market.underlying_prices["AAPL"] * Decimal("1.05"))
+    moved = options_market.calculate_portfolio_greeks("fund_001")
+    assert moved == full_recompute()
+    assert moved["delta"] != greeks["delta"]
+    assert tuple(options_market.chains["MSFT"].priced_keys[0]) == msft_key
+    
+    print(f"✅ Portfolio delta {greeks['delta']} -> {moved['delta']} after AAPL move")
+    
+    return True
+
+async def test_volatility_surface_calibration():
+    """Test batched implied volatility inversion and surface calibration"""
+    print("🌋 Testing Volatility Surface Calibration...")
+    
+    # Round trip through the batched solver
+    sigma = np.array([0.1, 0.25, 0.6, 1.2])
+    strikes = np.array([90.0, 100.0, 110.0, 130.0])
+    is_call = np.array([True, False, True, False])
+    premiums = BlackScholesCalculator.calculate_chain(100.0, strikes, 0.5, 0.05, sigma, is_call)["premium"]
+    solved = BlackScholesCalculator.implied_volatility_chain(premiums, 100.0, strikes, 0.5, 0.05, is_call)
+    assert np.allclose(solved, sigma, atol=1e-7)
+    
+    # Premiums below intrinsic value have no implied volatility
+    assert np.isnan(BlackScholesCalculator.implied_volatility_chain(5.0, 100.0, 80.0, 0.5, 0.05, True))
+    
+    options_market = OptionsMarket()
+    
+    # Calibrating to the model's own premiums leaves the surface unchanged
+    quotes = {symbol: contract.premium for symbol, contract in options_market.contracts.items()}
+    before = options_market.surfaces["AAPL"].volatilities.copy()
+    result = options_market.calibrate_surfaces(quotes)
+    assert result["status"] == "calibrated" and result["used"] > 0
+    assert np.allclose(options_market.surfaces["AAPL"].volatilities, before, atol=1e-7)
+    
+    # A richer traded premium lifts that node and only reprices its underlying
+    spot = options_market.underlying_prices["AAPL"]
+    contract = min(options_market.chains["AAPL"].contracts, key=lambda c: abs(c.strike_price - spot))
+    msft_key = tuple(options_market.chains["MSFT"].priced_keys[0])
+    old_vol = contract.implied_volatility
+    
+    await options_market.place_option_order("fund_001", contract.symbol, 1, premium=contract.premium * Decimal("1.2"))
+    result = options_market.calibrate_surfaces(underlyings=["AAPL"])
+    assert result["underlyings"] == ["AAPL"]
+    
+    options_market._update_option_pricing(contract)
+    assert contract.implied_volatility > old_vol
+    assert tuple(options_market.chains["MSFT"].priced_keys[0]) == msft_key
+    
+    surface = options_market.get_volatility_surface("AAPL")
+    assert len(surface["volatilities"]) == len(surface["expiries"])
+    
+    print(f"✅ Calibrated {result['used']} quotes in {result['elapsed_ms']:.2f}ms, IV {old_vol} -> {contract.implied_volatility}")
+    
+    return True
+
 async def test_swaps_market():
     """Test swaps market implementation"""
     print("🔄 Testing Swaps Market...")
@@ -141,6 +255,44 @@ async def test_structured_products():
     
     return True
 
+async def test_monte_carlo_engine():
+    """Test the shared Monte Carlo engine against closed forms"""
+    print("🎲 Testing Monte Carlo Engine...")
+    
+    exotics = ExoticOptionsEngine(MonteCarloEngine(seed=7, paths=100000, time_budget=30))
+    
+    # Knock-in plus knock-out is the vanilla, path by path
+    values = {}
+    for barrier_type in ("knock_in", "knock_out"):
+        exotics.monte_carlo = MonteCarloEngine(seed=7, paths=100000, time_budget=30)
+        option_id = exotics.create_barrier_option("desk", "AAPL", "call", Decimal("180"), Decimal("200"),
+                                                  barrier_type, Decimal("1"), 91)
+        values[barrier_type] = float(exotics.exotic_options[option_id].fair_value)
+    T = exotics._years_to_maturity(exotics.exotic_options[option_id])
+    vanilla = exotics._black_scholes_value(175.0, 180.0, T, 0.05, 0.25, "call")
+    assert abs(values["knock_in"] + values["knock_out"] - vanilla) < vanilla * 1e-5
+    
+    # The geometric-average control leaves a small error on the arithmetic Asian
+    option_id = exotics.create_asian_option("desk", "SPY", "put", Decimal("450"), 30, Decimal("1"), 91)
+    asian = exotics.exotic_options[option_id]
+    assert asian.fair_value > 0 and asian.valuation_error < asian.fair_value * Decimal("0.001")
+    
+    # Variance swap on a flat 25% vol against a 400 strike
+    swap_id = exotics.create_variance_swap("desk", "SPY", Decimal("400"), Decimal("1000"), 30)
+    payout = float(exotics.exotic_options[swap_id].variance_data["expected_payout"])
+    assert 220000 < payout < 226000
+    
+    # A tight time budget stops after the first chunk
+    budgeted = MonteCarloEngine(seed=1, paths=10 ** 8, time_budget=0.0)
+    result = budgeted.run(_variance_swap_kernel, {
+        "spot": 100.0, "vol": 0.25, "rate": 0.05, "T": 0.1, "steps": 30, "variance_strike": 400.0
+    })
+    assert result.chunks == 1 and not result.within_budget
+    
+    print(f"✅ Knock-in {values['knock_in']:.4f} + knock-out {values['knock_out']:.4f} = vanilla {vanilla:.4f}")
+    
+    return True
+
 async def test_comprehensive_integration():
     """Test integration across all markets"""
     print("🎯 Testing Comprehensive Integration...")
@@ -232,12 +384,24 @@ async def main():
         await test_options_market()  
         print()
         
+        await test_option_chain_pricing()
+        print()
+        
+        await test_portfolio_greeks_cache()
+        print()
+        
+        await test_volatility_surface_calibration()
+        print()
+        
         await test_swaps_market()
         print()
         
         await test_structured_products()
         print()
         
+        await test_monte_carlo_engine()
+        print()
+        
         # Test integration
         await test_comprehensive_integration()
         print()
@@ -7,6 +7,7 @@ including bubbles, contagion, systemic risk, shadow banking, fire sales, and res
 """
 
 import unittest
+import random
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
@@ -144,6 +145,52 @@ class TestFinancialContagionEngine(unittest.TestCase):
         # Check system stress calculation
         system_stress = self.contagion_engine._calculate_system_stress()
         self.assertGreater(system_stress, 0.0)
+    
+    def test_contagion_reproducible_with_random_seed(self):
+        """Test contagion draws follow the module random seed"""
+        def run():
+            engine = FinancialContagionEngine()
+            engine.add_institution("BANK_A", 1e12, 10.0, 0.15)
+            engine.add_institution("BANK_B", 8e11, 12.0, 0.12)
+            engine.add_institution("BANK_C", 5e11, 15.0, 0.10)
+            engine.add_exposure("BANK_A", "BANK_B", 100e9)
+            rounds = engine.simulate_contagion("BANK_A", 0.5)
+            return [[(hit['institution'], hit['source']) for hit in r['newly_affected']] for r in rounds]
+        
+        state = random.getstate()
+        self.addCleanup(random.setstate, state)
+        random.seed(11)
+        first = [run() for _ in range(20)]
+        random.seed(11)
+        second = [run() for _ in range(20)]
+        self.assertEqual(first, second)
+        
+    def test_contagion_trials(self):
+        """Test batched Monte Carlo contagion trials"""
+        self.contagion_engine.add_institution("BANK_A", 1e12, 10.0, 0.15)
+        self.contagion_engine.add_institution("BANK_B", 8e11, 12.0, 0.12)
+        self.contagion_engine.add_institution("BANK_C", 5e11, 15.0, 0.10)
+        self.contagion_engine.add_exposure("BANK_A", "BANK_B", 100e9)
+        
+        results = self.contagion_engine.simulate_contagion_trials(
+            "BANK_A", 0.0, trials=20000, max_rounds=1, seed=7
+        )
+        
+        # Trials leave institution state untouched
+        self.assertEqual(self.contagion_engine.institutions["BANK_A"]['health_score'], 1.0)
+        self.assertEqual(results['affected_counts'].shape, (20000,))
+        self.assertEqual(results['infection_probability']["BANK_A"], 1.0)
+        
+        # Without source stress one round infects with the matrix probability
+        matrix = self.contagion_engine.contagion_matrix
+        self.assertAlmostEqual(results['infection_probability']["BANK_B"], matrix[0, 1], delta=0.02)
+        self.assertAlmostEqual(results['infection_probability']["BANK_C"], matrix[0, 2], delta=0.02)
+        
+        # Same seed, same trials
+        repeat = self.contagion_engine.simulate_contagion_trials(
+            "BANK_A", 0.0, trials=20000, max_rounds=1, seed=7
+        )
+        np.testing.assert_array_equal(results['affected_counts'], repeat['affected_counts'])
 
 
 class TestSystemicRiskAnalyzer(unittest.TestCase):
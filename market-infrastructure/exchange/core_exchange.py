@@ -5,15 +5,29 @@ Supporting 50,000+ TPS with multiple market types
 """
 
 import asyncio
+import bisect
+import heapq
 import time
 import uuid
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal, ROUND_DOWN
 import json
 import logging
-from collections import defaultdict
+import math
+import multiprocessing
+import os
+import sys
+import threading
+from collections import defaultdict, OrderedDict
+import numpy as np
+
+try:
+    from fixed_point import FixedPointCodec
+except ImportError:  # Run as a script from inside exchange/
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from fixed_point import FixedPointCodec
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -98,17 +112,570 @@ class Trade:
     timestamp: float = field(default_factory=time.time)
     fees: Dict[str, Decimal] = field(default_factory=dict)
 
+class OrderNode:
+    """Doubly-linked queue node holding a resting order"""
+    __slots__ = ("order", "level", "remaining", "prev", "next")
+    
+    def __init__(self, order: Order, level: "BookLevel", remaining):
+        self.order = order
+        self.level = level
+        self.remaining = remaining  # In book units (Decimal, or lots in fixed-point mode)
+        self.prev: Optional["OrderNode"] = None
+        self.next: Optional["OrderNode"] = None
+
+class BookLevel:
+    """FIFO queue of resting orders at a single price"""
+    __slots__ = ("price", "head", "tail", "order_count", "total_quantity")
+    
+    def __init__(self, price):
+        self.price = price
+        self.head: Optional[OrderNode] = None
+        self.tail: Optional[OrderNode] = None
+        self.order_count = 0
+        self.total_quantity = 0
+    
+    def append(self, node: OrderNode) -> None:
+        """Append node to the back of the queue (time priority)"""
+        node.prev = self.tail
+        node.next = None
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        self.order_count += 1
+        self.total_quantity += node.remaining
+    
+    def unlink(self, node: OrderNode) -> None:
+        """Unlink node from anywhere in the queue in O(1)"""
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
+        self.order_count -= 1
+        self.total_quantity -= node.remaining
+    
+    @property
+    def is_empty(self) -> bool:
+        return self.head is None
+
+class BookSide:
+    """
+    Sorted price level index for one side of a matching book
+    Keys are kept ascending with the best price last, so the best level
+    is read and popped from the end of the array
+    """
+    
+    def __init__(self, is_bid_side: bool):
+        self.is_bid_side = is_bid_side
+        self.levels: Dict[Any, BookLevel] = {}
+        self._keys: List[Any] = []
+    
+    def _key(self, price):
+        # Bids: highest price is best; asks: lowest price is best
+        return price if self.is_bid_side else -price
+    
+    def get_or_create_level(self, price) -> BookLevel:
+        """Get the level for price, inserting it in O(log L) if new"""
+        level = self.levels.get(price)
+        if level is None:
+            level = BookLevel(price)
+            self.levels[price] = level
+            bisect.insort(self._keys, self._key(price))
+        return level
+    
+    def remove_level(self, level: BookLevel) -> None:
+        """Drop an empty level from the index"""
+        del self.levels[level.price]
+        key = self._key(level.price)
+        if self._keys and self._keys[-1] == key:
+            self._keys.pop()
+        else:
+            index = bisect.bisect_left(self._keys, key)
+            del self._keys[index]
+    
+    def best_level(self) -> Optional[BookLevel]:
+        """Best level in O(1)"""
+        if not self._keys:
+            return None
+        key = self._keys[-1]
+        return self.levels[key if self.is_bid_side else -key]
+    
+    def iter_levels(self):
+        """Iterate levels from best to worst"""
+        for key in reversed(self._keys):
+            yield self.levels[key if self.is_bid_side else -key]
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+
+class MatchingBook:
+    """
+    Price-time priority book for one trading pair
+    O(log L) level insert, O(1) best price, O(1) cancel by order id
+    
+    With a FixedPointCodec, level prices are int ticks and quantities int lots;
+    Decimal values only appear at the boundary (add, trades, depth)
+    """
+    
+    def __init__(self, symbol: str, codec: Optional[FixedPointCodec] = None):
+        self.symbol = symbol
+        self.codec = codec
+        self.bids = BookSide(is_bid_side=True)
+        self.asks = BookSide(is_bid_side=False)
+        self.nodes: Dict[str, OrderNode] = {}
+    
+    def price_key(self, price: Decimal):
+        return self.codec.to_ticks(price) if self.codec else price
+    
+    def quantity_units(self, quantity: Decimal):
+        return self.codec.to_lots(quantity) if self.codec else quantity
+    
+    def to_price(self, key) -> Decimal:
+        return self.codec.from_ticks(key) if self.codec else key
+    
+    def to_quantity(self, units) -> Decimal:
+        return self.codec.from_lots(units) if self.codec else units
+    
+    def side_for(self, side: OrderSide) -> BookSide:
+        return self.bids if side == OrderSide.BUY else self.asks
+    
+    def opposite_side_for(self, side: OrderSide) -> BookSide:
+        return self.asks if side == OrderSide.BUY else self.bids
+    
+    def add(self, order: Order) -> None:
+        """Rest an order at the back of its price level"""
+        level = self.side_for(order.side).get_or_create_level(self.price_key(order.price))
+        node = OrderNode(order, level, self.quantity_units(order.remaining_quantity))
+        level.append(node)
+        self.nodes[order.id] = node
+    
+    def remove(self, order_id: str) -> Optional[Order]:
+        """Remove a resting order by id in O(1)"""
+        node = self.nodes.pop(order_id, None)
+        if node is None:
+            return None
+        
+        level = node.level
+        level.unlink(node)
+        if level.is_empty:
+            self.side_for(node.order.side).remove_level(level)
+        return node.order
+    
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.nodes
+    
+    def get_depth(self, side: OrderSide, depth: int) -> List[Dict[str, str]]:
+        """Aggregated (price, quantity) levels from best to worst"""
+        result = []
+        for level in self.side_for(side).iter_levels():
+            if len(result) >= depth:
+                break
+            result.append({
+                "price": str(self.to_price(level.price)),
+                "quantity": str(self.to_quantity(level.total_quantity))
+            })
+        return result
+
+class TradeTape:
+    """
+    Bounded, columnar trade tape
+    Trades are kept as fixed-width numeric columns (symbol id, price ticks,
+    quantity lots, buyer/seller agent ids, timestamp) in a ring buffer.
+    The columns start at initial_capacity rows and double as trades arrive;
+    only once they reach capacity does the ring wrap. With a spill path,
+    the oldest rows are appended to a file in chunks before the ring
+    overwrites them; spilled() maps that file read-only
+    """
+    
+    SPILL_DTYPE = np.dtype([
+        ("symbol_id", np.uint32),
+        ("price", np.int64),
+        ("quantity", np.int64),
+        ("buyer_id", np.uint32),
+        ("seller_id", np.uint32),
+        ("timestamp", np.float64)
+    ])
+    
+    COLUMNS = ("symbol_ids", "prices", "quantities", "buyer_ids", "seller_ids", "timestamps")
+    
+    def __init__(self, capacity: int = 1_000_000, spill_path: Optional[str] = None,
+                 initial_capacity: int = 4096):
+        self.capacity = capacity
+        size = max(1, min(capacity, initial_capacity))
+        self.symbol_ids = np.zeros(size, dtype=np.uint32)
+        self.prices = np.zeros(size, dtype=np.int64)
+        self.quantities = np.zeros(size, dtype=np.int64)
+        self.buyer_ids = np.zeros(size, dtype=np.uint32)
+        self.seller_ids = np.zeros(size, dtype=np.uint32)
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.total_appended = 0
+        
+        # Interned symbols (with their tick/lot codec) and agent ids
+        self.symbols: List[str] = []
+        self.codecs: List[FixedPointCodec] = []
+        self._symbol_index: Dict[str, int] = {}
+        self.agents: List[str] = []
+        self._agent_index: Dict[str, int] = {}
+        
+        # Optional spill of overwritten rows, written a chunk at a time
+        self.spill_path = spill_path
+        self._spill_file = open(spill_path, "ab") if spill_path else None
+        self._spill_chunk = math.gcd(capacity, 4096)
+        self.spilled_rows = 0
+    
+    def add_symbol(self, symbol: str, codec: FixedPointCodec) -> int:
+        """Intern a symbol with the codec used for its price/quantity columns"""
+        symbol_id = self._symbol_index.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.symbols.append(symbol)
+            self.codecs.append(codec)
+            self._symbol_index[symbol] = symbol_id
+        return symbol_id
+    
+    def agent_id(self, agent: str) -> int:
+        """Intern an agent id"""
+        index = self._agent_index.get(agent)
+        if index is None:
+            index = len(self.agents)
+            self.agents.append(agent)
+            self._agent_index[agent] = index
+        return index
+    
+    def append(self, symbol_id: int, price_ticks: int, quantity_lots: int,
+               buyer: str, seller: str, timestamp: float) -> None:
+        """Append one trade"""
+        row = self.total_appended % self.capacity
+        if row >= len(self.prices):
+            self._grow()
+        elif self.total_appended >= self.capacity and self._spill_file and row % self._spill_chunk == 0:
+            self._spill(row)
+        
+        self.symbol_ids[row] = symbol_id
+        self.prices[row] = price_ticks
+        self.quantities[row] = quantity_lots
+        self.buyer_ids[row] = self.agent_id(buyer)
+        self.seller_ids[row] = self.agent_id(seller)
+        self.timestamps[row] = timestamp
+        self.total_appended += 1
+    
+    def _grow(self) -> None:
+        """Double the columns, up to capacity"""
+        size = min(self.capacity, 2 * len(self.prices))
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+    
+    def _spill(self, start: int) -> None:
+        """Write the oldest chunk of rows to the spill file before it is overwritten"""
+        end = start + self._spill_chunk
+        chunk = np.empty(self._spill_chunk, dtype=self.SPILL_DTYPE)
+        chunk["symbol_id"] = self.symbol_ids[start:end]
+        chunk["price"] = self.prices[start:end]
+        chunk["quantity"] = self.quantities[start:end]
+        chunk["buyer_id"] = self.buyer_ids[start:end]
+        chunk["seller_id"] = self.seller_ids[start:end]
+        chunk["timestamp"] = self.timestamps[start:end]
+        chunk.tofile(self._spill_file)
+        self.spilled_rows += self._spill_chunk
+    
+    def spilled(self) -> Optional[np.ndarray]:
+        """Memory-map the spilled rows (oldest first)"""
+        if self._spill_file is None or self.spilled_rows == 0:
+            return None
+        self._spill_file.flush()
+        return np.memmap(self.spill_path, dtype=self.SPILL_DTYPE, mode="r", shape=(self.spilled_rows,))
+    
+    def close(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+    
+    def __len__(self) -> int:
+        return min(self.total_appended, self.capacity)
+    
+    def _chronological(self, column: np.ndarray) -> np.ndarray:
+        """Retained rows of a column, oldest first"""
+        if self.total_appended <= self.capacity:
+            return column[:self.total_appended]
+        start = self.total_appended % self.capacity
+        if start == 0:
+            return column
+        return np.concatenate((column[start:], column[:start]))
+    
+    def _mask(self, symbol: Optional[str] = None, since: Optional[float] = None) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if symbol is not None:
+            symbol_id = self._symbol_index.get(symbol)
+            if symbol_id is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self._chronological(self.symbol_ids) == symbol_id
+        if since is not None:
+            mask &= self._chronological(self.timestamps) >= since
+        return mask
+    
+    def _rows_to_dicts(self, indices: np.ndarray) -> List[Dict[str, Any]]:
+        symbol_ids = self._chronological(self.symbol_ids)
+        prices = self._chronological(self.prices)
+        quantities = self._chronological(self.quantities)
+        buyers = self._chronological(self.buyer_ids)
+        sellers = self._chronological(self.seller_ids)
+        timestamps = self._chronological(self.timestamps)
+        
+        rows = []
+        for i in indices:
+            codec = self.codecs[symbol_ids[i]]
+            rows.append({
+                "symbol": self.symbols[symbol_ids[i]],
+                "price": str(codec.from_ticks(int(prices[i]))),
+                "quantity": str(codec.from_lots(int(quantities[i]))),
+                "buyer_agent_id": self.agents[buyers[i]],
+                "seller_agent_id": self.agents[sellers[i]],
+                "timestamp": float(timestamps[i])
+            })
+        return rows
+    
+    def last(self, count: int = 100, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent trades, oldest first"""
+        indices = np.flatnonzero(self._mask(symbol))[-count:]
+        return self._rows_to_dicts(indices)
+    
+    def vwap(self, symbol: str, since: Optional[float] = None) -> Optional[float]:
+        """Volume-weighted average price over retained trades"""
+        mask = self._mask(symbol, since)
+        if not mask.any():
+            return None
+        
+        codec = self.codecs[self._symbol_index[symbol]]
+        prices = self._chronological(self.prices)[mask].astype(np.float64)
+        quantities = self._chronological(self.quantities)[mask].astype(np.float64)
+        vwap_ticks = float(np.dot(prices, quantities) / quantities.sum())
+        return vwap_ticks * float(codec.tick_size)
+    
+    def agent_fills(self, agent: str, symbol: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Trades where the agent was buyer or seller, oldest first"""
+        agent_index = self._agent_index.get(agent)
+        if agent_index is None:
+            return []
+        
+        mask = self._mask(symbol)
+        mask &= ((self._chronological(self.buyer_ids) == agent_index) |
+                 (self._chronological(self.seller_ids) == agent_index))
+        indices = np.flatnonzero(mask)
+        if limit is not None:
+            indices = indices[-limit:]
+        
+        fills = self._rows_to_dicts(indices)
+        for fill in fills:
+            fill["side"] = "buy" if fill["buyer_agent_id"] == agent else "sell"
+        return fills
+
+class BalanceLedger:
+    """
+    Agent account ledger
+    Available and held amounts live in per-agent rows indexed by interned
+    asset ids. Orders reserve funds (available -> held) before they can
+    trade, and fills settle against that reservation
+    """
+    
+    def __init__(self):
+        self.agent_ids: Dict[str, int] = {}
+        self.asset_ids: Dict[str, int] = {}
+        self.assets: List[str] = []
+        self.available: List[List[Decimal]] = []
+        self.held: List[List[Decimal]] = []
+        
+        # order id -> [agent id, asset id, per-unit hold, remaining quantity]
+        self.holds: Dict[str, list] = {}
+    
+    def agent_id(self, agent: str) -> int:
+        """Intern an agent, adding an empty account row"""
+        index = self.agent_ids.get(agent)
+        if index is None:
+            index = len(self.available)
+            self.agent_ids[agent] = index
+            self.available.append([Decimal('0')] * len(self.assets))
+            self.held.append([Decimal('0')] * len(self.assets))
+        return index
+    
+    def asset_id(self, asset: str) -> int:
+        """Intern an asset, adding a column to every account row"""
+        index = self.asset_ids.get(asset)
+        if index is None:
+            index = len(self.assets)
+            self.asset_ids[asset] = index
+            self.assets.append(asset)
+            for row in self.available:
+                row.append(Decimal('0'))
+            for row in self.held:
+                row.append(Decimal('0'))
+        return index
+    
+    def deposit(self, agent: str, asset: str, amount: Decimal) -> None:
+        """Credit an agent's available balance"""
+        self.available[self.agent_id(agent)][self.asset_id(asset)] += amount
+    
+    def get_available(self, agent: str, asset: str) -> Decimal:
+        agent_index = self.agent_ids.get(agent)
+        asset_index = self.asset_ids.get(asset)
+        if agent_index is None or asset_index is None:
+            return Decimal('0')
+        return self.available[agent_index][asset_index]
+    
+    def get_held(self, agent: str, asset: str) -> Decimal:
+        agent_index = self.agent_ids.get(agent)
+        asset_index = self.asset_ids.get(asset)
+        if agent_index is None or asset_index is None:
+            return Decimal('0')
+        return self.held[agent_index][asset_index]
+    
+    def get_balance(self, agent: str, asset: str) -> Decimal:
+        """Total balance (available plus held)"""
+        return self.get_available(agent, asset) + self.get_held(agent, asset)
+    
+    def get_balances(self, agent: str) -> Dict[str, Dict[str, str]]:
+        """All non-zero balances for an agent"""
+        agent_index = self.agent_ids.get(agent)
+        if agent_index is None:
+            return {}
+        
+        available = self.available[agent_index]
+        held = self.held[agent_index]
+        return {
+            asset: {"available": str(available[i]), "held": str(held[i])}
+            for i, asset in enumerate(self.assets)
+            if available[i] or held[i]
+        }
+    
+    def reserve(self, order_id: str, agent: str, asset: str,
+                quantity: Decimal, per_unit: Decimal) -> bool:
+        """Hold quantity * per_unit of an asset for an order; False if short"""
+        agent_index = self.agent_id(agent)
+        asset_index = self.asset_id(asset)
+        amount = quantity * per_unit
+        
+        available = self.available[agent_index]
+        if available[asset_index] < amount:
+            return False
+        
+        available[asset_index] -= amount
+        self.held[agent_index][asset_index] += amount
+        self.holds[order_id] = [agent_index, asset_index, per_unit, quantity]
+        return True
+    
+    def reserve_order(self, order: Order, protection_price: Optional[Decimal] = None) -> bool:
+        """
+        Hold the balance an order needs: quote at the limit price (or, for a
+        market buy, the protection price) for buys, base for sells. Buys with
+        neither price are refused
+        """
+        pair = order.trading_pair
+        if order.side == OrderSide.BUY:
+            per_unit = order.price if order.price is not None else protection_price
+            if per_unit is None:
+                return False
+            asset = pair.quote_asset
+        else:
+            asset, per_unit = pair.base_asset, Decimal('1')
+        return self.reserve(order.id, order.agent_id, asset, order.quantity, per_unit)
+    
+    def release(self, order_id: str) -> None:
+        """Return whatever is still held for an order to available"""
+        hold = self.holds.pop(order_id, None)
+        if hold is None:
+            return
+        
+        agent_index, asset_index, per_unit, remaining = hold
+        amount = remaining * per_unit
+        self.held[agent_index][asset_index] -= amount
+        self.available[agent_index][asset_index] += amount
+    
+    def settle(self, base_asset: str, quote_asset: str, fills: List[Tuple]) -> None:
+        """
+        Settle a batch of fills for one trading pair
+        Each fill is (buyer order id, seller order id, price, quantity); both
+        orders must hold a reservation. Price improvement on the buyer's hold
+        is returned to available
+        """
+        base = self.asset_id(base_asset)
+        quote = self.asset_id(quote_asset)
+        holds = self.holds
+        available = self.available
+        held = self.held
+        
+        for buyer_order_id, seller_order_id, price, quantity in fills:
+            # Look both holds up before mutating anything
+            buyer_hold = holds[buyer_order_id]
+            seller_hold = holds[seller_order_id]
+            buyer = buyer_hold[0]
+            seller = seller_hold[0]
+            value = price * quantity
+            
+            released = buyer_hold[2] * quantity
+            held[buyer][quote] -= released
+            available[buyer][quote] += released - value
+            available[buyer][base] += quantity
+            
+            released = seller_hold[2] * quantity
+            held[seller][base] -= released
+            available[seller][base] += released - quantity
+            available[seller][quote] += value
+            
+            buyer_hold[3] -= quantity
+            if buyer_hold[3] <= 0:
+                del holds[buyer_order_id]
+            seller_hold[3] -= quantity
+            if seller_hold[3] <= 0:
+                del holds[seller_order_id]
+
+def market_protection_price(pair: TradingPair, best_ask: Decimal, slippage_cap: Decimal) -> Decimal:
+    """Highest price a market buy may pay: best ask plus the slippage cap, on the tick grid"""
+    tick_size = Decimal(1).scaleb(-pair.price_precision)
+    return max(best_ask, (best_ask * (1 + slippage_cap)).quantize(tick_size, rounding=ROUND_DOWN))
+
+def needs_protection_price(order: Order) -> bool:
+    """Market buys without a price are capped at a protection price instead"""
+    return order.order_type == OrderType.MARKET and order.side == OrderSide.BUY and order.price is None
+
+def missing_price_reason(order: Order) -> Optional[str]:
+    """Rejection reason for a resting order type sent without a price"""
+    if order.order_type == OrderType.MARKET or order.price is not None:
+        return None
+    return f"{order.order_type.value.replace('_', ' ').capitalize()} order requires price"
+
 class DistributedExchange:
     """
     High-performance distributed exchange supporting multiple market types
     Target: 50,000+ transactions per second
     """
     
-    def __init__(self):
+    def __init__(self, 
+                 fixed_point: bool = False, 
+                 archive_size: int = 100000,
+                 trade_tape_capacity: int = 1_000_000,
+                 trade_tape_spill_path: Optional[str] = None):
         self.trading_pairs: Dict[str, TradingPair] = {}
-        self.orders: Dict[str, Order] = {}
-        self.trades: List[Trade] = []
-        self.order_books = defaultdict(lambda: {"bids": [], "asks": []})
+        self.fixed_point = fixed_point  # Match on int ticks/lots instead of Decimal
+        self.orders: Dict[str, Order] = {}  # Live (pending/partial) orders only
+        self.trade_tape = TradeTape(trade_tape_capacity, trade_tape_spill_path)
+        self.order_books: Dict[str, MatchingBook] = {}
+        self._tape_symbol_ids: Dict[str, int] = {}
+        
+        # Finished orders are evicted into a bounded, insertion-ordered archive
+        self.order_archive: "OrderedDict[str, Order]" = OrderedDict()
+        self.archive_size = archive_size
+        
+        # Min-heap of (expiry time, order id) for resting orders with a TTL
+        self._expiry_heap: List[Tuple[float, str]] = []
         
         # Performance metrics
         self.total_trades = 0
@@ -119,14 +686,21 @@ class DistributedExchange:
         self.circuit_breakers = defaultdict(dict)
         self.halted_pairs = set()
         
-        # Agent balances (simplified for demo)
-        self.agent_balances = defaultdict(lambda: defaultdict(Decimal))
+        # Agent balances with per-order reservations
+        self.ledger = BalanceLedger()
+        self.settle_balances = True  # Disabled on shards, where the router owns balances
+        self.market_slippage_cap = Decimal('0.05')  # Market buys pay at most best ask + 5%
         
         logger.info("Distributed Exchange initialized")
     
     def add_trading_pair(self, pair: TradingPair) -> None:
         """Add a new trading pair to the exchange"""
         self.trading_pairs[pair.symbol] = pair
+        codec = FixedPointCodec.for_pair(pair) if self.fixed_point else None
+        self.order_books[pair.symbol] = MatchingBook(pair.symbol, codec)
+        self._tape_symbol_ids[pair.symbol] = self.trade_tape.add_symbol(
+            pair.symbol, codec or FixedPointCodec.for_pair(pair)
+        )
         logger.info(f"Added trading pair: {pair.symbol} ({pair.market_type.value})")
     
     async def place_order(self, order: Order) -> Dict[str, Any]:
@@ -135,32 +709,28 @@ class DistributedExchange:
         Returns execution results
         """
         try:
-            # Validate order
+            # Validate order, check circuit breakers and reserve funds
             validation_result = self._validate_order(order)
             if not validation_result["valid"]:
                 order.status = OrderStatus.REJECTED
                 return validation_result
             
-            # Check circuit breakers
-            if order.trading_pair.symbol in self.halted_pairs:
-                order.status = OrderStatus.REJECTED
-                return {"valid": False, "reason": "Market halted"}
-            
-            # Store order
-            self.orders[order.id] = order
-            
-            # Attempt matching
-            matches = await self._match_order(order)
-            
-            # Update order book if not fully filled
-            if order.remaining_quantity > 0 and order.status != OrderStatus.CANCELLED:
-                self._add_to_order_book(order)
+            # Store, match and rest the order
+            trades = self._execute_order(order, validation_result.get("protection_price"))
             
             return {
                 "valid": True,
                 "order_id": order.id,
                 "status": order.status.value,
-                "matches": matches,
+                "matches": [
+                    {
+                        "trade_id": trade.id,
+                        "price": str(trade.price),
+                        "quantity": str(trade.quantity),
+                        "timestamp": trade.timestamp
+                    }
+                    for trade in trades
+                ],
                 "filled_quantity": str(order.filled_quantity),
                 "remaining_quantity": str(order.remaining_quantity)
             }
@@ -168,112 +738,270 @@ class DistributedExchange:
         except Exception as e:
             logger.error(f"Error placing order: {e}")
             order.status = OrderStatus.REJECTED
+            self.ledger.release(order.id)
             return {"valid": False, "reason": str(e)}
     
+    async def place_orders(self, orders: List[Order]) -> Dict[str, Any]:
+        """
+        Place a batch of orders in one call
+        The whole batch is validated and reserved in one pass, so later orders
+        only see balance left by earlier ones, then matched in deterministic
+        arrival order (timestamp, then position in the batch)
+        Returns columnar results aligned with the input batch
+        """
+        count = len(orders)
+        valid = [False] * count
+        reasons: List[Optional[str]] = [None] * count
+        protection_prices: List[Optional[Decimal]] = [None] * count
+        
+        # Validation pass
+        for i, order in enumerate(orders):
+            reason = self._check_order(order)
+            if reason is None and order.trading_pair.symbol in self.halted_pairs:
+                reason = "Market halted"
+            if reason is None and needs_protection_price(order):
+                protection_prices[i] = self._market_buy_cap(order)
+                if protection_prices[i] is None:
+                    reason = "No liquidity for market buy"
+            if reason is None and not self.ledger.reserve_order(order, protection_prices[i]):
+                reason = "Insufficient balance"
+            
+            if reason is None:
+                valid[i] = True
+            else:
+                order.status = OrderStatus.REJECTED
+                reasons[i] = reason
+        
+        # Matching pass (sorted is stable, so equal timestamps keep batch order)
+        trade_columns = {"order_index": [], "trade_id": [], "price": [], "quantity": [], "timestamp": []}
+        arrival_order = sorted((i for i in range(count) if valid[i]), key=lambda i: orders[i].timestamp)
+        
+        for i in arrival_order:
+            try:
+                trades = self._execute_order(orders[i], protection_prices[i])
+            except Exception as e:
+                logger.error(f"Error placing order: {e}")
+                orders[i].status = OrderStatus.REJECTED
+                self.ledger.release(orders[i].id)
+                valid[i] = False
+                reasons[i] = str(e)
+                continue
+            
+            for trade in trades:
+                trade_columns["order_index"].append(i)
+                trade_columns["trade_id"].append(trade.id)
+                trade_columns["price"].append(str(trade.price))
+                trade_columns["quantity"].append(str(trade.quantity))
+                trade_columns["timestamp"].append(trade.timestamp)
+        
+        return {
+            "count": count,
+            "order_ids": [order.id for order in orders],
+            "valid": valid,
+            "reasons": reasons,
+            "status": [order.status.value for order in orders],
+            "filled_quantity": [str(order.filled_quantity) for order in orders],
+            "remaining_quantity": [str(order.remaining_quantity) for order in orders],
+            "trades": trade_columns
+        }
+    
     def _validate_order(self, order: Order) -> Dict[str, Any]:
-        """Validate order parameters"""
+        """Validate order parameters and reserve the balance it needs"""
+        reason = self._check_order(order)
+        if reason is not None:
+            return {"valid": False, "reason": reason}
+        
+        if order.trading_pair.symbol in self.halted_pairs:
+            return {"valid": False, "reason": "Market halted"}
+        
+        protection_price = None
+        if needs_protection_price(order):
+            protection_price = self._market_buy_cap(order)
+            if protection_price is None:
+                return {"valid": False, "reason": "No liquidity for market buy"}
+        
+        if not self.ledger.reserve_order(order, protection_price):
+            return {"valid": False, "reason": "Insufficient balance"}
+        
+        return {"valid": True, "protection_price": protection_price}
+    
+    def _market_buy_cap(self, order: Order) -> Optional[Decimal]:
+        """
+        Protection price for a market buy without a price, so its reservation
+        bounds what it can spend; None if there is no ask
+        The order itself keeps price None
+        """
+        order_book = self._get_book(order.trading_pair.symbol)
+        level = order_book.asks.best_level()
+        if level is None:
+            return None
+        return market_protection_price(
+            order.trading_pair, order_book.to_price(level.price), self.market_slippage_cap
+        )
+    
+    def _check_order(self, order: Order) -> Optional[str]:
+        """Check order parameters, returning a rejection reason if invalid"""
         pair = order.trading_pair
         
         # Check trading pair exists
         if pair.symbol not in self.trading_pairs:
-            return {"valid": False, "reason": "Invalid trading pair"}
+            return "Invalid trading pair"
         
         # Check quantity bounds
         if order.quantity < pair.min_order_size:
-            return {"valid": False, "reason": "Order size too small"}
+            return "Order size too small"
         
         if order.quantity > pair.max_order_size:
-            return {"valid": False, "reason": "Order size too large"}
+            return "Order size too large"
         
-        # Check price for limit orders
-        if order.order_type == OrderType.LIMIT and order.price is None:
-            return {"valid": False, "reason": "Limit order requires price"}
+        # Check price for limit, stop-loss and take-profit orders
+        reason = missing_price_reason(order)
+        if reason is not None:
+            return reason
         
-        # Check agent balance (simplified)
-        if order.side == OrderSide.BUY:
-            required_balance = order.quantity * (order.price or Decimal('0'))
-            if self.agent_balances[order.agent_id][pair.quote_asset] < required_balance:
-                return {"valid": False, "reason": "Insufficient balance"}
-        else:
-            if self.agent_balances[order.agent_id][pair.base_asset] < order.quantity:
-                return {"valid": False, "reason": "Insufficient balance"}
+        # Fixed-point books only accept prices and sizes on the tick/lot grid
+        codec = self.order_books[pair.symbol].codec
+        if codec is not None and not codec.is_aligned(order.price, order.quantity):
+            return "Price or quantity not aligned to tick/lot size"
         
-        return {"valid": True}
+        return None
     
-    async def _match_order(self, order: Order) -> List[Dict[str, Any]]:
+    def _execute_order(self, order: Order, protection_price: Optional[Decimal] = None) -> List[Trade]:
+        """Match a validated order and rest any remainder"""
+        trades = self._match_order(order, protection_price)
+        
+        # Update order book if not fully filled
+        if order.remaining_quantity > 0 and order.status != OrderStatus.CANCELLED:
+            if order.order_type == OrderType.MARKET:
+                # Unfilled market remainder is cancelled, never rested
+                order.status = OrderStatus.CANCELLED
+            else:
+                self.orders[order.id] = order
+                self._add_to_order_book(order)
+                if order.ttl is not None:
+                    heapq.heappush(self._expiry_heap, (order.timestamp + order.ttl, order.id))
+                return trades
+        
+        self._archive_order(order)
+        return trades
+    
+    def _archive_order(self, order: Order) -> None:
+        """Move a finished order out of the live map into the bounded archive"""
+        self.ledger.release(order.id)
+        self.orders.pop(order.id, None)
+        self.order_archive[order.id] = order
+        if len(self.order_archive) > self.archive_size:
+            self.order_archive.popitem(last=False)
+    
+    def get_order(self, order_id: str) -> Optional[Order]:
+        """Look up a live or archived order"""
+        order = self.orders.get(order_id)
+        if order is None:
+            order = self.order_archive.get(order_id)
+        return order
+    
+    def _match_order(self, order: Order, protection_price: Optional[Decimal] = None) -> List[Trade]:
         """
         High-performance order matching algorithm
+        Walks the opposing side from the best level in price-time priority
         Returns list of executed trades
         """
-        matches = []
-        order_book = self.order_books[order.trading_pair.symbol]
+        trades = []
+        fills = []
+        filled_makers = []
+        order_book = self._get_book(order.trading_pair.symbol)
+        opposing_side = order_book.opposite_side_for(order.side)
+        is_buy = order.side == OrderSide.BUY
         
-        if order.side == OrderSide.BUY:
-            # Match against asks (sell orders)
-            opposing_orders = sorted(order_book["asks"], key=lambda x: (x.price, x.timestamp))
-        else:
-            # Match against bids (buy orders)
-            opposing_orders = sorted(order_book["bids"], key=lambda x: (-x.price, x.timestamp))
+        # Compare and decrement in book units (ints in fixed-point mode);
+        # a market buy never trades through its protection price
+        price = order.price if order.price is not None else protection_price
+        limit_price = None if price is None else order_book.price_key(price)
+        remaining = order_book.quantity_units(order.remaining_quantity)
         
-        for opposing_order in opposing_orders[:]:  # Copy to avoid modification issues
-            if order.remaining_quantity <= 0:
+        while remaining > 0:
+            level = opposing_side.best_level()
+            if level is None:
                 break
             
-            # Check price compatibility
-            if order.order_type == OrderType.MARKET or self._prices_match(order, opposing_order):
-                # Execute trade
-                trade_quantity = min(order.remaining_quantity, opposing_order.remaining_quantity)
-                trade_price = opposing_order.price
-                
-                # Create trade record
-                trade = Trade(
-                    id=str(uuid.uuid4()),
-                    trading_pair=order.trading_pair,
-                    buyer_order_id=order.id if order.side == OrderSide.BUY else opposing_order.id,
-                    seller_order_id=opposing_order.id if order.side == OrderSide.BUY else order.id,
-                    buyer_agent_id=order.agent_id if order.side == OrderSide.BUY else opposing_order.agent_id,
-                    seller_agent_id=opposing_order.agent_id if order.side == OrderSide.BUY else order.agent_id,
-                    price=trade_price,
-                    quantity=trade_quantity
-                )
-                
-                # Calculate fees
-                trade.fees = self._calculate_fees(trade)
-                
-                # Update order quantities
-                order.filled_quantity += trade_quantity
-                opposing_order.filled_quantity += trade_quantity
-                
-                # Update order statuses
-                if order.remaining_quantity == 0:
-                    order.status = OrderStatus.FILLED
-                elif order.filled_quantity > 0:
-                    order.status = OrderStatus.PARTIAL
-                
-                if opposing_order.remaining_quantity == 0:
-                    opposing_order.status = OrderStatus.FILLED
-                    order_book["asks" if order.side == OrderSide.BUY else "bids"].remove(opposing_order)
-                elif opposing_order.filled_quantity > 0:
-                    opposing_order.status = OrderStatus.PARTIAL
-                
-                # Store trade and update metrics
-                self.trades.append(trade)
-                self.total_trades += 1
-                self.total_volume += trade_quantity * trade_price
-                
-                # Update agent balances
-                self._update_balances(trade)
-                
-                matches.append({
-                    "trade_id": trade.id,
-                    "price": str(trade.price),
-                    "quantity": str(trade.quantity),
-                    "timestamp": trade.timestamp
-                })
-                
-                logger.debug(f"Trade executed: {trade_quantity} {order.trading_pair.base_asset} at {trade_price}")
-        
-        return matches
+            # Levels are price sorted, so the first non-crossing level ends matching
+            if limit_price is not None:
+                if (is_buy and limit_price < level.price) or (not is_buy and limit_price > level.price):
+                    break
+            
+            node = level.head
+            opposing_order = node.order
+            
+            # Execute trade
+            fill_units = min(remaining, node.remaining)
+            remaining -= fill_units
+            node.remaining -= fill_units
+            level.total_quantity -= fill_units
+            
+            trade_quantity = order_book.to_quantity(fill_units)
+            trade_price = order_book.to_price(level.price)
+            
+            # Create trade record
+            trade = Trade(
+                id=str(uuid.uuid4()),
+                trading_pair=order.trading_pair,
+                buyer_order_id=order.id if is_buy else opposing_order.id,
+                seller_order_id=opposing_order.id if is_buy else order.id,
+                buyer_agent_id=order.agent_id if is_buy else opposing_order.agent_id,
+                seller_agent_id=opposing_order.agent_id if is_buy else order.agent_id,
+                price=trade_price,
+                quantity=trade_quantity
+            )
+            
+            # Calculate fees
+            trade.fees = self._calculate_fees(trade)
+            
+            # Update order quantities
+            order.filled_quantity += trade_quantity
+            opposing_order.filled_quantity += trade_quantity
+            
+            # Update order statuses
+            if remaining == 0:
+                order.status = OrderStatus.FILLED
+            elif order.filled_quantity > 0:
+                order.status = OrderStatus.PARTIAL
+            
+            if node.remaining == 0:
+                opposing_order.status = OrderStatus.FILLED
+                order_book.remove(opposing_order.id)
+                filled_makers.append(opposing_order)
+            elif opposing_order.filled_quantity > 0:
+                opposing_order.status = OrderStatus.PARTIAL
+            
+            # Store trade and update metrics
+            self._record_trade(order_book, trade, level.price, fill_units)
+            self.total_trades += 1
+            self.total_volume += trade_quantity * trade_price
+            
+            fills.append((trade.buyer_order_id, trade.seller_order_id, trade_price, trade_quantity))
+            trades.append(trade)
+            
+            logger.debug(f"Trade executed: {trade_quantity} {order.trading_pair.base_asset} at {trade_price}")
+        
+        # Settle the whole match against the reservations before makers are archived
+        if fills and self.settle_balances:
+            pair = order.trading_pair
+            self.ledger.settle(pair.base_asset, pair.quote_asset, fills)
+        for opposing_order in filled_makers:
+            self._archive_order(opposing_order)
+        
+        return trades
+    
+    def _record_trade(self, order_book: MatchingBook, trade: Trade, price_key, quantity_units) -> None:
+        """Append a trade to the tape in ticks/lots"""
+        symbol_id = self._tape_symbol_ids[order_book.symbol]
+        if order_book.codec is None:
+            codec = self.trade_tape.codecs[symbol_id]
+            price_key = codec.to_ticks(price_key)
+            quantity_units = codec.to_lots(quantity_units)
+        
+        self.trade_tape.append(symbol_id, price_key, quantity_units,
+                               trade.buyer_agent_id, trade.seller_agent_id, trade.timestamp)
     
     def _prices_match(self, order: Order, opposing_order: Order) -> bool:
         """Check if two orders can be matched based on price"""
@@ -285,16 +1013,17 @@ class DistributedExchange:
         else:
             return order.price <= opposing_order.price
     
+    def _get_book(self, symbol: str) -> MatchingBook:
+        """Get or create the matching book for a symbol"""
+        order_book = self.order_books.get(symbol)
+        if order_book is None:
+            order_book = MatchingBook(symbol)
+            self.order_books[symbol] = order_book
+        return order_book
+    
     def _add_to_order_book(self, order: Order) -> None:
         """Add order to the order book"""
-        order_book = self.order_books[order.trading_pair.symbol]
-        
-        if order.side == OrderSide.BUY:
-            order_book["bids"].append(order)
-            order_book["bids"].sort(key=lambda x: (-x.price, x.timestamp))
-        else:
-            order_book["asks"].append(order)
-            order_book["asks"].sort(key=lambda x: (x.price, x.timestamp))
+        self._get_book(order.trading_pair.symbol).add(order)
     
     def _calculate_fees(self, trade: Trade) -> Dict[str, Decimal]:
         """Calculate trading fees for both parties"""
@@ -306,35 +1035,17 @@ class DistributedExchange:
             "taker_fee": trade_value * pair.taker_fee
         }
     
-    def _update_balances(self, trade: Trade) -> None:
-        """Update agent balances after trade execution"""
-        pair = trade.trading_pair
-        
-        # Update buyer balances
-        self.agent_balances[trade.buyer_agent_id][pair.base_asset] += trade.quantity
-        self.agent_balances[trade.buyer_agent_id][pair.quote_asset] -= trade.price * trade.quantity
-        
-        # Update seller balances
-        self.agent_balances[trade.seller_agent_id][pair.base_asset] -= trade.quantity
-        self.agent_balances[trade.seller_agent_id][pair.quote_asset] += trade.price * trade.quantity
-    
     def get_order_book(self, symbol: str, depth: int = 10) -> Dict[str, Any]:
         """Get order book for a trading pair"""
         if symbol not in self.trading_pairs:
             return {"error": "Invalid trading pair"}
         
-        order_book = self.order_books[symbol]
+        order_book = self._get_book(symbol)
         
         return {
             "symbol": symbol,
-            "bids": [
-                {"price": str(order.price), "quantity": str(order.remaining_quantity)}
-                for order in order_book["bids"][:depth]
-            ],
-            "asks": [
-                {"price": str(order.price), "quantity": str(order.remaining_quantity)}
-                for order in order_book["asks"][:depth]
-            ],
+            "bids": order_book.get_depth(OrderSide.BUY, depth),
+            "asks": order_book.get_depth(OrderSide.SELL, depth),
             "timestamp": time.time()
         }
     
@@ -349,31 +1060,343 @@ class DistributedExchange:
             "uptime_seconds": uptime,
             "transactions_per_second": round(tps, 2),
             "active_trading_pairs": len(self.trading_pairs),
-            "active_orders": len([o for o in self.orders.values() if o.status in [OrderStatus.PENDING, OrderStatus.PARTIAL]]),
+            "active_orders": len(self.orders),
+            "archived_orders": len(self.order_archive),
             "halted_pairs": list(self.halted_pairs)
         }
     
     async def cleanup_expired_orders(self) -> int:
         """Remove expired orders from the system"""
-        expired_count = 0
-        current_time = time.time()
+        return len(self._expire_orders(time.time()))
+    
+    def _expire_orders(self, current_time: float) -> List[str]:
+        """Cancel live orders whose TTL has passed, returning their ids"""
+        expired = []
+        heap = self._expiry_heap
         
-        for order in list(self.orders.values()):
-            if order.is_expired:
-                order.status = OrderStatus.CANCELLED
-                self._remove_from_order_book(order)
-                expired_count += 1
+        # Only entries whose expiry has passed are touched; entries for orders
+        # that were filled or cancelled in the meantime are simply dropped
+        while heap and heap[0][0] < current_time:
+            _, order_id = heapq.heappop(heap)
+            order = self.orders.get(order_id)
+            if order is None:
+                continue
+            
+            order.status = OrderStatus.CANCELLED
+            self._remove_from_order_book(order)
+            self._archive_order(order)
+            expired.append(order_id)
+        
+        return expired
+    
+    async def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        """Cancel a resting order by id"""
+        return self._cancel_order_sync(order_id)
+    
+    def _cancel_order_sync(self, order_id: str) -> Dict[str, Any]:
+        order = self.orders.get(order_id)
+        if order is None:
+            archived = self.order_archive.get(order_id)
+            if archived is not None:
+                return {"success": False, "reason": f"Order is {archived.status.value}"}
+            return {"success": False, "reason": "Unknown order"}
+        
+        order.status = OrderStatus.CANCELLED
+        self._remove_from_order_book(order)
+        self._archive_order(order)
         
-        return expired_count
+        return {
+            "success": True,
+            "order_id": order.id,
+            "status": order.status.value,
+            "filled_quantity": str(order.filled_quantity),
+            "remaining_quantity": str(order.remaining_quantity)
+        }
     
     def _remove_from_order_book(self, order: Order) -> None:
         """Remove order from order book"""
-        order_book = self.order_books[order.trading_pair.symbol]
+        order_book = self.order_books.get(order.trading_pair.symbol)
+        if order_book is not None:
+            order_book.remove(order.id)
+
+def _shard_worker(connection, fixed_point: bool) -> None:
+    """
+    Shard process main loop
+    Owns one DistributedExchange for the symbols pinned to it and serves
+    (op, request_id, payload) commands from the router in arrival order
+    """
+    exchange = DistributedExchange(fixed_point=fixed_point)
+    exchange.settle_balances = False
+    
+    while True:
+        try:
+            op, request_id, payload = connection.recv()
+        except EOFError:
+            break
         
-        if order.side == OrderSide.BUY and order in order_book["bids"]:
-            order_book["bids"].remove(order)
-        elif order.side == OrderSide.SELL and order in order_book["asks"]:
-            order_book["asks"].remove(order)
+        try:
+            if op == "place":
+                order, protection_price = payload
+                reason = exchange._check_order(order)
+                if reason is not None:
+                    order.status = OrderStatus.REJECTED
+                    result = {"valid": False, "reason": reason}
+                else:
+                    trades = exchange._execute_order(order, protection_price)
+                    result = {
+                        "valid": True,
+                        "order_id": order.id,
+                        "status": order.status.value,
+                        "matches": [
+                            {
+                                "trade_id": trade.id,
+                                "price": str(trade.price),
+                                "quantity": str(trade.quantity),
+                                "timestamp": trade.timestamp
+                            }
+                            for trade in trades
+                        ],
+                        "filled_quantity": str(order.filled_quantity),
+                        "remaining_quantity": str(order.remaining_quantity),
+                        "fills": [
+                            (trade.buyer_order_id, trade.seller_order_id, trade.price, trade.quantity)
+                            for trade in trades
+                        ]
+                    }
+            elif op == "cancel":
+                result = exchange._cancel_order_sync(payload)
+            elif op == "expire":
+                result = exchange._expire_orders(time.time())
+            elif op == "add_pair":
+                exchange.add_trading_pair(payload)
+                result = True
+            elif op == "halt":
+                symbol, halted = payload
+                if halted:
+                    exchange.halted_pairs.add(symbol)
+                else:
+                    exchange.halted_pairs.discard(symbol)
+                result = True
+            elif op == "book":
+                result = exchange.get_order_book(*payload)
+            elif op == "stats":
+                result = exchange.get_market_stats()
+            elif op == "stop":
+                connection.send((request_id, True))
+                break
+            else:
+                result = {"error": f"Unknown shard op: {op}"}
+        except Exception as e:
+            logger.error(f"Shard error handling {op}: {e}")
+            result = {"valid": False, "reason": str(e)}
+        
+        connection.send((request_id, result))
+    
+    exchange.trade_tape.close()
+    connection.close()
+
+class ShardedExchange:
+    """
+    Per-symbol sharded exchange front end
+    Each trading pair is pinned to one worker process running its own
+    matching engine; the router forwards order flow, merges statistics and
+    owns agent balances. Balances are reserved here before an order is
+    routed (quote for buys, base for sells) and settled from the fills the
+    shard reports, so checks stay consistent across symbols and shards
+    """
+    
+    def __init__(self, num_shards: Optional[int] = None, fixed_point: bool = False):
+        self.num_shards = num_shards or max(1, min(os.cpu_count() or 1, 8))
+        self.fixed_point = fixed_point
+        self.trading_pairs: Dict[str, TradingPair] = {}
+        self.symbol_shards: Dict[str, int] = {}
+        self.halted_pairs = set()
+        self.start_time = time.time()
+        
+        # Balances and per-order reservations across all shards
+        self.ledger = BalanceLedger()
+        self.market_slippage_cap = Decimal('0.05')  # Market buys pay at most best ask + 5%
+        
+        self._connections = []
+        self._processes = []
+        self._readers = []
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_request_id = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        logger.info(f"Sharded exchange configured with {self.num_shards} shards")
+    
+    async def start(self) -> None:
+        """Spawn one worker process per shard"""
+        self._loop = asyncio.get_running_loop()
+        
+        for shard in range(self.num_shards):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_worker, args=(child_conn, self.fixed_point),
+                name=f"exchange-shard-{shard}", daemon=True
+            )
+            process.start()
+            child_conn.close()
+            
+            reader = threading.Thread(target=self._read_replies, args=(parent_conn,), daemon=True)
+            reader.start()
+            
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+            self._readers.append(reader)
+        
+        # Pin pairs registered before start
+        for symbol, pair in self.trading_pairs.items():
+            await self._call(self.symbol_shards[symbol], "add_pair", pair)
+        
+        logger.info(f"Started {self.num_shards} exchange shards")
+    
+    async def stop(self) -> None:
+        """Stop all shard processes"""
+        for shard in range(len(self._connections)):
+            await self._call(shard, "stop")
+        for process in self._processes:
+            process.join(timeout=5)
+        for connection in self._connections:
+            connection.close()
+        
+        self._connections.clear()
+        self._processes.clear()
+        self._readers.clear()
+    
+    def _read_replies(self, connection) -> None:
+        """Reader thread: resolve pending futures from shard replies"""
+        while True:
+            try:
+                request_id, result = connection.recv()
+            except (EOFError, OSError):
+                break
+            future = self._pending.pop(request_id, None)
+            if future is not None:
+                self._loop.call_soon_threadsafe(self._resolve, future, result)
+    
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any) -> None:
+        if not future.done():
+            future.set_result(result)
+    
+    async def _call(self, shard: int, op: str, payload: Any = None) -> Any:
+        """Send a command to a shard and await its reply (requests are pipelined)"""
+        request_id = self._next_request_id
+        self._next_request_id += 1
+        
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        self._connections[shard].send((op, request_id, payload))
+        return await future
+    
+    async def add_trading_pair(self, pair: TradingPair) -> None:
+        """Pin a trading pair to a shard (round-robin in registration order)"""
+        self.trading_pairs[pair.symbol] = pair
+        shard = self.symbol_shards.setdefault(pair.symbol, len(self.symbol_shards) % self.num_shards)
+        if self._connections:
+            await self._call(shard, "add_pair", pair)
+        logger.info(f"Pinned trading pair {pair.symbol} to shard {shard}")
+    
+    async def set_halted(self, symbol: str, halted: bool) -> None:
+        """Halt or resume a symbol on its shard"""
+        if halted:
+            self.halted_pairs.add(symbol)
+        else:
+            self.halted_pairs.discard(symbol)
+        await self._call(self.symbol_shards[symbol], "halt", (symbol, halted))
+    
+    async def place_order(self, order: Order) -> Dict[str, Any]:
+        """Reserve balance, route the order to its shard and settle the fills"""
+        symbol = order.trading_pair.symbol
+        if symbol not in self.trading_pairs:
+            order.status = OrderStatus.REJECTED
+            return {"valid": False, "reason": "Invalid trading pair"}
+        
+        if symbol in self.halted_pairs:
+            order.status = OrderStatus.REJECTED
+            return {"valid": False, "reason": "Market halted"}
+        
+        reason = missing_price_reason(order)
+        if reason is not None:
+            order.status = OrderStatus.REJECTED
+            return {"valid": False, "reason": reason}
+        
+        # The shard's book sets a market buy's protection price, as on a single exchange
+        protection_price = None
+        if needs_protection_price(order):
+            asks = (await self.get_order_book(symbol, 1))["asks"]
+            if not asks:
+                order.status = OrderStatus.REJECTED
+                return {"valid": False, "reason": "No liquidity for market buy"}
+            protection_price = market_protection_price(
+                order.trading_pair, Decimal(asks[0]["price"]), self.market_slippage_cap
+            )
+        
+        if not self.ledger.reserve_order(order, protection_price):
+            order.status = OrderStatus.REJECTED
+            return {"valid": False, "reason": "Insufficient balance"}
+        
+        result = await self._call(self.symbol_shards[symbol], "place", (order, protection_price))
+        if not result.get("valid"):
+            self.ledger.release(order.id)
+            order.status = OrderStatus.REJECTED
+            return result
+        
+        pair = order.trading_pair
+        self.ledger.settle(pair.base_asset, pair.quote_asset, result.pop("fills"))
+        
+        # Mirror the shard's view of the order onto the caller's object
+        order.status = OrderStatus(result["status"])
+        order.filled_quantity = Decimal(result["filled_quantity"])
+        if order.status not in (OrderStatus.PENDING, OrderStatus.PARTIAL):
+            self.ledger.release(order.id)
+        
+        return result
+    
+    async def cancel_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        """Cancel a resting order on the symbol's shard"""
+        result = await self._call(self.symbol_shards[symbol], "cancel", order_id)
+        if result.get("success"):
+            self.ledger.release(order_id)
+        return result
+    
+    async def cleanup_expired_orders(self) -> int:
+        """Expire orders on every shard and release their reservations"""
+        expired = await asyncio.gather(*(
+            self._call(shard, "expire") for shard in range(len(self._connections))
+        ))
+        for order_ids in expired:
+            for order_id in order_ids:
+                self.ledger.release(order_id)
+        return sum(len(order_ids) for order_ids in expired)
+    
+    async def get_order_book(self, symbol: str, depth: int = 10) -> Dict[str, Any]:
+        """Get order book for a trading pair from its shard"""
+        if symbol not in self.symbol_shards:
+            return {"error": "Invalid trading pair"}
+        return await self._call(self.symbol_shards[symbol], "book", (symbol, depth))
+    
+    async def get_market_stats(self) -> Dict[str, Any]:
+        """Merge exchange statistics across shards"""
+        shard_stats = await asyncio.gather(*(
+            self._call(shard, "stats") for shard in range(len(self._connections))
+        ))
+        uptime = time.time() - self.start_time
+        total_trades = sum(stats["total_trades"] for stats in shard_stats)
+        
+        return {
+            "total_trades": total_trades,
+            "total_volume": str(sum((Decimal(stats["total_volume"]) for stats in shard_stats), Decimal('0'))),
+            "uptime_seconds": uptime,
+            "transactions_per_second": round(total_trades / uptime, 2) if uptime > 0 else 0,
+            "active_trading_pairs": len(self.trading_pairs),
+            "active_orders": sum(stats["active_orders"] for stats in shard_stats),
+            "archived_orders": sum(stats["archived_orders"] for stats in shard_stats),
+            "halted_pairs": list(self.halted_pairs),
+            "shards": self.num_shards
+        }
 
 # Factory function for creating standard trading pairs
 def create_standard_pairs() -> List[TradingPair]:
@@ -0,0 +1,605 @@
+"""
+Test Suite for the Distributed Exchange
+Covers price-time matching, fixed-point matching, batched placement,
+order expiry and archiving, the sharded front end, balance reservations,
+market buy protection, order rejection and the columnar trade tape
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import unittest
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core_exchange import (
+    DistributedExchange, ShardedExchange, BalanceLedger, TradeTape, FixedPointCodec,
+    TradingPair, MarketType, Order, OrderSide, OrderType, OrderStatus
+)
+
+BTC_USD = TradingPair("BTC", "USD", MarketType.SPOT, Decimal('0.0001'), Decimal('100'), 2, 8)
+
+def make_order(order_id: str, agent_id: str, side: OrderSide, quantity: str,
+               price: str = None, order_type: OrderType = None, timestamp: float = None) -> Order:
+    order = Order(
+        id=order_id,
+        agent_id=agent_id,
+        trading_pair=BTC_USD,
+        side=side,
+        order_type=order_type or (OrderType.LIMIT if price is not None else OrderType.MARKET),
+        quantity=Decimal(quantity),
+        price=Decimal(price) if price is not None else None
+    )
+    if timestamp is not None:
+        order.timestamp = timestamp
+    return order
+
+def make_exchange(**kwargs) -> DistributedExchange:
+    exchange = DistributedExchange(trade_tape_capacity=1024, **kwargs)
+    exchange.add_trading_pair(BTC_USD)
+    return exchange
+
+def place(exchange, order: Order) -> dict:
+    return asyncio.run(exchange.place_order(order))
+
+def random_flow(exchange: DistributedExchange, seed: int, count: int = 600) -> list:
+    """Place random limit orders (with some cancels) and collect what the exchange reports"""
+    rng = random.Random(seed)
+    for agent in range(5):
+        exchange.ledger.deposit(f"a{agent}", "USD", Decimal(10**7))
+        exchange.ledger.deposit(f"a{agent}", "BTC", Decimal(10**4))
+    
+    results = []
+    for i in range(count):
+        side = OrderSide.BUY if rng.random() < 0.5 else OrderSide.SELL
+        price = f"{rng.randint(9900, 10100) / 100:.2f}"
+        quantity = str(Decimal(rng.randint(1, 5000)) / 1000)
+        result = place(exchange, make_order(f"o{i}", f"a{rng.randrange(5)}", side, quantity,
+                                            price, timestamp=1000.0 + i))
+        results.append((result["status"], Decimal(result["filled_quantity"]),
+                        [(Decimal(match["price"]), Decimal(match["quantity"])) for match in result["matches"]]))
+        if rng.random() < 0.2:
+            results.append(asyncio.run(exchange.cancel_order(f"o{rng.randrange(i + 1)}"))["success"])
+    
+    # Compare amounts by value: Decimal mode keeps arithmetic scale (0.020), fixed-point normalises it
+    book = exchange.get_order_book("BTC/USD", 1000)
+    for side in ("bids", "asks"):
+        results.append([(Decimal(level["price"]), Decimal(level["quantity"])) for level in book[side]])
+    results.append(exchange.total_volume)
+    for agent in range(5):
+        for asset in ("USD", "BTC"):
+            results.append((exchange.ledger.get_available(f"a{agent}", asset),
+                            exchange.ledger.get_held(f"a{agent}", asset)))
+    return results
+
+class ReferenceBook:
+    """Plain list-based price-time matcher used as the expected behaviour"""
+    
+    def __init__(self):
+        self.bids = []  # [price, arrival, order id, remaining]
+        self.asks = []
+        self.arrival = 0
+    
+    def place(self, order_id: str, side: OrderSide, price: Decimal, quantity: Decimal) -> list:
+        is_buy = side == OrderSide.BUY
+        opposing = self.asks if is_buy else self.bids
+        opposing.sort(key=lambda entry: (entry[0] if is_buy else -entry[0], entry[1]))
+        
+        fills = []
+        while quantity > 0 and opposing:
+            best = opposing[0]
+            if (is_buy and price < best[0]) or (not is_buy and price > best[0]):
+                break
+            fill = min(quantity, best[3])
+            fills.append((best[0], fill))
+            quantity -= fill
+            best[3] -= fill
+            if best[3] == 0:
+                opposing.pop(0)
+        
+        if quantity > 0:
+            self.arrival += 1
+            (self.bids if is_buy else self.asks).append([price, self.arrival, order_id, quantity])
+        return fills
+    
+    def cancel(self, order_id: str) -> bool:
+        for entries in (self.bids, self.asks):
+            for entry in entries:
+                if entry[2] == order_id:
+                    entries.remove(entry)
+                    return True
+        return False
+    
+    def depth(self, entries: list, best_first_key) -> list:
+        levels = {}
+        for price, _, _, remaining in entries:
+            levels[price] = levels.get(price, Decimal('0')) + remaining
+        return sorted(levels.items(), key=lambda level: best_first_key(level[0]))
+
+class TestMatchingEngine(unittest.TestCase):
+    """Price-level books match in price-time priority with the original result schema"""
+    
+    def setUp(self):
+        self.exchange = make_exchange()
+        for agent in ("maker", "taker"):
+            self.exchange.ledger.deposit(agent, "USD", Decimal('10000000'))
+            self.exchange.ledger.deposit(agent, "BTC", Decimal('100000'))
+    
+    def test_price_then_time_priority(self):
+        place(self.exchange, make_order("a1", "maker", OrderSide.SELL, "1", "101"))
+        place(self.exchange, make_order("a2", "maker", OrderSide.SELL, "1", "100"))
+        place(self.exchange, make_order("a3", "maker", OrderSide.SELL, "1", "100"))
+        
+        result = place(self.exchange, make_order("b1", "taker", OrderSide.BUY, "2.5", "101"))
+        
+        self.assertEqual([(match["price"], match["quantity"]) for match in result["matches"]],
+                         [("100", "1"), ("100", "1"), ("101", "0.5")])
+        self.assertEqual(self.exchange.get_order("a2").status, OrderStatus.FILLED)
+        self.assertEqual(self.exchange.get_order("a3").status, OrderStatus.FILLED)
+        self.assertEqual(self.exchange.get_order("a1").status, OrderStatus.PARTIAL)
+        self.assertEqual(self.exchange.get_order_book("BTC/USD")["asks"], [{"price": "101", "quantity": "0.5"}])
+    
+    def test_result_schema(self):
+        result = place(self.exchange, make_order("b1", "taker", OrderSide.BUY, "1", "99"))
+        self.assertEqual(set(result), {"valid", "order_id", "status", "matches",
+                                       "filled_quantity", "remaining_quantity"})
+        self.assertEqual(result["status"], "pending")
+        self.assertEqual(result["remaining_quantity"], "1")
+        
+        result = place(self.exchange, make_order("s1", "maker", OrderSide.SELL, "1", "99"))
+        self.assertEqual(set(result["matches"][0]), {"trade_id", "price", "quantity", "timestamp"})
+        self.assertEqual(result["status"], "filled")
+    
+    def test_cancel_removes_level(self):
+        place(self.exchange, make_order("b1", "taker", OrderSide.BUY, "1", "99"))
+        place(self.exchange, make_order("b2", "taker", OrderSide.BUY, "2", "98"))
+        
+        asyncio.run(self.exchange.cancel_order("b1"))
+        
+        self.assertEqual(self.exchange.get_order_book("BTC/USD")["bids"], [{"price": "98", "quantity": "2"}])
+        result = place(self.exchange, make_order("s1", "maker", OrderSide.SELL, "1", "98"))
+        self.assertEqual(result["matches"][0]["price"], "98")
+    
+    def test_random_flow_matches_reference(self):
+        rng = random.Random(3)
+        reference = ReferenceBook()
+        placed = []
+        for i in range(1500):
+            side = OrderSide.BUY if rng.random() < 0.5 else OrderSide.SELL
+            price = Decimal(rng.randint(9950, 10050)) / 100
+            quantity = Decimal(rng.randint(1, 40)) / 10
+            agent = "taker" if side == OrderSide.BUY else "maker"
+            
+            result = place(self.exchange, make_order(f"o{i}", agent, side, str(quantity), str(price)))
+            expected = reference.place(f"o{i}", side, price, quantity)
+            self.assertEqual([(Decimal(match["price"]), Decimal(match["quantity"])) for match in result["matches"]],
+                             expected)
+            placed.append(f"o{i}")
+            
+            if rng.random() < 0.25:
+                order_id = placed.pop(rng.randrange(len(placed)))
+                cancelled = asyncio.run(self.exchange.cancel_order(order_id))["success"]
+                self.assertEqual(cancelled, reference.cancel(order_id))
+        
+        book = self.exchange.get_order_book("BTC/USD", 1000)
+        self.assertEqual([(Decimal(level["price"]), Decimal(level["quantity"])) for level in book["bids"]],
+                         reference.depth(reference.bids, lambda price: -price))
+        self.assertEqual([(Decimal(level["price"]), Decimal(level["quantity"])) for level in book["asks"]],
+                         reference.depth(reference.asks, lambda price: price))
+
+class TestBatchPlacement(unittest.TestCase):
+    """place_orders validates a batch in one pass and matches it in arrival order"""
+    
+    def make_funded_exchange(self) -> DistributedExchange:
+        exchange = make_exchange()
+        for agent in range(4):
+            exchange.ledger.deposit(f"a{agent}", "USD", Decimal('100000'))
+            exchange.ledger.deposit(f"a{agent}", "BTC", Decimal('1000'))
+        return exchange
+    
+    def random_orders(self, seed: int, count: int = 400) -> list:
+        rng = random.Random(seed)
+        return [
+            make_order(f"o{i}", f"a{rng.randrange(4)}",
+                       OrderSide.BUY if rng.random() < 0.5 else OrderSide.SELL,
+                       str(Decimal(rng.randint(1, 30)) / 10), f"{rng.randint(9950, 10050) / 100:.2f}",
+                       timestamp=1000.0 + i)
+            for i in range(count)
+        ]
+    
+    def test_batch_matches_sequential_placement(self):
+        sequential = self.make_funded_exchange()
+        expected = [place(sequential, order) for order in self.random_orders(5)]
+        
+        batched = self.make_funded_exchange()
+        result = asyncio.run(batched.place_orders(self.random_orders(5)))
+        
+        self.assertEqual(result["count"], len(expected))
+        self.assertEqual(result["valid"], [r["valid"] for r in expected])
+        # Batch statuses and fills are as of the end of the batch
+        final_orders = [sequential.get_order(order_id) for order_id in result["order_ids"]]
+        self.assertEqual(result["status"], [order.status.value for order in final_orders])
+        self.assertEqual(result["filled_quantity"], [str(order.filled_quantity) for order in final_orders])
+        
+        trades = result["trades"]
+        expected_trades = [(i, match["price"], match["quantity"])
+                           for i, r in enumerate(expected) for match in r["matches"]]
+        self.assertEqual(list(zip(trades["order_index"], trades["price"], trades["quantity"])), expected_trades)
+        self.assertEqual(batched.get_order_book("BTC/USD", 1000)["bids"], sequential.get_order_book("BTC/USD", 1000)["bids"])
+        self.assertEqual(batched.get_order_book("BTC/USD", 1000)["asks"], sequential.get_order_book("BTC/USD", 1000)["asks"])
+        for agent in range(4):
+            self.assertEqual(batched.ledger.get_balances(f"a{agent}"), sequential.ledger.get_balances(f"a{agent}"))
+    
+    def test_arrival_order_follows_timestamps(self):
+        exchange = self.make_funded_exchange()
+        place(exchange, make_order("ask", "a0", OrderSide.SELL, "1", "100", timestamp=1.0))
+        
+        late = make_order("late", "a1", OrderSide.BUY, "1", "100", timestamp=3.0)
+        early = make_order("early", "a2", OrderSide.BUY, "1", "100", timestamp=2.0)
+        result = asyncio.run(exchange.place_orders([late, early]))
+        
+        self.assertEqual(result["status"], ["pending", "filled"])
+        self.assertEqual(result["trades"]["order_index"], [1])
+    
+    def test_batch_reservations_see_earlier_orders(self):
+        exchange = make_exchange()
+        exchange.ledger.deposit("buyer", "USD", Decimal('150'))
+        orders = [make_order(f"b{i}", "buyer", OrderSide.BUY, "1", "100") for i in range(2)]
+        orders.append(make_order("bad", "buyer", OrderSide.BUY, "1"))
+        
+        result = asyncio.run(exchange.place_orders(orders))
+        
+        self.assertEqual(result["valid"], [True, False, False])
+        self.assertEqual(result["reasons"], [None, "Insufficient balance", "No liquidity for market buy"])
+        self.assertEqual(exchange.ledger.get_held("buyer", "USD"), Decimal('100'))
+
+class TestOrderExpiry(unittest.TestCase):
+    """TTL expiry only touches expired orders; finished orders move to a bounded archive"""
+    
+    def setUp(self):
+        self.exchange = make_exchange(archive_size=3)
+        self.exchange.ledger.deposit("buyer", "USD", Decimal('10000'))
+        self.exchange.ledger.deposit("seller", "BTC", Decimal('100'))
+    
+    def rest(self, order_id: str, price: str, ttl: float = None, timestamp: float = 1000.0) -> Order:
+        order = make_order(order_id, "buyer", OrderSide.BUY, "1", price, timestamp=timestamp)
+        order.ttl = ttl
+        place(self.exchange, order)
+        return order
+    
+    def test_expired_orders_are_cancelled_and_released(self):
+        self.rest("short", "90", ttl=5)
+        self.rest("long", "91", ttl=50)
+        self.rest("forever", "92")
+        
+        expired = self.exchange._expire_orders(1010.0)
+        
+        self.assertEqual(expired, ["short"])
+        self.assertEqual(self.exchange.get_order("short").status, OrderStatus.CANCELLED)
+        self.assertNotIn("short", self.exchange.orders)
+        self.assertEqual(self.exchange.ledger.get_held("buyer", "USD"), Decimal('183'))
+        self.assertEqual([level["price"] for level in self.exchange.get_order_book("BTC/USD")["bids"]], ["92", "91"])
+        self.assertEqual(self.exchange._expire_orders(1100.0), ["long"])
+    
+    def test_filled_orders_leave_stale_heap_entries_only(self):
+        self.rest("b1", "100", ttl=5)
+        place(self.exchange, make_order("s1", "seller", OrderSide.SELL, "1", "100"))
+        
+        self.assertEqual(self.exchange.get_order("b1").status, OrderStatus.FILLED)
+        self.assertEqual(self.exchange._expire_orders(2000.0), [])
+        self.assertEqual(self.exchange._expiry_heap, [])
+    
+    def test_cleanup_uses_wall_clock(self):
+        self.rest("old", "90", ttl=1, timestamp=1.0)
+        self.assertEqual(asyncio.run(self.exchange.cleanup_expired_orders()), 1)
+    
+    def test_archive_is_bounded(self):
+        for i in range(5):
+            self.rest(f"b{i}", "90")
+            asyncio.run(self.exchange.cancel_order(f"b{i}"))
+        
+        self.assertEqual(self.exchange.orders, {})
+        self.assertEqual(list(self.exchange.order_archive), ["b2", "b3", "b4"])
+        self.assertIsNone(self.exchange.get_order("b0"))
+        self.assertEqual(asyncio.run(self.exchange.cancel_order("b4"))["reason"], "Order is cancelled")
+
+class TestShardedExchange(unittest.TestCase):
+    """Shard workers match like a single exchange while the router owns balances"""
+    
+    PAIRS = [
+        BTC_USD,
+        TradingPair("ETH", "USD", MarketType.SPOT, Decimal('0.001'), Decimal('1000'), 2, 6),
+        TradingPair("SOL", "USD", MarketType.SPOT, Decimal('0.01'), Decimal('10000'), 2, 4)
+    ]
+    
+    def test_sharded_flow_matches_single_exchange(self):
+        async def scenario():
+            sharded = ShardedExchange(num_shards=2)
+            for pair in self.PAIRS:
+                await sharded.add_trading_pair(pair)
+            await sharded.start()
+            single = DistributedExchange(trade_tape_capacity=1024)
+            for pair in self.PAIRS:
+                single.add_trading_pair(pair)
+            for exchange in (sharded, single):
+                for agent in range(3):
+                    for asset in ("USD", "BTC", "ETH", "SOL"):
+                        exchange.ledger.deposit(f"a{agent}", asset, Decimal('1000000'))
+            
+            try:
+                rng = random.Random(8)
+                for i in range(300):
+                    pair = self.PAIRS[rng.randrange(len(self.PAIRS))]
+                    side = OrderSide.BUY if rng.random() < 0.5 else OrderSide.SELL
+                    args = (f"o{i}", f"a{rng.randrange(3)}", pair, side, OrderType.LIMIT,
+                            Decimal(rng.randint(1, 20)), Decimal(rng.randint(95, 105)))
+                    sharded_result = await sharded.place_order(Order(*args))
+                    single_result = await single.place_order(Order(*args))
+                    self.assertEqual(sharded_result["valid"], single_result["valid"])
+                    self.assertEqual(sharded_result["filled_quantity"], single_result["filled_quantity"])
+                    self.assertEqual([(m["price"], m["quantity"]) for m in sharded_result["matches"]],
+                                     [(m["price"], m["quantity"]) for m in single_result["matches"]])
+                
+                stats = await sharded.get_market_stats()
+                self.assertEqual(stats["total_trades"], single.total_trades)
+                self.assertEqual(stats["active_orders"], len(single.orders))
+                self.assertEqual(len(sharded.ledger.holds), stats["active_orders"])
+                for agent in range(3):
+                    self.assertEqual(sharded.ledger.get_balances(f"a{agent}"), single.ledger.get_balances(f"a{agent}"))
+                
+                book = await sharded.get_order_book("ETH/USD", 5)
+                self.assertEqual(book["bids"], single.get_order_book("ETH/USD", 5)["bids"])
+                
+                # Market buys are capped from the shard's book without pricing the order
+                order = Order("m1", "a0", BTC_USD, OrderSide.BUY, OrderType.MARKET, Decimal('1'), None)
+                result = await sharded.place_order(order)
+                self.assertTrue(result["valid"])
+                self.assertIsNone(order.price)
+                self.assertNotIn("m1", sharded.ledger.holds)
+            finally:
+                await sharded.stop()
+        
+        asyncio.run(scenario())
+    
+    def test_cancel_and_halt_route_to_shard(self):
+        async def scenario():
+            sharded = ShardedExchange(num_shards=2)
+            await sharded.start()
+            try:
+                await sharded.add_trading_pair(BTC_USD)
+                sharded.ledger.deposit("buyer", "USD", Decimal('1000'))
+                await sharded.place_order(make_order("b1", "buyer", OrderSide.BUY, "1", "100"))
+                self.assertEqual(sharded.ledger.get_held("buyer", "USD"), Decimal('100'))
+                
+                cancelled = await sharded.cancel_order("b1", "BTC/USD")
+                self.assertTrue(cancelled["success"])
+                self.assertEqual(sharded.ledger.get_held("buyer", "USD"), Decimal('0'))
+                
+                await sharded.set_halted("BTC/USD", True)
+                halted = await sharded.place_order(make_order("b2", "buyer", OrderSide.BUY, "1", "100"))
+                self.assertEqual(halted["reason"], "Market halted")
+                self.assertEqual(sharded.ledger.get_available("buyer", "USD"), Decimal('1000'))
+            finally:
+                await sharded.stop()
+        
+        asyncio.run(scenario())
+
+class TestFixedPointCodec(unittest.TestCase):
+    """Ticks and lots round-trip and keep the caller's Decimal scale"""
+    
+    def test_round_trip(self):
+        codec = FixedPointCodec.for_pair(BTC_USD)
+        self.assertEqual(codec.tick_size, Decimal('0.01'))
+        self.assertEqual(codec.lot_size, Decimal('0.00000001'))
+        self.assertEqual(codec.to_ticks(Decimal('101.25')), 10125)
+        self.assertEqual(codec.from_ticks(10125), Decimal('101.25'))
+        self.assertEqual(codec.to_lots(Decimal('0.5')), 50_000_000)
+        self.assertEqual(str(codec.from_lots(50_000_000)), "0.5")
+        self.assertEqual(str(codec.from_lots(300_000_000)), "3")
+    
+    def test_alignment(self):
+        codec = FixedPointCodec(Decimal('0.05'), Decimal('0.1'))
+        self.assertTrue(codec.is_aligned(Decimal('1.15'), Decimal('2.3')))
+        self.assertTrue(codec.is_aligned(None, Decimal('2')))
+        self.assertFalse(codec.is_aligned(Decimal('1.12'), Decimal('2')))
+        self.assertFalse(codec.is_aligned(Decimal('1.15'), Decimal('2.05')))
+
+class TestFixedPointMatching(unittest.TestCase):
+    """Fixed-point books match exactly like Decimal books"""
+    
+    def test_same_results_as_decimal_mode(self):
+        for seed in range(3):
+            self.assertEqual(random_flow(make_exchange(), seed),
+                             random_flow(make_exchange(fixed_point=True), seed))
+    
+    def test_off_grid_orders_rejected(self):
+        exchange = make_exchange(fixed_point=True)
+        exchange.ledger.deposit("taker", "USD", Decimal('1000'))
+        
+        result = place(exchange, make_order("b1", "taker", OrderSide.BUY, "1", "100.005"))
+        
+        self.assertEqual(result["reason"], "Price or quantity not aligned to tick/lot size")
+        self.assertEqual(exchange.ledger.get_held("taker", "USD"), Decimal('0'))
+
+class TestBalanceLedger(unittest.TestCase):
+    """Reservations move funds between available and held"""
+    
+    def setUp(self):
+        self.ledger = BalanceLedger()
+        self.ledger.deposit("alice", "USD", Decimal('1000'))
+        self.ledger.deposit("bob", "BTC", Decimal('5'))
+    
+    def test_reserve_and_release(self):
+        order = make_order("b1", "alice", OrderSide.BUY, "2", "100")
+        self.assertTrue(self.ledger.reserve_order(order))
+        self.assertEqual(self.ledger.get_available("alice", "USD"), Decimal('800'))
+        self.assertEqual(self.ledger.get_held("alice", "USD"), Decimal('200'))
+        
+        self.ledger.release("b1")
+        self.assertEqual(self.ledger.get_available("alice", "USD"), Decimal('1000'))
+        self.assertEqual(self.ledger.get_held("alice", "USD"), Decimal('0'))
+        self.assertNotIn("b1", self.ledger.holds)
+    
+    def test_reserve_refuses_shortfall(self):
+        order = make_order("b1", "alice", OrderSide.BUY, "20", "100")
+        self.assertFalse(self.ledger.reserve_order(order))
+        self.assertEqual(self.ledger.get_available("alice", "USD"), Decimal('1000'))
+    
+    def test_buy_without_price_uses_protection_price(self):
+        order = make_order("m1", "alice", OrderSide.BUY, "2")
+        self.assertFalse(self.ledger.reserve_order(order))
+        self.assertTrue(self.ledger.reserve_order(order, Decimal('105')))
+        self.assertEqual(self.ledger.get_held("alice", "USD"), Decimal('210'))
+        self.assertIsNone(order.price)
+    
+    def test_settle_returns_price_improvement(self):
+        buy = make_order("b1", "alice", OrderSide.BUY, "2", "100")
+        sell = make_order("s1", "bob", OrderSide.SELL, "2", "90")
+        self.ledger.reserve_order(buy)
+        self.ledger.reserve_order(sell)
+        
+        self.ledger.settle("BTC", "USD", [("b1", "s1", Decimal('90'), Decimal('2'))])
+        
+        self.assertEqual(self.ledger.get_balance("alice", "USD"), Decimal('820'))
+        self.assertEqual(self.ledger.get_held("alice", "USD"), Decimal('0'))
+        self.assertEqual(self.ledger.get_balance("alice", "BTC"), Decimal('2'))
+        self.assertEqual(self.ledger.get_balance("bob", "USD"), Decimal('180'))
+        self.assertEqual(self.ledger.get_balance("bob", "BTC"), Decimal('3'))
+        self.assertEqual(self.ledger.holds, {})
+
+class TestOrderReservations(unittest.TestCase):
+    """The exchange reserves funds before matching and releases them when orders finish"""
+    
+    def setUp(self):
+        self.exchange = make_exchange()
+        ledger = self.exchange.ledger
+        ledger.deposit("maker", "BTC", Decimal('10'))
+        ledger.deposit("taker", "USD", Decimal('1000'))
+        ledger.deposit("poor", "USD", Decimal('1'))
+        for i, price in enumerate(("100.00", "103.00", "110.00")):
+            place(self.exchange, make_order(f"ask{i}", "maker", OrderSide.SELL, "1", price))
+    
+    def test_market_buy_keeps_no_price(self):
+        order = make_order("m1", "taker", OrderSide.BUY, "2")
+        result = place(self.exchange, order)
+        
+        self.assertTrue(result["valid"])
+        self.assertIsNone(order.price)
+        self.assertEqual(order.order_type, OrderType.MARKET)
+        self.assertEqual([match["price"] for match in result["matches"]], ["100.00", "103.00"])
+        self.assertEqual(self.exchange.ledger.get_balance("taker", "USD"), Decimal('797'))
+        self.assertEqual(self.exchange.ledger.get_held("taker", "USD"), Decimal('0'))
+    
+    def test_market_buy_stops_at_protection_price(self):
+        # Best ask 100 plus the 5% cap stops before the 110 level
+        order = make_order("m1", "taker", OrderSide.BUY, "3")
+        result = place(self.exchange, order)
+        
+        self.assertEqual(result["filled_quantity"], "2")
+        self.assertEqual(order.status, OrderStatus.CANCELLED)
+        self.assertEqual(self.exchange.ledger.get_held("taker", "USD"), Decimal('0'))
+    
+    def test_market_buy_rejected_when_unaffordable(self):
+        result = place(self.exchange, make_order("m1", "poor", OrderSide.BUY, "2"))
+        self.assertEqual(result["reason"], "Insufficient balance")
+        self.assertEqual(self.exchange.ledger.get_available("poor", "USD"), Decimal('1'))
+    
+    def test_priced_order_types_require_price(self):
+        for order_type, reason in ((OrderType.LIMIT, "Limit order requires price"),
+                                   (OrderType.STOP_LOSS, "Stop loss order requires price"),
+                                   (OrderType.TAKE_PROFIT, "Take profit order requires price")):
+            order = make_order(f"{order_type.value}_buy", "taker", OrderSide.BUY, "1", order_type=order_type)
+            result = place(self.exchange, order)
+            self.assertEqual(result["reason"], reason)
+            self.assertEqual(order.status, OrderStatus.REJECTED)
+    
+    def test_failed_placement_releases_reservation(self):
+        def fail(order, protection_price=None):
+            raise RuntimeError("matching failed")
+        self.exchange._execute_order = fail
+        
+        result = place(self.exchange, make_order("b1", "taker", OrderSide.BUY, "1", "99"))
+        
+        self.assertFalse(result["valid"])
+        self.assertEqual(self.exchange.ledger.get_available("taker", "USD"), Decimal('1000'))
+        self.assertEqual(self.exchange.ledger.get_held("taker", "USD"), Decimal('0'))
+        self.assertNotIn("b1", self.exchange.ledger.holds)
+    
+    def test_cancel_releases_reservation(self):
+        place(self.exchange, make_order("b1", "taker", OrderSide.BUY, "2", "95"))
+        self.assertEqual(self.exchange.ledger.get_held("taker", "USD"), Decimal('190'))
+        
+        result = asyncio.run(self.exchange.cancel_order("b1"))
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(self.exchange.ledger.get_held("taker", "USD"), Decimal('0'))
+        self.assertEqual(self.exchange.get_order("b1").status, OrderStatus.CANCELLED)
+
+class TestTradeTape(unittest.TestCase):
+    """Columnar trade tape grows on demand, then wraps and spills the oldest rows"""
+    
+    def make_tape(self, **kwargs) -> TradeTape:
+        tape = TradeTape(**kwargs)
+        tape.add_symbol("BTC/USD", FixedPointCodec(Decimal('0.01'), Decimal('0.001')))
+        return tape
+    
+    def fill(self, tape: TradeTape, count: int) -> None:
+        for i in range(count):
+            tape.append(0, 10000 + i, 1000, f"buyer{i % 3}", "seller", float(i))
+    
+    def test_columns_start_small_and_grow_to_capacity(self):
+        tape = self.make_tape(capacity=100, initial_capacity=8)
+        self.assertEqual(len(tape.prices), 8)
+        
+        self.fill(tape, 20)
+        self.assertEqual(len(tape.prices), 32)
+        self.assertEqual(len(tape), 20)
+        
+        self.fill(tape, 200)
+        self.assertEqual(len(tape.prices), 100)
+        self.assertEqual(len(tape), 100)
+    
+    def test_exchange_tape_does_not_preallocate_capacity(self):
+        exchange = DistributedExchange()
+        self.assertEqual(exchange.trade_tape.capacity, 1_000_000)
+        self.assertLess(exchange.trade_tape.prices.nbytes, 1_000_000)
+    
+    def test_ring_keeps_most_recent_trades(self):
+        tape = self.make_tape(capacity=16, initial_capacity=4)
+        self.fill(tape, 40)
+        
+        trades = tape.last(100)
+        self.assertEqual(len(trades), 16)
+        self.assertEqual([trade["timestamp"] for trade in trades], [float(i) for i in range(24, 40)])
+        self.assertEqual(trades[-1]["price"], "100.39")
+        self.assertEqual(trades[-1]["quantity"], "1")
+    
+    def test_vwap_and_agent_fills(self):
+        tape = self.make_tape(capacity=64)
+        tape.append(0, 10000, 1000, "alice", "bob", 1.0)
+        tape.append(0, 11000, 3000, "bob", "alice", 2.0)
+        
+        self.assertAlmostEqual(tape.vwap("BTC/USD"), 107.5)
+        self.assertAlmostEqual(tape.vwap("BTC/USD", since=2.0), 110.0)
+        self.assertIsNone(tape.vwap("ETH/USD"))
+        self.assertEqual([fill["side"] for fill in tape.agent_fills("alice")], ["buy", "sell"])
+        self.assertEqual(tape.agent_fills("nobody"), [])
+    
+    def test_overwritten_rows_spill_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            tape = self.make_tape(capacity=8, initial_capacity=2,
+                                  spill_path=os.path.join(directory, "tape.bin"))
+            self.fill(tape, 40)
+            
+            spilled = tape.spilled()
+            self.assertEqual(tape.spilled_rows, 32)
+            self.assertEqual(list(spilled["timestamp"]), [float(i) for i in range(32)])
+            self.assertEqual(list(spilled["price"][:3]), [10000, 10001, 10002])
+            del spilled
+            tape.close()
+
+if __name__ == "__main__":
+    unittest.main()
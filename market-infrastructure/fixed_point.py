@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Fixed-Point Price and Quantity Codec
+Shared by the exchange matching books and the order book engine
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+
+class FixedPointCodec:
+    """
+    Scaled-integer representation of prices (ticks) and quantities (lots)
+    Used by fixed-point books so matching and aggregation run on plain ints
+    """
+    __slots__ = ("tick_size", "lot_size")
+    
+    def __init__(self, tick_size: Decimal, lot_size: Decimal):
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+    
+    @classmethod
+    def for_pair(cls, pair, tick_size: Optional[Decimal] = None) -> "FixedPointCodec":
+        """Derive tick and lot size from a trading pair's precisions"""
+        return cls(tick_size or Decimal(1).scaleb(-pair.price_precision),
+                   Decimal(1).scaleb(-pair.quantity_precision))
+    
+    def to_ticks(self, price: Decimal) -> int:
+        return int((price / self.tick_size).to_integral_value(ROUND_HALF_UP))
+    
+    def to_lots(self, quantity: Decimal) -> int:
+        return int((quantity / self.lot_size).to_integral_value(ROUND_HALF_UP))
+    
+    def from_ticks(self, ticks: int) -> Decimal:
+        return ticks * self.tick_size
+    
+    def from_lots(self, lots: int) -> Decimal:
+        # Drop the lot grid's trailing zeros so quantities keep the caller's Decimal scale
+        quantity = (lots * self.lot_size).normalize()
+        return quantity.quantize(Decimal(1)) if quantity.as_tuple().exponent > 0 else quantity
+    
+    def is_aligned(self, price: Optional[Decimal], quantity: Decimal) -> bool:
+        """Check that price and quantity sit exactly on the tick/lot grid"""
+        if price is not None and price % self.tick_size != 0:
+            return False
+        return quantity % self.lot_size == 0
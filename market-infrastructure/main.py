@@ -348,6 +348,7 @@ class MarketInfrastructureOrchestrator:
             'total_trades': self.performance_metrics['total_trades'],
             'transactions_per_second': self.performance_metrics['transactions_per_second'],
             'uptime_hours': self.performance_metrics['uptime_seconds'] / 3600,
+            'hft_latency': self.hft_engine.get_latency_report() if self.hft_engine else {},
             'system_health': 'operational' if self.is_running else 'stopped'
         }
 
@@ -5,8 +5,8 @@ Ensures deep liquidity across all trading pairs
 """
 
 import asyncio
+import math
 import time
-import uuid
 from typing import Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass, field
 from decimal import Decimal, ROUND_HALF_UP
@@ -18,6 +18,20 @@ from abc import ABC, abstractmethod
 
 logger = logging.getLogger(__name__)
 
+class QuoteIdSequence:
+    """Monotonically increasing quote ids (much cheaper than a uuid4 per quote)"""
+    
+    def __init__(self, start: int = 1):
+        self.next_id = start
+    
+    def take(self, n: int = 1) -> int:
+        """Reserve n consecutive ids and return the first"""
+        first_id = self.next_id
+        self.next_id += n
+        return first_id
+
+_quote_ids = QuoteIdSequence()
+
 class LiquidityTier(Enum):
     TIER_1 = "tier_1"  # Major pairs, tightest spreads
     TIER_2 = "tier_2"  # Popular pairs, moderate spreads
@@ -97,44 +111,177 @@ class InventoryManager:
         
         return target_position - current_position
 
+class StreamingVolatility:
+    """
+    Constant-time volatility state for one symbol
+    Every estimator is updated from the same price stream:
+    - close-to-close: rolling sums of log returns and squared log returns over
+      the last window_size prices (resynchronised periodically to bound drift)
+    - EWMA: exponentially weighted variance of the same log returns
+    - Parkinson / Garman-Klass: range estimators over bars of bar_ticks prices,
+      averaged over the last bar_window bars
+    All variances are per price update, annualised like the original estimator
+    """
+    
+    ANNUALISATION = 86400  # Assuming 1 day = 86400 price updates
+    RESYNC_INTERVAL = 1000  # Window evictions between exact recomputations
+    
+    def __init__(self, window_size: int = 100, ewma_lambda: float = 0.94,
+                 bar_ticks: int = 10, bar_window: int = 20):
+        self.window_size = window_size
+        self.ewma_lambda = ewma_lambda
+        self.bar_ticks = bar_ticks
+        
+        self.price_count = 0
+        self.last_price: Optional[float] = None
+        
+        # Close-to-close window: returns between consecutive prices in the window
+        # (None where the older price was not positive)
+        self.returns: deque = deque()
+        self.return_count = 0
+        self.sum_returns = 0.0
+        self.sum_squares = 0.0
+        self._evictions = 0
+        
+        # EWMA
+        self.ewma_variance: Optional[float] = None
+        
+        # Range bars: open, high, low, ticks in the current bar
+        self._bar: Optional[List[float]] = None
+        self._bar_close: Optional[float] = None
+        self.parkinson_terms: deque = deque(maxlen=bar_window)
+        self.garman_klass_terms: deque = deque(maxlen=bar_window)
+    
+    def update(self, price: float) -> None:
+        self.price_count += 1
+        previous = self.last_price
+        self.last_price = price
+        
+        if previous is not None:
+            self._add_return(math.log(price / previous) if price > 0 and previous > 0 else None)
+        self._update_bar(price)
+    
+    def _add_return(self, log_return: Optional[float]) -> None:
+        # The window holds window_size prices, i.e. at most window_size - 1 returns
+        self.returns.append(log_return)
+        if len(self.returns) >= self.window_size:
+            evicted = self.returns.popleft()
+            if evicted is not None:
+                self.return_count -= 1
+                self.sum_returns -= evicted
+                self.sum_squares -= evicted * evicted
+                self._evictions += 1
+        
+        if log_return is not None:
+            self.return_count += 1
+            self.sum_returns += log_return
+            self.sum_squares += log_return * log_return
+            
+            squared = log_return * log_return
+            if self.ewma_variance is None:
+                self.ewma_variance = squared
+            else:
+                self.ewma_variance = self.ewma_lambda * self.ewma_variance + (1 - self.ewma_lambda) * squared
+        
+        if self._evictions >= self.RESYNC_INTERVAL:
+            self._resync()
+    
+    def _resync(self) -> None:
+        live = [r for r in self.returns if r is not None]
+        self.sum_returns = float(np.sum(live))
+        self.sum_squares = float(np.dot(live, live))
+        self._evictions = 0
+    
+    def _update_bar(self, price: float) -> None:
+        bar = self._bar
+        if bar is None:
+            # Bars open at the previous bar's close so consecutive bars are contiguous
+            bar_open = self._bar_close if self._bar_close is not None else price
+            bar = self._bar = [bar_open, max(bar_open, price), min(bar_open, price), 1]
+        else:
+            bar[1] = max(bar[1], price)
+            bar[2] = min(bar[2], price)
+            bar[3] += 1
+        
+        if bar[3] >= self.bar_ticks:
+            bar_open, high, low, _ = bar
+            if low > 0 and bar_open > 0:
+                range_term = math.log(high / low) ** 2
+                close_term = math.log(price / bar_open) ** 2
+                self.parkinson_terms.append(range_term / (4 * math.log(2)))
+                self.garman_klass_terms.append(0.5 * range_term - (2 * math.log(2) - 1) * close_term)
+            self._bar = None
+            self._bar_close = price
+    
+    def variance(self, method: str) -> Optional[float]:
+        """Per-update variance for a method, or None if it has no data yet"""
+        if method == "close_to_close":
+            n = self.return_count
+            if n == 0:
+                return None
+            mean = self.sum_returns / n
+            return max(0.0, self.sum_squares / n - mean * mean)
+        
+        if method == "ewma":
+            return self.ewma_variance
+        
+        terms = self.parkinson_terms if method == "parkinson" else self.garman_klass_terms
+        if not terms:
+            return None
+        return max(0.0, sum(terms) / len(terms)) / self.bar_ticks
+    
+    def volatility(self, method: str) -> Optional[float]:
+        variance = self.variance(method)
+        if variance is None:
+            return None
+        return math.sqrt(variance * self.ANNUALISATION)
+
 class VolatilityEstimator:
     """Real-time volatility estimation for dynamic spread adjustment"""
     
-    def __init__(self, window_size: int = 100):
+    METHODS = ("close_to_close", "ewma", "parkinson", "garman_klass")
+    
+    def __init__(self, window_size: int = 100, method: str = "close_to_close",
+                 ewma_lambda: float = 0.94, bar_ticks: int = 10, bar_window: int = 20):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown volatility method: {method}")
+        
         self.window_size = window_size
+        self.method = method
         self.price_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window_size))
+        self.streams: Dict[str, StreamingVolatility] = defaultdict(
+            lambda: StreamingVolatility(window_size, ewma_lambda, bar_ticks, bar_window)
+        )
         self.volatility_cache: Dict[str, float] = {}
         
     def update_price(self, symbol: str, price: Decimal) -> None:
-        """Update price and recalculate volatility"""
-        self.price_history[symbol].append(float(price))
+        """Update price and refresh the cached volatility in constant time"""
+        price = float(price)
+        self.price_history[symbol].append(price)
+        
+        stream = self.streams[symbol]
+        stream.update(price)
         
         if len(self.price_history[symbol]) >= 20:  # Minimum data points
-            self._calculate_volatility(symbol)
+            self.volatility_cache[symbol] = self._estimate(stream, self.method)
     
-    def _calculate_volatility(self, symbol: str) -> None:
-        """Calculate realized volatility using log returns"""
-        prices = list(self.price_history[symbol])
-        
-        if len(prices) < 2:
-            self.volatility_cache[symbol] = 0.02  # Default 2%
-            return
-        
-        # Calculate log returns
-        returns = []
-        for i in range(1, len(prices)):
-            if prices[i-1] > 0:
-                returns.append(np.log(prices[i] / prices[i-1]))
-        
-        if returns:
-            volatility = np.std(returns) * np.sqrt(86400)  # Annualized (assuming 1 day = 86400 price updates)
-            self.volatility_cache[symbol] = max(0.001, volatility)  # Minimum 0.1%
-        else:
-            self.volatility_cache[symbol] = 0.02
+    @staticmethod
+    def _estimate(stream: StreamingVolatility, method: str) -> float:
+        volatility = stream.volatility(method)
+        if volatility is None:
+            return 0.02  # Default 2%
+        return max(0.001, volatility)  # Minimum 0.1%
     
-    def get_volatility(self, symbol: str) -> float:
-        """Get current volatility estimate"""
-        return self.volatility_cache.get(symbol, 0.02)
+    def get_volatility(self, symbol: str, method: Optional[str] = None) -> float:
+        """Get current volatility estimate (cached for the configured method)"""
+        if method is None or method == self.method:
+            return self.volatility_cache.get(symbol, 0.02)
+        
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown volatility method: {method}")
+        if len(self.price_history.get(symbol, ())) < 20:
+            return 0.02
+        return self._estimate(self.streams[symbol], method)
 
 class AdaptiveMarketMaker:
     """Adaptive market making strategy that adjusts to market conditions"""
@@ -248,6 +395,7 @@ class AdaptiveMarketMaker:
             quote_size = base_quantity
         
         quotes = []
+        now = time.time()
         
         # Generate bid quote
         if abs(inventory_skew) < 0.8:  # Don't quote if inventory too skewed
@@ -255,8 +403,8 @@ class AdaptiveMarketMaker:
                 'side': 'bid',
                 'price': bid_price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
                 'quantity': quote_size,
-                'timestamp': time.time(),
-                'quote_id': str(uuid.uuid4())
+                'timestamp': now,
+                'quote_id': _quote_ids.take()
             })
         
         # Generate ask quote
@@ -265,12 +413,12 @@ class AdaptiveMarketMaker:
                 'side': 'ask',
                 'price': ask_price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
                 'quantity': quote_size,
-                'timestamp': time.time(),
-                'quote_id': str(uuid.uuid4())
+                'timestamp': now,
+                'quote_id': _quote_ids.take()
             })
         
         self.quote_count += len(quotes)
-        self.last_quote_time = time.time()
+        self.last_quote_time = now
         
         return quotes
     
@@ -292,6 +440,177 @@ class AdaptiveMarketMaker:
             'current_volatility': round(self.volatility_estimator.get_volatility(self.symbol), 4)
         }
 
+class BatchQuoteEngine:
+    """
+    Vectorised quote generation across all market-made pairs
+    Per-symbol parameters, inventory skew, volatility and latest market state
+    are held in arrays indexed by symbol slot, so regime classification,
+    spreads, skew and sizes for every due pair are computed in one step.
+    Prices stay float until to_quotes() converts them for the exchange
+    """
+    
+    # Regime codes used in the arrays (index into this tuple)
+    REGIMES = (MarketRegime.NORMAL, MarketRegime.VOLATILE, MarketRegime.TRENDING, MarketRegime.CRISIS)
+    NORMAL, VOLATILE, TRENDING, CRISIS = range(4)
+    
+    COLUMNS = (
+        "target_spread_bps", "max_spread_bps", "skew_factor", "volatility_multiplier",
+        "refresh_ms", "volatility", "inventory_skew", "mid_price", "spread_bps",
+        "volume_ratio", "last_quote_time", "next_refresh_ms"
+    )
+    
+    def __init__(self):
+        self.symbols: List[str] = []
+        self.slots: Dict[str, int] = {}
+        for name in self.COLUMNS:
+            setattr(self, name, np.empty(0))
+        
+        # Exact Decimal quote sizes per slot, indexed by regime code
+        self.quote_sizes: List[Tuple[Decimal, ...]] = []
+    
+    def add_symbol(self, symbol: str, parameters: LiquidityParameter) -> int:
+        """Register a pair's configured parameters; returns its slot"""
+        if symbol in self.slots:
+            raise ValueError(f"Symbol already quoted: {symbol}")
+        
+        slot = len(self.symbols)
+        self.symbols.append(symbol)
+        self.slots[symbol] = slot
+        
+        initial = {
+            "target_spread_bps": parameters.target_spread_bps,
+            "max_spread_bps": parameters.max_spread_bps,
+            "skew_factor": parameters.skew_factor,
+            "volatility_multiplier": parameters.volatility_multiplier,
+            "refresh_ms": parameters.refresh_frequency_ms,
+            "volatility": 0.02,
+            "inventory_skew": 0.0,
+            "mid_price": 50000.0,
+            "spread_bps": 10.0,
+            "volume_ratio": 1.0,
+            "last_quote_time": 0.0,
+            "next_refresh_ms": parameters.refresh_frequency_ms
+        }
+        for name in self.COLUMNS:
+            setattr(self, name, np.append(getattr(self, name), float(initial[name])))
+        
+        # Sizes: mid of the quantity range, halved in volatile/crisis (crisis also halves max)
+        base_quantity = parameters.min_quantity + (parameters.max_quantity - parameters.min_quantity) / 2
+        crisis_quantity = parameters.min_quantity + (parameters.max_quantity / 2 - parameters.min_quantity) / 2
+        self.quote_sizes.append((
+            base_quantity,
+            base_quantity * Decimal('0.5'),
+            base_quantity,
+            crisis_quantity * Decimal('0.5')
+        ))
+        return slot
+    
+    def update_market(self, symbol: str, market_data: Dict, volatility: float) -> int:
+        """Record the latest market state for a pair; returns its slot"""
+        slot = self.slots[symbol]
+        self.mid_price[slot] = market_data.get('mid_price', 50000)
+        self.spread_bps[slot] = market_data.get('spread_bps', 10)
+        self.volume_ratio[slot] = market_data.get('volume_ratio', 1.0)
+        self.volatility[slot] = volatility
+        return slot
+    
+    def set_inventory_skew(self, symbol: str, inventory_skew: float) -> None:
+        self.inventory_skew[self.slots[symbol]] = inventory_skew
+    
+    def due(self, slots: np.ndarray, current_time: float) -> np.ndarray:
+        """Subset of slots whose refresh interval has elapsed"""
+        elapsed = current_time - self.last_quote_time[slots]
+        return slots[elapsed >= self.next_refresh_ms[slots] / 1000]
+    
+    def generate(self, slots: np.ndarray, current_time: float) -> Dict[str, np.ndarray]:
+        """
+        Price bid/ask quotes for the given slots in one vectorised step
+        Regime adjustments apply to each pair's configured parameters (they do
+        not compound across refreshes). Returns columnar quotes: one row per
+        quoted slot, with bid and ask sharing the row
+        """
+        volatility = self.volatility[slots]
+        spread_bps = self.spread_bps[slots]
+        
+        regime = np.select(
+            [
+                (volatility > 0.05) & (spread_bps > 50),
+                volatility > 0.03,
+                (self.volume_ratio[slots] > 2.0) & (volatility > 0.015)
+            ],
+            [self.CRISIS, self.VOLATILE, self.TRENDING],
+            default=self.NORMAL
+        )
+        crisis = regime == self.CRISIS
+        volatile = regime == self.VOLATILE
+        trending = regime == self.TRENDING
+        
+        # Regime-adapted parameters
+        base_spread = self.target_spread_bps[slots]
+        base_spread = np.where(crisis, np.floor(base_spread * 3), np.where(volatile, np.floor(base_spread * 2), base_spread))
+        multiplier = np.where(crisis, 3.0, np.where(volatile, 2.0, self.volatility_multiplier[slots]))
+        skew_factor = np.where(trending, 0.2, self.skew_factor[slots])
+        refresh_ms = self.refresh_ms[slots]
+        self.next_refresh_ms[slots] = np.where(trending, np.maximum(100, refresh_ms // 2), refresh_ms)
+        
+        # Spread, skew and prices
+        mid_price = self.mid_price[slots]
+        inventory_skew = self.inventory_skew[slots]
+        target_spread_bps = np.minimum(base_spread + volatility * multiplier * 10000, self.max_spread_bps[slots])
+        half_spread = mid_price * (target_spread_bps / 10000) / 2
+        skew_adjustment = mid_price * (inventory_skew * skew_factor)
+        
+        self.last_quote_time[slots] = current_time
+        
+        # Don't quote if inventory too skewed
+        quoted = np.abs(inventory_skew) < 0.8
+        quote_count = int(quoted.sum())
+        first_id = _quote_ids.take(2 * quote_count)
+        ids = np.arange(first_id, first_id + 2 * quote_count, dtype=np.int64).reshape(quote_count, 2)
+        
+        return {
+            "slots": slots,
+            "regime": regime,
+            "quoted": quoted,
+            "quoted_slots": slots[quoted],
+            "quoted_regime": regime[quoted],
+            "bid_price": (mid_price - half_spread - skew_adjustment)[quoted],
+            "ask_price": (mid_price + half_spread - skew_adjustment)[quoted],
+            "quote_ids": ids,
+            "timestamp": current_time
+        }
+    
+    def to_quotes(self, batch: Dict[str, np.ndarray]) -> List[Tuple[str, Dict]]:
+        """Convert a generated batch to (symbol, quote) pairs with Decimal prices and sizes"""
+        tick = Decimal('0.01')
+        timestamp = batch["timestamp"]
+        
+        # Snap float noise first so half-cent ties round up like the Decimal path
+        bid_prices = np.round(batch["bid_price"], 8).tolist()
+        ask_prices = np.round(batch["ask_price"], 8).tolist()
+        quotes = []
+        for slot, regime, bid, ask, (bid_id, ask_id) in zip(
+            batch["quoted_slots"].tolist(), batch["quoted_regime"].tolist(),
+            bid_prices, ask_prices, batch["quote_ids"].tolist()
+        ):
+            symbol = self.symbols[slot]
+            quantity = self.quote_sizes[slot][regime]
+            quotes.append((symbol, {
+                'side': 'bid',
+                'price': Decimal(repr(bid)).quantize(tick, rounding=ROUND_HALF_UP),
+                'quantity': quantity,
+                'timestamp': timestamp,
+                'quote_id': bid_id
+            }))
+            quotes.append((symbol, {
+                'side': 'ask',
+                'price': Decimal(repr(ask)).quantize(tick, rounding=ROUND_HALF_UP),
+                'quantity': quantity,
+                'timestamp': timestamp,
+                'quote_id': ask_id
+            }))
+        return quotes
+
 class LiquidityEngine:
     """
     Central liquidity engine managing market makers across all trading pairs
@@ -302,6 +621,7 @@ class LiquidityEngine:
         self.market_makers: Dict[str, AdaptiveMarketMaker] = {}
         self.inventory_manager = InventoryManager()
         self.volatility_estimator = VolatilityEstimator()
+        self.quoter = BatchQuoteEngine()
         
         # Engine configuration
         self.liquidity_targets: Dict[LiquidityTier, Dict] = {
@@ -371,6 +691,7 @@ class LiquidityEngine:
         )
         
         self.market_makers[symbol] = market_maker
+        self.quoter.add_symbol(symbol, parameters)
         
         # Set inventory limits
         self.inventory_manager.position_limits[symbol] = inventory_limit
@@ -379,37 +700,48 @@ class LiquidityEngine:
     
     async def update_market_data(self, symbol: str, market_data: Dict) -> None:
         """Update market data and trigger quote refresh if needed"""
-        
-        # Update volatility estimator
-        if 'price' in market_data:
-            self.volatility_estimator.update_price(symbol, Decimal(str(market_data['price'])))
-        
-        # Check if market maker exists for this symbol
-        if symbol in self.market_makers:
-            market_maker = self.market_makers[symbol]
-            
-            # Check if quotes need refresh
-            time_since_last_quote = time.time() - market_maker.last_quote_time
-            refresh_threshold = market_maker.parameters.refresh_frequency_ms / 1000
-            
-            if time_since_last_quote >= refresh_threshold:
-                await self._refresh_quotes(symbol, market_data)
+        await self.update_market_data_batch({symbol: market_data})
     
-    async def _refresh_quotes(self, symbol: str, market_data: Dict) -> None:
-        """Refresh quotes for a specific symbol"""
-        market_maker = self.market_makers[symbol]
+    async def update_market_data_batch(self, updates: Dict[str, Dict]) -> None:
+        """Update market data for several pairs and refresh all due quotes in one step"""
+        slots = []
+        for symbol, market_data in updates.items():
+            # Update volatility estimator
+            if 'price' in market_data:
+                self.volatility_estimator.update_price(symbol, Decimal(str(market_data['price'])))
+            
+            if symbol in self.market_makers:
+                volatility = self.volatility_estimator.get_volatility(symbol)
+                slots.append(self.quoter.update_market(symbol, market_data, volatility))
         
+        if slots:
+            await self._refresh_quotes(np.array(slots, dtype=np.int64))
+    
+    async def _refresh_quotes(self, slots: np.ndarray) -> None:
+        """Refresh quotes for every due slot in one vectorised step"""
         try:
-            # Generate new quotes
-            new_quotes = await market_maker.generate_quotes(market_data)
+            current_time = time.time()
+            due = self.quoter.due(slots, current_time)
+            if len(due) == 0:
+                return
+            
+            batch = self.quoter.generate(due, current_time)
+            
+            # Per-pair bookkeeping
+            for slot, regime, quoted in zip(due.tolist(), batch["regime"].tolist(), batch["quoted"].tolist()):
+                market_maker = self.market_makers[self.quoter.symbols[slot]]
+                market_maker.current_regime = BatchQuoteEngine.REGIMES[regime]
+                market_maker.last_quote_time = current_time
+                if quoted:
+                    market_maker.quote_count += 2
             
             # Send quotes to exchange (mock implementation)
-            for quote in new_quotes:
+            for symbol, quote in self.quoter.to_quotes(batch):
                 await self._send_quote_to_exchange(symbol, quote)
                 self.total_quotes_sent += 1
             
         except Exception as e:
-            logger.error(f"Error refreshing quotes for {symbol}: {e}")
+            logger.error(f"Error refreshing quotes: {e}")
     
     async def _send_quote_to_exchange(self, symbol: str, quote: Dict) -> None:
         """Send quote to exchange (mock implementation)"""
@@ -422,6 +754,8 @@ class LiquidityEngine:
         # Update inventory (negative for sells, positive for buys from MM perspective)
         trade_quantity = quantity if side == 'buy' else -quantity
         self.inventory_manager.update_position(symbol, trade_quantity, price)
+        if symbol in self.market_makers:
+            self.quoter.set_inventory_skew(symbol, self.inventory_manager.get_inventory_skew(symbol))
         
         # Update market maker metrics
         if symbol in self.market_makers:
@@ -524,14 +858,12 @@ class LiquidityEngine:
     async def _quote_refresh_loop(self) -> None:
         """Background loop for quote refreshing"""
         while True:
-            for symbol in self.market_makers.keys():
-                # Mock market data update
-                mock_market_data = {
-                    'price': 50000 + np.random.normal(0, 100),  # Mock price with noise
-                    'volume': 1000,
-                    'spread_bps': 10
-                }
-                await self.update_market_data(symbol, mock_market_data)
+            # Mock market data update (price with noise) for every pair at once
+            prices = 50000 + np.random.normal(0, 100, len(self.market_makers))
+            await self.update_market_data_batch({
+                symbol: {'price': price, 'volume': 1000, 'spread_bps': 10}
+                for symbol, price in zip(self.market_makers.keys(), prices.tolist())
+            })
             
             await asyncio.sleep(0.1)  # 100ms refresh cycle
     
@@ -0,0 +1,234 @@
+"""
+Test Suite for the Market Maker Liquidity Engine
+Covers streaming volatility against full recomputation and vectorised
+quote generation against per-pair quoting
+"""
+
+import asyncio
+import copy
+import math
+import os
+import random
+import sys
+import unittest
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from liquidity_engine import (
+    LiquidityEngine, LiquidityParameter, LiquidityTier, AdaptiveMarketMaker,
+    BatchQuoteEngine, InventoryManager, MarketRegime, VolatilityEstimator
+)
+
+def reference_close_to_close(prices: list, window_size: int = 100) -> float:
+    """Std of log returns over the window, skipping returns that touch a zero price"""
+    window = prices[-window_size:]
+    returns = [np.log(window[i] / window[i - 1]) for i in range(1, len(window))
+               if window[i - 1] > 0 and window[i] > 0]
+    if not returns:
+        return 0.02
+    return max(0.001, float(np.std(returns)) * np.sqrt(86400))
+
+def reference_ewma(prices: list, ewma_lambda: float = 0.94) -> float:
+    variance = None
+    for previous, price in zip(prices, prices[1:]):
+        if previous > 0 and price > 0:
+            squared = math.log(price / previous) ** 2
+            variance = squared if variance is None else ewma_lambda * variance + (1 - ewma_lambda) * squared
+    return 0.02 if variance is None else max(0.001, math.sqrt(variance * 86400))
+
+def reference_parkinson(prices: list, bar_ticks: int = 10, bar_window: int = 20) -> float:
+    """Range estimator over contiguous bars (each opening at the previous bar's close)"""
+    terms = []
+    for start in range(0, len(prices) - bar_ticks + 1, bar_ticks):
+        bar_open = prices[start - 1] if start else prices[0]
+        ticks = prices[start:start + bar_ticks]
+        high, low = max(bar_open, *ticks), min(bar_open, *ticks)
+        if low > 0 and bar_open > 0:
+            terms.append(math.log(high / low) ** 2 / (4 * math.log(2)))
+    terms = terms[-bar_window:]
+    if not terms:
+        return 0.02
+    return max(0.001, math.sqrt(sum(terms) / len(terms) / bar_ticks * 86400))
+
+def make_parameters(rng: random.Random, symbol: str) -> LiquidityParameter:
+    return LiquidityParameter(
+        symbol=symbol,
+        tier=LiquidityTier.TIER_2,
+        target_spread_bps=rng.choice((5, 10, 25, 50)),
+        max_spread_bps=rng.choice((20, 50, 100, 200)),
+        min_quantity=Decimal(rng.choice(('0.1', '1', '10'))),
+        max_quantity=Decimal(rng.choice(('5', '20', '1000'))),
+        inventory_limit=Decimal('1000'),
+        refresh_frequency_ms=rng.choice((100, 200, 500)),
+        skew_factor=rng.choice((0.05, 0.1, 0.3))
+    )
+
+def make_market(rng: random.Random) -> dict:
+    """Market state spread across all four regimes"""
+    return {
+        'mid_price': round(rng.uniform(0.5, 60000), rng.choice((2, 4))),
+        'spread_bps': rng.choice((5, 40, 80)),
+        'volume_ratio': rng.choice((0.5, 1.0, 3.0))
+    }
+
+def per_pair_quotes(parameters: LiquidityParameter, market_data: dict, volatility: float,
+                    position: Decimal) -> tuple:
+    """Quotes from a fresh AdaptiveMarketMaker (fresh, since adapt_parameters compounds in place)"""
+    inventory = InventoryManager()
+    inventory.positions[parameters.symbol] = position
+    estimator = SimpleNamespace(get_volatility=lambda symbol: volatility)
+    market_maker = AdaptiveMarketMaker(parameters.symbol, copy.deepcopy(parameters), inventory, estimator)
+    quotes = asyncio.run(market_maker.generate_quotes(market_data))
+    return market_maker.current_regime, quotes
+
+class TestStreamingVolatility(unittest.TestCase):
+    """Constant-time estimators agree with recomputing over the window"""
+    
+    def test_estimates_match_recomputation(self):
+        rng = random.Random(10)
+        estimator = VolatilityEstimator(window_size=100)
+        prices = []
+        price = 100.0
+        
+        for i in range(5000):
+            price = max(0.01, price * math.exp(rng.gauss(0, 0.0005 if i < 2500 else 0.002)))
+            # Occasional zero prints are gaps, not returns
+            tick = 0.0 if rng.random() < 0.01 else round(price, 4)
+            estimator.update_price("BTC/USD", Decimal(str(tick)))
+            prices.append(tick)
+            
+            if i >= 19 and i % 13 == 0:
+                self.assertAlmostEqual(estimator.get_volatility("BTC/USD"), reference_close_to_close(prices),
+                                       delta=1e-9 * reference_close_to_close(prices))
+                self.assertAlmostEqual(estimator.get_volatility("BTC/USD", "ewma"), reference_ewma(prices),
+                                       delta=1e-9 * reference_ewma(prices))
+                self.assertAlmostEqual(estimator.get_volatility("BTC/USD", "parkinson"), reference_parkinson(prices),
+                                       delta=1e-9 * reference_parkinson(prices))
+    
+    def test_defaults_before_enough_data(self):
+        estimator = VolatilityEstimator()
+        for _ in range(19):
+            estimator.update_price("ETH/USD", Decimal('3000'))
+        
+        self.assertEqual(estimator.get_volatility("ETH/USD"), 0.02)
+        self.assertEqual(estimator.get_volatility("ETH/USD", "garman_klass"), 0.02)
+        
+        estimator.update_price("ETH/USD", Decimal('3000'))
+        self.assertEqual(estimator.get_volatility("ETH/USD"), 0.001)
+        with self.assertRaises(ValueError):
+            estimator.get_volatility("ETH/USD", "range")
+        with self.assertRaises(ValueError):
+            VolatilityEstimator(method="range")
+
+class TestBatchQuoteEngine(unittest.TestCase):
+    """One vectorised step quotes every pair like its own market maker"""
+    
+    def test_quotes_match_per_pair_generation(self):
+        rng = random.Random(6)
+        quoter = BatchQuoteEngine()
+        cases = []
+        for i in range(400):
+            symbol = f"PAIR{i}/USD"
+            parameters = make_parameters(rng, symbol)
+            market_data = make_market(rng)
+            volatility = rng.choice((0.0, 0.01, 0.02, 0.04, 0.07))
+            position = Decimal(rng.choice((0, 150, -420, 900)))
+            
+            quoter.add_symbol(symbol, parameters)
+            quoter.update_market(symbol, market_data, volatility)
+            quoter.set_inventory_skew(symbol, float(position / parameters.inventory_limit))
+            cases.append(per_pair_quotes(parameters, market_data, volatility, position))
+        
+        batch = quoter.generate(np.arange(len(cases)), current_time=1000.0)
+        quotes = quoter.to_quotes(batch)
+        
+        expected = [(f"PAIR{i}/USD", quote) for i, (_, pair_quotes) in enumerate(cases) for quote in pair_quotes]
+        self.assertEqual([BatchQuoteEngine.REGIMES[r] for r in batch["regime"]], [regime for regime, _ in cases])
+        self.assertEqual(len(set(regime for regime, _ in cases)), 4)
+        self.assertEqual(len(quotes), len(expected))
+        
+        ties = 0
+        for (symbol, quote), (expected_symbol, expected_quote) in zip(quotes, expected):
+            self.assertEqual((symbol, quote['side'], quote['quantity']),
+                             (expected_symbol, expected_quote['side'], expected_quote['quantity']))
+            # Float and Decimal paths may round an exact half-cent tie a cent apart
+            if quote['price'] != expected_quote['price']:
+                self.assertEqual(abs(quote['price'] - expected_quote['price']), Decimal('0.01'))
+                ties += 1
+        self.assertLessEqual(ties, len(quotes) // 100)
+    
+    def test_refresh_eligibility_and_quote_ids(self):
+        rng = random.Random(3)
+        quoter = BatchQuoteEngine()
+        parameters = make_parameters(rng, "BTC/USD")
+        parameters.refresh_frequency_ms = 400
+        quoter.add_symbol("BTC/USD", parameters)
+        quoter.add_symbol("ETH/USD", make_parameters(rng, "ETH/USD"))
+        slots = np.arange(2)
+        
+        first = quoter.generate(quoter.due(slots, 100.0), 100.0)
+        self.assertEqual(quoter.due(slots, 100.1).tolist(), [])
+        
+        # Trending pairs refresh twice as often
+        quoter.update_market("BTC/USD", {'mid_price': 100, 'spread_bps': 10, 'volume_ratio': 3.0}, 0.02)
+        quoter.generate(np.array([0]), 101.0)
+        self.assertEqual(quoter.due(np.array([0]), 101.25).tolist(), [0])
+        
+        second = quoter.generate(slots, 102.0)
+        ids = np.concatenate([first["quote_ids"].ravel(), second["quote_ids"].ravel()])
+        self.assertTrue((np.diff(ids) > 0).all())
+    
+    def test_skewed_inventory_is_not_quoted(self):
+        quoter = BatchQuoteEngine()
+        quoter.add_symbol("BTC/USD", make_parameters(random.Random(1), "BTC/USD"))
+        quoter.set_inventory_skew("BTC/USD", -0.85)
+        
+        batch = quoter.generate(np.array([0]), 10.0)
+        
+        self.assertEqual(quoter.to_quotes(batch), [])
+        self.assertEqual(batch["quote_ids"].shape, (0, 2))
+        with self.assertRaises(ValueError):
+            quoter.add_symbol("BTC/USD", make_parameters(random.Random(1), "BTC/USD"))
+
+class TestLiquidityEngine(unittest.TestCase):
+    """Market data updates refresh every due pair in one batch"""
+    
+    def test_batch_update_refreshes_due_pairs(self):
+        engine = LiquidityEngine()
+        engine.add_trading_pair("BTC/USD", LiquidityTier.TIER_1, Decimal('0.1'), Decimal('2'), Decimal('10'))
+        engine.add_trading_pair("ETH/USD", LiquidityTier.EXOTIC, Decimal('1'), Decimal('20'), Decimal('100'))
+        sent = []
+        
+        async def record(symbol, quote):
+            sent.append((symbol, quote['side']))
+        engine._send_quote_to_exchange = record
+        
+        async def scenario():
+            await engine.update_market_data_batch({
+                "BTC/USD": {'price': 50000, 'mid_price': 50000},
+                "ETH/USD": {'price': 3000, 'mid_price': 3000}
+            })
+            # Neither pair is due again yet
+            await engine.update_market_data("BTC/USD", {'price': 50010, 'mid_price': 50010})
+        
+        asyncio.run(scenario())
+        
+        self.assertEqual(sent, [("BTC/USD", "bid"), ("BTC/USD", "ask"), ("ETH/USD", "bid"), ("ETH/USD", "ask")])
+        self.assertEqual(engine.total_quotes_sent, 4)
+        self.assertEqual(engine.market_makers["ETH/USD"].quote_count, 2)
+        self.assertEqual(engine.market_makers["BTC/USD"].current_regime, MarketRegime.NORMAL)
+    
+    def test_trades_update_inventory_skew(self):
+        engine = LiquidityEngine()
+        engine.add_trading_pair("BTC/USD", LiquidityTier.TIER_1, Decimal('0.1'), Decimal('2'), Decimal('10'))
+        
+        engine.process_trade_execution("BTC/USD", Decimal('9'), Decimal('50000'), 'sell')
+        
+        self.assertAlmostEqual(engine.quoter.inventory_skew[engine.quoter.slots["BTC/USD"]], -0.9)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,45 +5,131 @@ Optimized for 50,000+ TPS with realistic spreads
 """
 
 import asyncio
+import os
+import sys
 import time
 import heapq
 import bisect
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set, Iterator
 from dataclasses import dataclass, field
 from decimal import Decimal
 from collections import defaultdict, deque
+from contextlib import nullcontext
+from itertools import islice
 import numpy as np
 from threading import RLock
 import logging
 
+try:
+    from fixed_point import FixedPointCodec
+except ImportError:  # Run as a script from inside order-book/
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from fixed_point import FixedPointCodec
+
 logger = logging.getLogger(__name__)
 
+class OrderQueueNode:
+    """Intrusive queue node linking a resting order into its price level"""
+    __slots__ = ("order", "seq", "prev", "next")
+    
+    def __init__(self, order, seq: int):
+        self.order = order
+        self.seq = seq  # Arrival sequence within the level
+        self.prev: Optional["OrderQueueNode"] = None
+        self.next: Optional["OrderQueueNode"] = None
+
 class PriceLevel:
-    """Optimized price level for order book"""
+    """
+    Optimized price level for order book
+    FIFO queue as an intrusive doubly-linked list with an order-id index,
+    so adds and cancels anywhere in the queue are O(1)
+    Queue positions come from contiguous arrival sequence numbers; a cancel
+    from mid-queue breaks the numbering, and the next position lookup
+    renumbers the queue once, so no per-cancel history is kept
+    """
     
-    def __init__(self, price: Decimal):
-        self.price = price
-        self.orders: deque = deque()  # FIFO order queue
-        self.total_quantity = Decimal('0')
+    def __init__(self, price):
+        self.price = price  # Decimal, or int ticks in fixed-point mode
+        self.head: Optional[OrderQueueNode] = None
+        self.tail: Optional[OrderQueueNode] = None
+        self.nodes: Dict[str, OrderQueueNode] = {}  # order id -> queue node
+        self.total_quantity = 0
         self.order_count = 0
+        
+        # Sequences are contiguous from head to tail unless _renumber is set
+        self._next_seq = 0
+        self._renumber = False
+    
+    @property
+    def orders(self) -> List:
+        """Resting orders in time priority"""
+        orders = []
+        node = self.head
+        while node is not None:
+            orders.append(node.order)
+            node = node.next
+        return orders
     
-    def add_order(self, order) -> None:
-        """Add order to this price level"""
-        self.orders.append(order)
-        self.total_quantity += order.remaining_quantity
+    def add_order(self, order, quantity=None) -> int:
+        """Add order to this price level (quantity in book units), returning its queue position"""
+        node = OrderQueueNode(order, self._next_seq)
+        self._next_seq += 1
+        
+        node.prev = self.tail
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        
+        self.nodes[order.id] = node
+        self.total_quantity += order.remaining_quantity if quantity is None else quantity
         self.order_count += 1
+        return self.order_count
     
-    def remove_order(self, order) -> bool:
+    def remove_order(self, order, quantity=None) -> bool:
         """Remove order from this price level"""
-        try:
-            self.orders.remove(order)
-            self.total_quantity -= order.remaining_quantity
-            self.order_count -= 1
-            return True
-        except ValueError:
+        node = self.nodes.pop(order.id, None)
+        if node is None:
             return False
+        
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        
+        if node.next is None:
+            # Tail left: the next arrival takes its sequence
+            self._next_seq = node.seq
+        elif node.prev is not None:
+            self._renumber = True
+        
+        self.total_quantity -= order.remaining_quantity if quantity is None else quantity
+        self.order_count -= 1
+        return True
+    
+    def queue_position(self, order_id: str) -> int:
+        """1-based queue position of an order, or -1 if it is not at this level"""
+        node = self.nodes.get(order_id)
+        if node is None:
+            return -1
+        
+        if self._renumber:
+            seq = 0
+            current = self.head
+            while current is not None:
+                current.seq = seq
+                seq += 1
+                current = current.next
+            self._next_seq = seq
+            self._renumber = False
+        return node.seq - self.head.seq + 1
     
-    def update_quantity(self, old_qty: Decimal, new_qty: Decimal) -> None:
+    def update_quantity(self, old_qty, new_qty) -> None:
         """Update total quantity when order quantity changes"""
         self.total_quantity = self.total_quantity - old_qty + new_qty
     
@@ -52,66 +138,115 @@ class PriceLevel:
         return self.order_count == 0
 
 class OrderBookSide:
-    """One side of the order book (bids or asks)"""
+    """
+    One side of the order book (bids or asks)
+    Price levels are indexed by a bisect-maintained array of side-aware keys
+    (price for bids, -price for asks) kept ascending with the best level last,
+    so inserting a level is a binary search and the best level is at [-1]
+    """
     
-    def __init__(self, is_bid_side: bool = True):
+    def __init__(self, is_bid_side: bool = True, codec: Optional[FixedPointCodec] = None,
+                 thread_safe: bool = True):
         self.is_bid_side = is_bid_side
+        self.codec = codec  # When set, levels are keyed by int ticks and sized in int lots
         self.price_levels: Dict[Decimal, PriceLevel] = {}
-        self.sorted_prices: List[Decimal] = []
-        self._lock = RLock()
+        self._keys: List = []
+        self._lock = RLock() if thread_safe else nullcontext()
+    
+    def _sort_key(self, price):
+        return price if self.is_bid_side else -price
+    
+    def _remove_key(self, price) -> None:
+        """Drop a level key, popping in O(1) when it is the best level"""
+        key = self._sort_key(price)
+        if self._keys[-1] == key:
+            self._keys.pop()
+        else:
+            index = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+    
+    def iter_prices(self) -> Iterator:
+        """Lazily walk level prices from best to worst"""
+        if self.is_bid_side:
+            return reversed(self._keys)
+        return (-key for key in reversed(self._keys))
+    
+    def iter_levels(self) -> Iterator[PriceLevel]:
+        """Lazily walk price levels from best to worst"""
+        price_levels = self.price_levels
+        return (price_levels[price] for price in self.iter_prices())
+    
+    @property
+    def sorted_prices(self) -> List:
+        """Level prices from best to worst"""
+        return list(self.iter_prices())
     
-    def add_order(self, order) -> None:
-        """Add order to the appropriate price level"""
+    def price_key(self, price: Decimal):
+        """Convert an API price to the book's level key"""
+        return self.codec.to_ticks(price) if self.codec else price
+    
+    def quantity_units(self, quantity: Decimal):
+        """Convert an API quantity to the book's quantity units"""
+        return self.codec.to_lots(quantity) if self.codec else quantity
+    
+    def add_order(self, order) -> int:
+        """Add order to the appropriate price level, returning its queue position"""
         with self._lock:
-            price = order.price
+            price = self.price_key(order.price)
             
             if price not in self.price_levels:
                 self.price_levels[price] = PriceLevel(price)
-                # Insert price in sorted order
-                if self.is_bid_side:
-                    # Bids: highest price first
-                    bisect.insort(self.sorted_prices, price)
-                    self.sorted_prices.reverse()
-                    self.sorted_prices = sorted(set(self.sorted_prices), reverse=True)
-                else:
-                    # Asks: lowest price first
-                    bisect.insort(self.sorted_prices, price)
-                    self.sorted_prices = sorted(set(self.sorted_prices))
+                bisect.insort(self._keys, self._sort_key(price))
             
-            self.price_levels[price].add_order(order)
+            return self.price_levels[price].add_order(order, self.quantity_units(order.remaining_quantity))
     
     def remove_order(self, order) -> bool:
         """Remove order from price level"""
         with self._lock:
-            price = order.price
+            price = self.price_key(order.price)
             if price in self.price_levels:
-                removed = self.price_levels[price].remove_order(order)
+                removed = self.price_levels[price].remove_order(
+                    order, self.quantity_units(order.remaining_quantity)
+                )
                 
                 # Clean up empty price level
                 if self.price_levels[price].is_empty:
                     del self.price_levels[price]
-                    if price in self.sorted_prices:
-                        self.sorted_prices.remove(price)
+                    self._remove_key(price)
                 
                 return removed
             return False
     
+    def get_best_key(self):
+        """Get best level key (int ticks in fixed-point mode)"""
+        if not self._keys:
+            return None
+        key = self._keys[-1]
+        return key if self.is_bid_side else -key
+    
     def get_best_price(self) -> Optional[Decimal]:
         """Get best price on this side"""
-        return self.sorted_prices[0] if self.sorted_prices else None
+        best = self.get_best_key()
+        if best is None or self.codec is None:
+            return best
+        return self.codec.from_ticks(best)
+    
+    def get_depth_units(self, levels: int = 10) -> List[Tuple]:
+        """Get depth as (price, quantity) in book units"""
+        return [(level.price, level.total_quantity) for level in islice(self.iter_levels(), levels)]
     
     def get_depth(self, levels: int = 10) -> List[Tuple[Decimal, Decimal]]:
         """Get order book depth as (price, quantity) pairs"""
-        depth = []
-        for i, price in enumerate(self.sorted_prices[:levels]):
-            if price in self.price_levels:
-                level = self.price_levels[price]
-                depth.append((price, level.total_quantity))
-        return depth
+        depth = self.get_depth_units(levels)
+        if self.codec is None:
+            return depth
+        return [(self.codec.from_ticks(price), self.codec.from_lots(qty)) for price, qty in depth]
     
-    def get_orders_at_price(self, price: Decimal) -> deque:
+    def get_orders_at_price(self, price: Decimal) -> List:
         """Get all orders at a specific price level"""
-        return self.price_levels.get(price, PriceLevel(price)).orders
+        key = self.price_key(price)
+        return self.price_levels.get(key, PriceLevel(key)).orders
 
 class SpreadCalculator:
     """Calculate realistic bid/ask spreads based on market conditions"""
@@ -131,24 +266,28 @@ class SpreadCalculator:
         Returns (bid_adjustment, ask_adjustment) from mid price
         """
         
+        half_spread = mid_price * Decimal(str(self.half_spread_fraction(volume_24h, recent_volatility)))
+        
+        return (-half_spread, half_spread)  # bid adjustment, ask adjustment
+    
+    def half_spread_fraction(self, volume_24h, recent_volatility: float = 0.02) -> float:
+        """Half spread as a fraction of mid price, computed in float"""
+        
         # Base spread as percentage of mid price
-        base_spread = mid_price * Decimal(str(self.base_spread_bps / 10000))
+        base_fraction = self.base_spread_bps / 10000
         
         # Volatility adjustment
-        volatility_adjustment = base_spread * Decimal(str(recent_volatility * self.volatility_multiplier))
+        volatility_factor = recent_volatility * self.volatility_multiplier
         
         # Liquidity adjustment (lower volume = wider spread)
-        if volume_24h > 0:
-            liquidity_factor = max(0.5, float(1000000 / (volume_24h + 1000)))
+        volume = float(volume_24h)
+        if volume > 0:
+            liquidity_factor = max(0.5, 1000000 / (volume + 1000))
         else:
             liquidity_factor = 2.0
         
-        liquidity_adjustment = base_spread * Decimal(str(liquidity_factor * self.liquidity_impact))
-        
         # Total spread
-        half_spread = (base_spread + volatility_adjustment + liquidity_adjustment) / 2
-        
-        return (-half_spread, half_spread)  # bid adjustment, ask adjustment
+        return base_fraction * (1 + volatility_factor + liquidity_factor * self.liquidity_impact) / 2
 
 class MarketDataGenerator:
     """Generate realistic market data for order book simulation"""
@@ -200,19 +339,43 @@ class MarketDataGenerator:
         
         return Decimal(str(max(1, int(base_quantity * decay_factor))))
 
+@dataclass(frozen=True)
+class DepthSnapshot:
+    """Immutable view of book depth at one version"""
+    symbol: str
+    version: int
+    bids: Tuple[Tuple[Decimal, Decimal], ...]
+    asks: Tuple[Tuple[Decimal, Decimal], ...]
+    timestamp: float
+
 class HighPerformanceOrderBook:
     """
     Ultra-high performance order book implementation
     Optimized for 50,000+ TPS
+    
+    By default every mutation takes a lock so threaded callers can share the
+    book. In single-writer mode one task owns the book and applies commands
+    from an inbound queue without locks; readers get immutable depth
+    snapshots that are rebuilt at most once per book version
     """
     
-    def __init__(self, symbol: str, tick_size: Decimal = Decimal('0.01')):
+    def __init__(self, 
+                 symbol: str, 
+                 tick_size: Decimal = Decimal('0.01'),
+                 lot_size: Decimal = Decimal('0.00000001'),
+                 fixed_point: bool = False,
+                 single_writer: bool = False):
         self.symbol = symbol
         self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.single_writer = single_writer
+        
+        # Opt-in fixed-point mode: int ticks/lots internally, Decimal at the API boundary
+        self.codec = FixedPointCodec(tick_size, lot_size) if fixed_point else None
         
         # Order book sides
-        self.bids = OrderBookSide(is_bid_side=True)
-        self.asks = OrderBookSide(is_bid_side=False)
+        self.bids = OrderBookSide(is_bid_side=True, codec=self.codec, thread_safe=not single_writer)
+        self.asks = OrderBookSide(is_bid_side=False, codec=self.codec, thread_safe=not single_writer)
         
         # Spread calculation and market data
         self.spread_calculator = SpreadCalculator()
@@ -228,46 +391,164 @@ class HighPerformanceOrderBook:
         self.daily_high = None
         self.daily_low = None
         
-        # Thread safety
+        # Thread safety (lock mode only)
         self._global_lock = RLock()
         
+        # Single-writer mode: command queue, writer task and versioned snapshots
+        self._commands: deque = deque()
+        self._wakeup: Optional[asyncio.Future] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.version = 0
+        self._snapshot: Optional[DepthSnapshot] = None
+        self._snapshot_levels = 0
+        
         logger.info(f"High-performance order book initialized for {symbol}")
     
     async def add_order(self, order) -> Dict[str, any]:
         """Add order to the order book"""
+        if self.single_writer:
+            return await self.submit("add", order)
         with self._global_lock:
-            try:
-                if order.side.value == "buy":
-                    self.bids.add_order(order)
-                else:
-                    self.asks.add_order(order)
-                
-                self.total_operations += 1
-                self.last_update_time = time.time()
-                
-                return {
-                    "success": True,
-                    "order_id": order.id,
-                    "position": self._get_order_position(order)
-                }
-                
-            except Exception as e:
-                logger.error(f"Error adding order to book: {e}")
-                return {"success": False, "error": str(e)}
+            return self._apply_add(order)
     
     async def remove_order(self, order) -> bool:
         """Remove order from the order book"""
+        if self.single_writer:
+            return await self.submit("remove", order)
         with self._global_lock:
+            return self._apply_remove(order)
+    
+    def _apply_add(self, order) -> Dict[str, any]:
+        # Fixed-point books only accept prices and sizes on the tick/lot grid
+        if self.codec is not None and not self.codec.is_aligned(order.price, order.remaining_quantity):
+            return {"success": False, "error": "Price or quantity not aligned to tick/lot size"}
+        
+        try:
             if order.side.value == "buy":
-                success = self.bids.remove_order(order)
+                position = self.bids.add_order(order)
             else:
-                success = self.asks.remove_order(order)
+                position = self.asks.add_order(order)
+            
+            self.total_operations += 1
+            self.last_update_time = time.time()
+            self.version += 1
             
-            if success:
-                self.total_operations += 1
-                self.last_update_time = time.time()
+            return {
+                "success": True,
+                "order_id": order.id,
+                "position": position
+            }
             
-            return success
+        except Exception as e:
+            logger.error(f"Error adding order to book: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def _apply_remove(self, order) -> bool:
+        if order.side.value == "buy":
+            success = self.bids.remove_order(order)
+        else:
+            success = self.asks.remove_order(order)
+        
+        if success:
+            self.total_operations += 1
+            self.last_update_time = time.time()
+            self.version += 1
+        
+        return success
+    
+    def start_writer(self) -> None:
+        """Start the writer task that owns the book (single-writer mode)"""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop())
+    
+    async def stop_writer(self) -> None:
+        """Apply queued commands, then stop the writer task"""
+        if self._writer_task is None:
+            return
+        self._commands.append(None)
+        self._wake_writer()
+        await self._writer_task
+        self._writer_task = None
+    
+    def submit(self, op: str, order, want_result: bool = True) -> Optional[asyncio.Future]:
+        """
+        Queue an "add" or "remove" command for the writer without waiting
+        Returns a future for the command's result, or None for fire-and-forget
+        """
+        if self._writer_task is None or self._writer_task.done():
+            self.start_writer()
+        future = asyncio.get_running_loop().create_future() if want_result else None
+        self._commands.append((op, order, future))
+        self._wake_writer()
+        return future
+    
+    def _wake_writer(self) -> None:
+        wakeup = self._wakeup
+        if wakeup is not None and not wakeup.done():
+            wakeup.set_result(None)
+    
+    async def _writer_loop(self) -> None:
+        """Drain queued commands in batches; the book is only mutated here"""
+        commands = self._commands
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not commands:
+                    self._wakeup = loop.create_future()
+                    await self._wakeup
+                    self._wakeup = None
+                
+                while commands:
+                    command = commands.popleft()
+                    if command is None:
+                        return
+                    op, order, future = command
+                    
+                    # A failing command fails its own future and never stops the writer
+                    try:
+                        result = self._apply_add(order) if op == "add" else self._apply_remove(order)
+                    except Exception as e:
+                        logger.error(f"Error applying {op} for order {order.id}: {e}")
+                        if future is not None and not future.done():
+                            # Hand over the traceback without the writer's frame, so a caller
+                            # clearing frames (unittest's assertRaises does) cannot close the writer
+                            future.set_exception(e.with_traceback(e.__traceback__.tb_next))
+                        continue
+                    
+                    if future is not None and not future.done():
+                        future.set_result(result)
+        finally:
+            self._fail_pending(RuntimeError(f"Order book writer for {self.symbol} stopped"))
+    
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail the futures of commands left in the queue when the writer exits"""
+        commands = self._commands
+        while commands:
+            command = commands.popleft()
+            if command is None:
+                continue
+            future = command[2]
+            if future is not None and not future.done():
+                future.set_exception(error)
+    
+    def get_snapshot(self, levels: int = 10) -> DepthSnapshot:
+        """
+        Immutable depth snapshot for the current book version
+        Snapshots are shared between readers and only rebuilt after the book
+        changes (or when a deeper view than the cached one is requested)
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self.version or self._snapshot_levels < levels:
+            snapshot = DepthSnapshot(
+                symbol=self.symbol,
+                version=self.version,
+                bids=tuple(self.bids.get_depth(levels)),
+                asks=tuple(self.asks.get_depth(levels)),
+                timestamp=time.time()
+            )
+            self._snapshot = snapshot
+            self._snapshot_levels = levels
+        return snapshot
     
     def get_best_bid(self) -> Optional[Decimal]:
         """Get best bid price"""
@@ -279,33 +560,42 @@ class HighPerformanceOrderBook:
     
     def get_spread(self) -> Optional[Decimal]:
         """Get current bid-ask spread"""
-        best_bid = self.get_best_bid()
-        best_ask = self.get_best_ask()
+        best_bid = self.bids.get_best_key()
+        best_ask = self.asks.get_best_key()
         
         if best_bid and best_ask:
-            return best_ask - best_bid
+            spread = best_ask - best_bid
+            return self.codec.from_ticks(spread) if self.codec else spread
         return None
     
     def get_mid_price(self) -> Optional[Decimal]:
         """Get mid price between best bid and ask"""
-        best_bid = self.get_best_bid()
-        best_ask = self.get_best_ask()
+        best_bid = self.bids.get_best_key()
+        best_ask = self.asks.get_best_key()
         
         if best_bid and best_ask:
+            if self.codec:
+                return self.codec.from_ticks(best_bid + best_ask) / 2
             return (best_bid + best_ask) / 2
         return None
     
     def get_depth(self, levels: int = 10) -> Dict[str, any]:
         """Get order book depth"""
+        if self.single_writer:
+            snapshot = self.get_snapshot(levels)
+            bids, asks = snapshot.bids[:levels], snapshot.asks[:levels]
+        else:
+            bids, asks = self.bids.get_depth(levels), self.asks.get_depth(levels)
+        
         return {
             "symbol": self.symbol,
             "bids": [
                 {"price": str(price), "quantity": str(qty)}
-                for price, qty in self.bids.get_depth(levels)
+                for price, qty in bids
             ],
             "asks": [
                 {"price": str(price), "quantity": str(qty)}
-                for price, qty in self.asks.get_depth(levels)
+                for price, qty in asks
             ],
             "timestamp": time.time(),
             "spread": str(self.get_spread()) if self.get_spread() else None,
@@ -333,12 +623,9 @@ class HighPerformanceOrderBook:
     def _get_order_position(self, order) -> int:
         """Get order position in queue at its price level"""
         side = self.bids if order.side.value == "buy" else self.asks
-        if order.price in side.price_levels:
-            orders = side.price_levels[order.price].orders
-            try:
-                return list(orders).index(order) + 1
-            except ValueError:
-                return -1
+        price = side.price_key(order.price)
+        if price in side.price_levels:
+            return side.price_levels[price].queue_position(order.id)
         return -1
     
     def _calculate_spread_bps(self) -> Optional[float]:
@@ -402,10 +689,17 @@ class OrderBookManager:
         self.order_books: Dict[str, HighPerformanceOrderBook] = {}
         self.performance_stats = defaultdict(list)
         
-    def create_order_book(self, symbol: str, tick_size: Decimal = Decimal('0.01')) -> HighPerformanceOrderBook:
+    def create_order_book(self, 
+                          symbol: str, 
+                          tick_size: Decimal = Decimal('0.01'),
+                          lot_size: Decimal = Decimal('0.00000001'),
+                          fixed_point: bool = False,
+                          single_writer: bool = False) -> HighPerformanceOrderBook:
         """Create new order book for a trading pair"""
         if symbol not in self.order_books:
-            self.order_books[symbol] = HighPerformanceOrderBook(symbol, tick_size)
+            self.order_books[symbol] = HighPerformanceOrderBook(
+                symbol, tick_size, lot_size, fixed_point, single_writer
+            )
             logger.info(f"Created order book for {symbol}")
         
         return self.order_books[symbol]
@@ -0,0 +1,235 @@
+"""
+Test Suite for the High-Performance Order Book Engine
+Covers price level queues, queue positions, sorted book sides,
+fixed-point books and the single-writer mode
+"""
+
+import asyncio
+import os
+import random
+import sys
+import unittest
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_book_engine import PriceLevel, OrderBookSide, HighPerformanceOrderBook
+from exchange.core_exchange import Order, OrderSide, OrderType, TradingPair, MarketType
+
+BTC_USD = TradingPair("BTC", "USD", MarketType.SPOT, Decimal('0.0001'), Decimal('100'), 2, 8)
+
+def resting(order_id: str, quantity: str = "1") -> SimpleNamespace:
+    return SimpleNamespace(id=order_id, remaining_quantity=Decimal(quantity))
+
+def book_order(order_id: str, side: OrderSide, price: str, quantity: str) -> Order:
+    return Order(order_id, "agent", BTC_USD, side, OrderType.LIMIT, Decimal(quantity), Decimal(price))
+
+def random_book_flow(book: HighPerformanceOrderBook, seed: int, count: int = 1000) -> list:
+    """Add and remove random orders, collecting positions, depth and spread"""
+    rng = random.Random(seed)
+    
+    async def run():
+        live = []
+        results = []
+        for i in range(count):
+            side = OrderSide.BUY if rng.random() < 0.5 else OrderSide.SELL
+            cents = rng.randint(9000, 9200) if side == OrderSide.BUY else rng.randint(9201, 9400)
+            order = book_order(f"o{i}", side, f"{cents / 100:.2f}", str(Decimal(rng.randint(1, 500)) / 100))
+            results.append((await book.add_order(order))["position"])
+            live.append(order)
+            if rng.random() < 0.3:
+                results.append(await book.remove_order(live.pop(rng.randrange(len(live)))))
+            if i % 50 == 0:
+                depth = book.get_depth(20)
+                results.append([(Decimal(level["price"]), Decimal(level["quantity"]))
+                                for level in depth["bids"] + depth["asks"]])
+                results.append((book.get_spread(), book.get_mid_price()))
+        if book.single_writer:
+            await book.stop_writer()
+        return results
+    
+    return asyncio.run(run())
+
+class TestPriceLevel(unittest.TestCase):
+    """FIFO queue with O(1) cancels and queue positions"""
+    
+    def test_fifo_order_and_totals(self):
+        level = PriceLevel(Decimal('100'))
+        for i in range(4):
+            self.assertEqual(level.add_order(resting(f"o{i}", "2")), i + 1)
+        
+        level.remove_order(resting("o1", "2"))
+        
+        self.assertEqual([order.id for order in level.orders], ["o0", "o2", "o3"])
+        self.assertEqual(level.total_quantity, Decimal('6'))
+        self.assertEqual(level.order_count, 3)
+        self.assertFalse(level.remove_order(resting("o1", "2")))
+    
+    def test_queue_positions_match_a_plain_queue(self):
+        rng = random.Random(7)
+        level = PriceLevel(Decimal('100'))
+        queue = []
+        for i in range(2000):
+            if queue and rng.random() < 0.45:
+                order_id = queue.pop(rng.randrange(len(queue)))
+                self.assertTrue(level.remove_order(resting(order_id)))
+            else:
+                order_id = f"o{i}"
+                queue.append(order_id)
+                level.add_order(resting(order_id))
+            
+            if i % 7 == 0:
+                for position, queued_id in enumerate(queue, 1):
+                    self.assertEqual(level.queue_position(queued_id), position)
+        
+        self.assertEqual([order.id for order in level.orders], queue)
+        self.assertEqual(level.queue_position("missing"), -1)
+    
+    def test_cancels_keep_no_history_behind_a_resting_head(self):
+        level = PriceLevel(Decimal('100'))
+        level.add_order(resting("head"))
+        for i in range(1000):
+            level.add_order(resting(f"mid{i}"))
+            level.add_order(resting(f"tail{i}"))
+            level.remove_order(resting(f"mid{i}"))
+            if i:
+                level.remove_order(resting(f"tail{i - 1}"))
+        
+        self.assertEqual(level.queue_position("head"), 1)
+        self.assertEqual(level.queue_position("tail999"), 2)
+        self.assertEqual(level.order_count, 2)
+        # Sequences restart from the head after renumbering instead of growing with cancels
+        self.assertEqual(level.tail.seq, 1)
+
+class TestOrderBookSide(unittest.TestCase):
+    """Sorted level index walks levels best-first and drops empty levels"""
+    
+    def test_levels_best_first_on_each_side(self):
+        for side, is_bid in ((OrderSide.BUY, True), (OrderSide.SELL, False)):
+            book_side = OrderBookSide(is_bid_side=is_bid)
+            for i, price in enumerate(("100.10", "99.90", "100.50", "100.00", "99.90")):
+                book_side.add_order(book_order(f"o{i}", side, price, "1"))
+            
+            quantities = {Decimal('99.90'): Decimal('2'), Decimal('100.00'): Decimal('1'),
+                          Decimal('100.10'): Decimal('1'), Decimal('100.50'): Decimal('1')}
+            expected = sorted(quantities, reverse=is_bid)
+            self.assertEqual(book_side.sorted_prices, expected)
+            self.assertEqual(book_side.get_best_price(), expected[0])
+            self.assertEqual(book_side.get_depth(2), [(price, quantities[price]) for price in expected[:2]])
+    
+    def test_random_adds_and_removes_match_sorted_levels(self):
+        rng = random.Random(11)
+        book_side = OrderBookSide(is_bid_side=False)
+        live = {}
+        for i in range(3000):
+            if live and rng.random() < 0.45:
+                order = live.pop(rng.choice(list(live)))
+                self.assertTrue(book_side.remove_order(order))
+            else:
+                order = book_order(f"o{i}", OrderSide.SELL, f"{rng.randint(100, 160) / 100:.2f}", "1")
+                live[order.id] = order
+                book_side.add_order(order)
+            
+            if i % 25 == 0:
+                levels = {}
+                for order in live.values():
+                    levels[order.price] = levels.get(order.price, Decimal('0')) + order.quantity
+                expected = sorted(levels.items())
+                self.assertEqual(book_side.get_depth(len(expected) + 5), expected)
+                self.assertEqual(set(book_side.price_levels), set(levels))
+                self.assertEqual(book_side.get_best_price(), expected[0][0] if expected else None)
+    
+    def test_depth_is_lazy_over_levels(self):
+        book_side = OrderBookSide(is_bid_side=True)
+        for i in range(100):
+            book_side.add_order(book_order(f"o{i}", OrderSide.BUY, f"{100 + i}", "1"))
+        
+        self.assertEqual([price for price, _ in book_side.get_depth(3)],
+                         [Decimal('199'), Decimal('198'), Decimal('197')])
+        self.assertEqual(next(book_side.iter_levels()).price, Decimal('199'))
+
+class TestFixedPointOrderBook(unittest.TestCase):
+    """Fixed-point books report the same Decimal depth as Decimal books"""
+    
+    def test_same_depth_as_decimal_book(self):
+        for seed in range(2):
+            self.assertEqual(random_book_flow(HighPerformanceOrderBook("BTC/USD"), seed),
+                             random_book_flow(HighPerformanceOrderBook("BTC/USD", fixed_point=True), seed))
+    
+    def test_off_tick_orders_rejected(self):
+        book = HighPerformanceOrderBook("BTC/USD", fixed_point=True)
+        
+        result = asyncio.run(book.add_order(book_order("o1", OrderSide.BUY, "100.005", "1")))
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Price or quantity not aligned to tick/lot size")
+        self.assertIsNone(book.get_best_bid())
+    
+    def test_depth_keeps_decimal_scale(self):
+        book = HighPerformanceOrderBook("BTC/USD", fixed_point=True)
+        asyncio.run(book.add_order(book_order("o1", OrderSide.SELL, "101.50", "0.25")))
+        
+        self.assertEqual(book.get_depth(1)["asks"], [{"price": "101.50", "quantity": "0.25"}])
+
+class TestSingleWriterOrderBook(unittest.TestCase):
+    """One writer task owns the book; readers share versioned snapshots"""
+    
+    def test_same_results_as_locked_book(self):
+        for seed in range(2):
+            self.assertEqual(random_book_flow(HighPerformanceOrderBook("BTC/USD"), seed),
+                             random_book_flow(HighPerformanceOrderBook("BTC/USD", single_writer=True), seed))
+    
+    def test_snapshots_shared_per_version(self):
+        async def scenario():
+            book = HighPerformanceOrderBook("BTC/USD", single_writer=True)
+            await book.add_order(book_order("b1", OrderSide.BUY, "99", "1"))
+            first = book.get_snapshot(5)
+            self.assertIs(book.get_snapshot(5), first)
+            self.assertIs(book.get_snapshot(3), first)
+            
+            await book.add_order(book_order("b2", OrderSide.BUY, "98", "2"))
+            second = book.get_snapshot(5)
+            self.assertIsNot(second, first)
+            self.assertGreater(second.version, first.version)
+            self.assertEqual(first.bids, ((Decimal('99'), Decimal('1')),))
+            self.assertEqual(second.bids, ((Decimal('99'), Decimal('1')), (Decimal('98'), Decimal('2'))))
+            await book.stop_writer()
+        
+        asyncio.run(scenario())
+    
+    def test_stop_writer_applies_queued_commands(self):
+        async def scenario():
+            book = HighPerformanceOrderBook("BTC/USD", single_writer=True)
+            for i in range(10):
+                book.submit("add", book_order(f"a{i}", OrderSide.SELL, f"{100 + i}", "1"), want_result=False)
+            await book.stop_writer()
+            return book
+        
+        book = asyncio.run(scenario())
+        self.assertEqual(len(book.asks.price_levels), 10)
+        self.assertEqual(book.get_best_ask(), Decimal('100'))
+    
+    def test_failing_command_does_not_stop_writer(self):
+        async def scenario():
+            book = HighPerformanceOrderBook("BTC/USD", single_writer=True)
+            apply_add = book._apply_add
+            
+            def flaky_add(order):
+                if order.id == "bad":
+                    raise ValueError("bad order")
+                return apply_add(order)
+            book._apply_add = flaky_add
+            
+            with self.assertRaises(ValueError):
+                await book.add_order(book_order("bad", OrderSide.BUY, "99", "1"))
+            result = await book.add_order(book_order("good", OrderSide.BUY, "98", "1"))
+            self.assertTrue(result["success"])
+            self.assertTrue(await book.remove_order(book_order("good", OrderSide.BUY, "98", "1")))
+            await book.stop_writer()
+        
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,7 @@ from decimal import Decimal
 from enum import Enum
 import numpy as np
 from collections import deque, defaultdict
+from itertools import islice
 import logging
 from abc import ABC, abstractmethod
 
@@ -61,9 +62,161 @@ class MarketMicrostructure:
     price_impact: float
     effective_spread: Decimal
 
+class LatencyHistogram:
+    """
+    HDR-style log-bucketed latency histogram (integer microseconds)
+    Each power-of-two range is split into SUB_BUCKETS linear buckets, so the
+    relative error stays under 1/SUB_BUCKETS at every magnitude while
+    recording is a few integer operations
+    """
+    
+    SUB_BUCKET_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    
+    __slots__ = ("counts", "count", "total", "min", "max")
+    
+    def __init__(self):
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+    
+    @classmethod
+    def bucket_index(cls, value: int) -> int:
+        exponent = value.bit_length() - cls.SUB_BUCKET_BITS - 1
+        if exponent <= 0:
+            return value
+        return exponent * cls.SUB_BUCKETS + (value >> exponent)
+    
+    @classmethod
+    def bucket_upper_bound(cls, index: int) -> int:
+        """Highest value that lands in a bucket"""
+        exponent = max(index // cls.SUB_BUCKETS - 1, 0)
+        mantissa = index - exponent * cls.SUB_BUCKETS
+        return ((mantissa + 1) << exponent) - 1
+    
+    def record(self, value_us: float) -> None:
+        value = int(value_us) if value_us > 0 else 0
+        index = self.bucket_index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+    
+    def percentile(self, percentile: float) -> Optional[int]:
+        """Value at a percentile (0-100), reported as its bucket's upper bound"""
+        if self.count == 0:
+            return None
+        
+        target = max(1, int(np.ceil(self.count * percentile / 100)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.bucket_upper_bound(index), self.max)
+        return self.max
+    
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's samples into this one"""
+        if other.count == 0:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+    
+    def reset(self) -> None:
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "min_us": self.min,
+            "mean_us": round(self.total / self.count, 2) if self.count else None,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "p999_us": self.percentile(99.9),
+            "max_us": self.max
+        }
+
+class LatencyRecorder:
+    """
+    Latency histograms per (stage, strategy, symbol)
+    Stages used by the engine: signal_generation, validation, queueing, execution
+    """
+    
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+    
+    def record(self, stage: str, value_us: float, strategy: str = "all", symbol: str = "all") -> None:
+        key = (stage, strategy, symbol)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(value_us)
+    
+    def merged(self, stage: str, strategy: Optional[str] = None, symbol: Optional[str] = None) -> LatencyHistogram:
+        """One histogram for a stage, optionally narrowed to a strategy and/or symbol"""
+        result = LatencyHistogram()
+        for (hist_stage, hist_strategy, hist_symbol), histogram in self.histograms.items():
+            if hist_stage != stage:
+                continue
+            if strategy is not None and hist_strategy != strategy:
+                continue
+            if symbol is not None and hist_symbol != symbol:
+                continue
+            result.merge(histogram)
+        return result
+    
+    def snapshot(self, by_tag: bool = False) -> Dict[str, Any]:
+        """Per-stage summaries, or per stage -> "strategy|symbol" summaries when by_tag is set"""
+        stages = sorted({key[0] for key in self.histograms})
+        if not by_tag:
+            return {stage: self.merged(stage).summary() for stage in stages}
+        
+        report = {stage: {} for stage in stages}
+        for (stage, strategy, symbol), histogram in sorted(self.histograms.items()):
+            report[stage][f"{strategy}|{symbol}"] = histogram.summary()
+        return report
+    
+    def merge(self, other: "LatencyRecorder") -> None:
+        """Fold another recorder (e.g. from another engine) into this one"""
+        for key, histogram in other.histograms.items():
+            target = self.histograms.get(key)
+            if target is None:
+                target = self.histograms[key] = LatencyHistogram()
+            target.merge(histogram)
+    
+    def reset(self) -> None:
+        self.histograms.clear()
+
 class BaseHFTStrategy(ABC):
     """Base class for HFT strategies"""
     
+    strategy_type: HFTStrategy = None
+    
+    # True when generate_signal never awaits, so the engine may call evaluate() directly
+    synchronous: bool = False
+    
     def __init__(self, name: str, agent_id: str):
         self.name = name
         self.agent_id = agent_id
@@ -79,6 +232,26 @@ class BaseHFTStrategy(ABC):
         """Generate trading signal based on market data"""
         pass
     
+    def evaluate(self, market_data: MarketMicrostructure) -> Optional[TradingSignal]:
+        """
+        Synchronous signal generation (only for synchronous strategies)
+        Runs generate_signal to completion without an event loop; subclasses
+        override this to skip the coroutine entirely
+        """
+        coroutine = self.generate_signal(market_data)
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return done.value
+        coroutine.close()
+        raise RuntimeError(f"{type(self).__name__}.generate_signal awaited; it is not synchronous")
+    
+    @classmethod
+    def evaluate_batch(cls, strategies: List["BaseHFTStrategy"],
+                       market_data: MarketMicrostructure) -> List[Optional[TradingSignal]]:
+        """Evaluate many agents of this strategy type on one tick; same results as evaluate()"""
+        return [strategy.evaluate(market_data) for strategy in strategies]
+    
     @abstractmethod
     def update_position(self, trade_quantity: Decimal, trade_price: Decimal) -> None:
         """Update strategy position after trade execution"""
@@ -87,6 +260,9 @@ class BaseHFTStrategy(ABC):
 class MarketMakingStrategy(BaseHFTStrategy):
     """High-frequency market making strategy"""
     
+    strategy_type = HFTStrategy.MARKET_MAKING
+    synchronous = True
+    
     def __init__(self, agent_id: str):
         super().__init__("Market Making", agent_id)
         self.target_spread_bps = 5  # Target 5 basis points
@@ -95,6 +271,10 @@ class MarketMakingStrategy(BaseHFTStrategy):
         
     async def generate_signal(self, market_data: MarketMicrostructure) -> Optional[TradingSignal]:
         """Generate market making signals"""
+        return self.evaluate(market_data)
+    
+    def evaluate(self, market_data: MarketMicrostructure) -> Optional[TradingSignal]:
+        """Generate market making signals"""
         
         # Calculate target spread
         mid_price = (market_data.bid_price + market_data.ask_price) / 2
@@ -139,6 +319,41 @@ class MarketMakingStrategy(BaseHFTStrategy):
         
         return signals[0] if signals else None
     
+    @classmethod
+    def evaluate_batch(cls, strategies: List["MarketMakingStrategy"],
+                       market_data: MarketMicrostructure) -> List[Optional[TradingSignal]]:
+        """
+        Screen every agent's quotes in one array pass
+        Most ticks produce no quote (the target spread rarely improves the book),
+        so only agents whose float quotes come within a tolerance of improving
+        the bid or ask are re-evaluated exactly with Decimal arithmetic
+        """
+        results: List[Optional[TradingSignal]] = [None] * len(strategies)
+        if not strategies:
+            return results
+        
+        positions = np.array([float(s.position) for s in strategies])
+        spread_bps = np.array([s.target_spread_bps for s in strategies], dtype=float)
+        skew_factors = np.array([s.skew_factor for s in strategies], dtype=float)
+        limits = np.array([float(s.inventory_limit) for s in strategies])
+        
+        best_bid = float(market_data.bid_price)
+        best_ask = float(market_data.ask_price)
+        mid_price = (best_bid + best_ask) / 2
+        half_spread = mid_price * spread_bps / 10000 / 2
+        inventory_skew = positions * skew_factors
+        bid_prices = mid_price - half_spread - inventory_skew
+        ask_prices = mid_price + half_spread - inventory_skew
+        
+        # Candidates are a superset of the exact answer (non-strict, with float slack)
+        tolerance = 1e-9 * (abs(mid_price) + np.abs(half_spread) + np.abs(inventory_skew))
+        candidates = ((positions <= limits) & (bid_prices >= best_bid - tolerance)) | \
+                     ((positions >= -limits) & (ask_prices <= best_ask + tolerance))
+        
+        for i in np.flatnonzero(candidates):
+            results[i] = strategies[i].evaluate(market_data)
+        return results
+    
     def update_position(self, trade_quantity: Decimal, trade_price: Decimal) -> None:
         """Update position and calculate PnL"""
         self.position += trade_quantity
@@ -149,6 +364,9 @@ class MarketMakingStrategy(BaseHFTStrategy):
 class MomentumStrategy(BaseHFTStrategy):
     """High-frequency momentum trading strategy"""
     
+    strategy_type = HFTStrategy.MOMENTUM
+    synchronous = True
+    
     def __init__(self, agent_id: str):
         super().__init__("Momentum", agent_id)
         self.price_history = deque(maxlen=100)
@@ -157,6 +375,10 @@ class MomentumStrategy(BaseHFTStrategy):
         
     async def generate_signal(self, market_data: MarketMicrostructure) -> Optional[TradingSignal]:
         """Generate momentum-based signals"""
+        return self.evaluate(market_data)
+    
+    def evaluate(self, market_data: MarketMicrostructure) -> Optional[TradingSignal]:
+        """Generate momentum-based signals"""
         
         # Store current data
         self.price_history.append(float(market_data.last_price))
@@ -167,6 +389,8 @@ class MomentumStrategy(BaseHFTStrategy):
         
         # Calculate short-term momentum
         recent_prices = list(self.price_history)[-10:]
+        if recent_prices[0] <= 0:
+            return None
         price_change = (recent_prices[-1] - recent_prices[0]) / recent_prices[0]
         
         # Calculate volume momentum
@@ -177,25 +401,80 @@ class MomentumStrategy(BaseHFTStrategy):
         
         # Generate signal based on momentum and volume
         if abs(price_change) > self.momentum_threshold and volume_ratio > 1.5:
-            signal_type = SignalType.BUY if price_change > 0 else SignalType.SELL
-            confidence = min(0.9, abs(price_change) * 100 + volume_ratio * 0.1)
-            
-            return TradingSignal(
-                strategy=HFTStrategy.MOMENTUM,
-                signal_type=signal_type,
-                symbol=market_data.symbol,
-                price=None,  # Market order
-                quantity=Decimal('50'),
-                confidence=confidence,
-                urgency=9,
-                metadata={
-                    "price_change": price_change,
-                    "volume_ratio": volume_ratio
-                }
-            )
+            return self._momentum_signal(market_data, price_change, volume_ratio)
         
         return None
     
+    @staticmethod
+    def _momentum_signal(market_data: MarketMicrostructure, price_change: float,
+                         volume_ratio: float) -> TradingSignal:
+        signal_type = SignalType.BUY if price_change > 0 else SignalType.SELL
+        confidence = min(0.9, abs(price_change) * 100 + volume_ratio * 0.1)
+        
+        return TradingSignal(
+            strategy=HFTStrategy.MOMENTUM,
+            signal_type=signal_type,
+            symbol=market_data.symbol,
+            price=None,  # Market order
+            quantity=Decimal('50'),
+            confidence=confidence,
+            urgency=9,
+            metadata={
+                "price_change": price_change,
+                "volume_ratio": volume_ratio
+            }
+        )
+    
+    @classmethod
+    def evaluate_batch(cls, strategies: List["MomentumStrategy"],
+                       market_data: MarketMicrostructure) -> List[Optional[TradingSignal]]:
+        """Momentum and volume ratios for every agent as one (agents x 10) array computation"""
+        results: List[Optional[TradingSignal]] = [None] * len(strategies)
+        
+        last_price = float(market_data.last_price)
+        volume = float(market_data.volume)
+        ready = []
+        for i, strategy in enumerate(strategies):
+            strategy.price_history.append(last_price)
+            strategy.volume_history.append(volume)
+            if len(strategy.price_history) >= 10:
+                ready.append(i)
+        
+        if not ready:
+            return results
+        
+        count = len(ready)
+        first_prices = np.fromiter((strategies[i].price_history[-10] for i in ready), float, count)
+        last_prices = np.fromiter((strategies[i].price_history[-1] for i in ready), float, count)
+        
+        # Newest first: column 0 is the current volume, column 9 the oldest
+        volumes = np.fromiter(
+            (v for i in ready for v in islice(reversed(strategies[i].volume_history), 10)),
+            float, count * 10
+        ).reshape(count, 10)
+        
+        # Accumulate oldest to newest so the sums match sum() on the window exactly
+        total_volume = volumes[:, 9].copy()
+        for column in range(8, -1, -1):
+            total_volume += volumes[:, column]
+        avg_volume = total_volume / 10
+        
+        # Windows starting at a non-positive price have no momentum (as in evaluate())
+        priced = first_prices > 0
+        price_change = np.divide(last_prices - first_prices, first_prices,
+                                 out=np.zeros(count), where=priced)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.where(avg_volume > 0, volumes[:, 0] / avg_volume, 1.0)
+        
+        thresholds = np.fromiter((strategies[i].momentum_threshold for i in ready), float, count)
+        fire = priced & (np.abs(price_change) > thresholds) & (volume_ratio > 1.5)
+        
+        for j in np.flatnonzero(fire):
+            results[ready[j]] = cls._momentum_signal(
+                market_data, float(price_change[j]), float(volume_ratio[j])
+            )
+        return results
+    
     def update_position(self, trade_quantity: Decimal, trade_price: Decimal) -> None:
         """Update position and calculate PnL"""
         self.position += trade_quantity
@@ -204,6 +483,9 @@ class MomentumStrategy(BaseHFTStrategy):
 class ArbitrageStrategy(BaseHFTStrategy):
     """Cross-exchange arbitrage strategy"""
     
+    strategy_type = HFTStrategy.ARBITRAGE
+    synchronous = True
+    
     def __init__(self, agent_id: str):
         super().__init__("Arbitrage", agent_id)
         self.exchange_prices = {}  # Track prices across exchanges
@@ -211,13 +493,21 @@ class ArbitrageStrategy(BaseHFTStrategy):
         
     async def generate_signal(self, market_data: MarketMicrostructure) -> Optional[TradingSignal]:
         """Generate arbitrage signals"""
-        
+        return self.evaluate(market_data)
+    
+    @staticmethod
+    def _quote_venues(exchange_prices: Dict[str, Decimal], market_data: MarketMicrostructure) -> None:
         # Store current exchange price
-        self.exchange_prices["current"] = market_data.last_price
+        exchange_prices["current"] = market_data.last_price
         
         # Mock additional exchange prices (in real implementation, these would come from other exchanges)
-        self.exchange_prices["exchange_b"] = market_data.last_price * Decimal('1.0015')  # 15 bps higher
-        self.exchange_prices["exchange_c"] = market_data.last_price * Decimal('0.9985')  # 15 bps lower
+        exchange_prices["exchange_b"] = market_data.last_price * Decimal('1.0015')  # 15 bps higher
+        exchange_prices["exchange_c"] = market_data.last_price * Decimal('0.9985')  # 15 bps lower
+    
+    def evaluate(self, market_data: MarketMicrostructure) -> Optional[TradingSignal]:
+        """Generate arbitrage signals"""
+        
+        self._quote_venues(self.exchange_prices, market_data)
         
         # Find arbitrage opportunities
         prices = list(self.exchange_prices.values())
@@ -229,24 +519,59 @@ class ArbitrageStrategy(BaseHFTStrategy):
         profit_bps = ((max_price - min_price) / min_price) * 10000
         
         if profit_bps > self.min_profit_bps:
-            # Buy on exchange with lowest price, sell on exchange with highest price
-            return TradingSignal(
-                strategy=HFTStrategy.ARBITRAGE,
-                signal_type=SignalType.BUY,  # Simplified - would need dual signals in reality
-                symbol=market_data.symbol,
-                price=min_price,
-                quantity=Decimal('25'),
-                confidence=0.95,
-                urgency=10,
-                metadata={
-                    "profit_bps": float(profit_bps),
-                    "buy_exchange": "current",
-                    "sell_exchange": "other"
-                }
-            )
+            return self._arbitrage_signal(market_data, min_price, profit_bps)
         
         return None
     
+    @staticmethod
+    def _arbitrage_signal(market_data: MarketMicrostructure, min_price: Decimal,
+                          profit_bps: Decimal) -> TradingSignal:
+        # Buy on exchange with lowest price, sell on exchange with highest price
+        return TradingSignal(
+            strategy=HFTStrategy.ARBITRAGE,
+            signal_type=SignalType.BUY,  # Simplified - would need dual signals in reality
+            symbol=market_data.symbol,
+            price=min_price,
+            quantity=Decimal('25'),
+            confidence=0.95,
+            urgency=10,
+            metadata={
+                "profit_bps": float(profit_bps),
+                "buy_exchange": "current",
+                "sell_exchange": "other"
+            }
+        )
+    
+    @classmethod
+    def evaluate_batch(cls, strategies: List["ArbitrageStrategy"],
+                       market_data: MarketMicrostructure) -> List[Optional[TradingSignal]]:
+        """
+        Price the venue spread once per tick and threshold it for every agent
+        Agents holding only the standard venue quotes see identical prices, so
+        the Decimal spread is shared; anything else is evaluated individually
+        """
+        results: List[Optional[TradingSignal]] = [None] * len(strategies)
+        
+        venues: Dict[str, Decimal] = {}
+        cls._quote_venues(venues, market_data)
+        max_price = max(venues.values())
+        min_price = min(venues.values())
+        profit_bps = ((max_price - min_price) / min_price) * 10000
+        
+        passes: Dict[Any, bool] = {}
+        for i, strategy in enumerate(strategies):
+            if strategy.exchange_prices.keys() - venues.keys():
+                results[i] = strategy.evaluate(market_data)
+                continue
+            
+            strategy.exchange_prices.update(venues)
+            threshold = strategy.min_profit_bps
+            if threshold not in passes:
+                passes[threshold] = profit_bps > threshold
+            if passes[threshold]:
+                results[i] = cls._arbitrage_signal(market_data, min_price, profit_bps)
+        return results
+    
     def update_position(self, trade_quantity: Decimal, trade_price: Decimal) -> None:
         """Update position"""
         self.position += trade_quantity
@@ -258,7 +583,8 @@ class HighFrequencyTradingEngine:
     Processes thousands of signals per second
     """
     
-    def __init__(self):
+    def __init__(self, batch_window_us: float = 0, max_batch_size: int = 256,
+                 vectorized: bool = False):
         self.strategies: Dict[str, BaseHFTStrategy] = {}
         self.active_signals: deque = deque(maxlen=10000)
         self.execution_queue: asyncio.Queue = asyncio.Queue()
@@ -269,6 +595,7 @@ class HighFrequencyTradingEngine:
         self.orders_executed = 0
         self.total_latency_us = 0  # microseconds
         self.successful_trades = 0
+        self.latency = LatencyRecorder()
         
         # Risk management
         self.max_daily_loss = Decimal('10000')
@@ -279,13 +606,65 @@ class HighFrequencyTradingEngine:
         self.max_execution_latency_us = 1000  # 1ms max latency
         self.order_size_limit = Decimal('1000')
         
+        # Micro-batching: after the first signal arrives, wait up to batch_window_us
+        # for more (0 = only take what is already queued), then submit together
+        self.batch_window_us = batch_window_us
+        self.max_batch_size = max_batch_size
+        self.batches_executed = 0
+        self.orders_submitted = 0
+        
+        # Symbol subscriptions (agent_id -> symbols, None = every symbol) and the
+        # per-symbol dispatch plans compiled from them
+        self.subscriptions: Dict[str, Optional[frozenset]] = {}
+        self.vectorized = vectorized
+        self._dispatch: Dict[str, tuple] = {}
+        
         logger.info("High-frequency trading engine initialized")
     
-    def register_strategy(self, strategy: BaseHFTStrategy) -> None:
-        """Register a new HFT strategy"""
+    def register_strategy(self, strategy: BaseHFTStrategy, symbols: Optional[List[str]] = None) -> None:
+        """Register a new HFT strategy, optionally only for the given symbols"""
         self.strategies[strategy.agent_id] = strategy
+        self.subscriptions[strategy.agent_id] = frozenset(symbols) if symbols is not None else None
+        self._dispatch.clear()
         logger.info(f"Registered strategy: {strategy.name} for agent {strategy.agent_id}")
     
+    def subscribe(self, agent_id: str, symbols: Optional[List[str]]) -> None:
+        """Replace an agent's symbol subscriptions (None subscribes to every symbol)"""
+        if agent_id not in self.strategies:
+            raise KeyError(f"Unknown strategy: {agent_id}")
+        self.subscriptions[agent_id] = frozenset(symbols) if symbols is not None else None
+        self._dispatch.clear()
+    
+    def _dispatch_plan(self, symbol: str) -> tuple:
+        """
+        Strategies subscribed to a symbol, in registration order, split into
+        vectorised groups (by strategy class), synchronous and async entries
+        Each entry is a list of positions into the plan's strategy list
+        """
+        plan = self._dispatch.get(symbol)
+        if plan is not None:
+            return plan
+        
+        strategies = [
+            strategy for agent_id, strategy in self.strategies.items()
+            if self.subscriptions.get(agent_id) is None or symbol in self.subscriptions[agent_id]
+        ]
+        
+        groups: Dict[type, List[int]] = {}
+        synchronous: List[int] = []
+        asynchronous: List[int] = []
+        for i, strategy in enumerate(strategies):
+            if not strategy.synchronous:
+                asynchronous.append(i)
+            elif self.vectorized:
+                groups.setdefault(type(strategy), []).append(i)
+            else:
+                synchronous.append(i)
+        
+        plan = (strategies, list(groups.items()), synchronous, asynchronous)
+        self._dispatch[symbol] = plan
+        return plan
+    
     async def process_market_data(self, market_data: MarketMicrostructure) -> None:
         """Process incoming market data and generate signals"""
         start_time = time.perf_counter()
@@ -293,19 +672,38 @@ class HighFrequencyTradingEngine:
         # Store market data
         self.market_data_feed[market_data.symbol] = market_data
         
-        # Generate signals from all active strategies
-        signal_tasks = []
-        for strategy in self.strategies.values():
-            if strategy.is_active:
-                signal_tasks.append(strategy.generate_signal(market_data))
+        # Generate signals from the active strategies subscribed to this symbol
+        strategies, groups, synchronous, asynchronous = self._dispatch_plan(market_data.symbol)
+        signals: List[Any] = [None] * len(strategies)
         
-        # Execute all strategies in parallel
-        signals = await asyncio.gather(*signal_tasks, return_exceptions=True)
+        for strategy_class, positions in groups:
+            active = [i for i in positions if strategies[i].is_active]
+            if active:
+                results = self._evaluate_batch_timed(strategy_class, [strategies[i] for i in active], market_data)
+                for i, signal in zip(active, results):
+                    signals[i] = signal
+        
+        for i in synchronous:
+            if strategies[i].is_active:
+                signals[i] = self._evaluate_timed(strategies[i], market_data)
+        
+        # Only strategies that actually await run as coroutines
+        awaiting = [i for i in asynchronous if strategies[i].is_active]
+        if awaiting:
+            results = await asyncio.gather(
+                *(self._generate_signal_timed(strategies[i], market_data) for i in awaiting),
+                return_exceptions=True
+            )
+            for i, signal in zip(awaiting, results):
+                signals[i] = signal
         
         # Process valid signals
         for signal in signals:
             if isinstance(signal, TradingSignal):
+                validation_start = time.perf_counter()
                 await self._validate_and_queue_signal(signal)
+                self.latency.record("validation", (time.perf_counter() - validation_start) * 1_000_000,
+                                    signal.strategy.value, signal.symbol)
                 self.signals_generated += 1
                 self.active_signals.append(signal)
         
@@ -317,6 +715,44 @@ class HighFrequencyTradingEngine:
         if latency_us > self.max_execution_latency_us:
             logger.warning(f"High latency detected: {latency_us:.0f}μs")
     
+    async def _generate_signal_timed(self, strategy: BaseHFTStrategy,
+                                     market_data: MarketMicrostructure) -> Optional[TradingSignal]:
+        start_time = time.perf_counter()
+        try:
+            return await strategy.generate_signal(market_data)
+        finally:
+            self.latency.record("signal_generation", (time.perf_counter() - start_time) * 1_000_000,
+                                strategy.strategy_type.value if strategy.strategy_type else strategy.name,
+                                market_data.symbol)
+    
+    def _evaluate_timed(self, strategy: BaseHFTStrategy,
+                        market_data: MarketMicrostructure) -> Optional[TradingSignal]:
+        start_time = time.perf_counter()
+        try:
+            return strategy.evaluate(market_data)
+        except Exception as e:
+            logger.debug(f"Strategy {strategy.agent_id} failed: {e}")
+            return None
+        finally:
+            self.latency.record("signal_generation", (time.perf_counter() - start_time) * 1_000_000,
+                                strategy.strategy_type.value if strategy.strategy_type else strategy.name,
+                                market_data.symbol)
+    
+    def _evaluate_batch_timed(self, strategy_class: type, strategies: List[BaseHFTStrategy],
+                              market_data: MarketMicrostructure) -> List[Optional[TradingSignal]]:
+        start_time = time.perf_counter()
+        try:
+            return strategy_class.evaluate_batch(strategies, market_data)
+        except Exception as e:
+            logger.error(f"Vectorised {strategy_class.__name__} evaluation failed: {e}")
+            return [None] * len(strategies)
+        finally:
+            # One sample per batch, tagged like the per-agent samples
+            strategy_type = strategy_class.strategy_type
+            self.latency.record("signal_generation", (time.perf_counter() - start_time) * 1_000_000,
+                                strategy_type.value if strategy_type else strategy_class.__name__,
+                                market_data.symbol)
+    
     async def _validate_and_queue_signal(self, signal: TradingSignal) -> bool:
         """Validate signal and add to execution queue"""
         
@@ -324,7 +760,7 @@ class HighFrequencyTradingEngine:
         strategy = self.strategies.get(signal.metadata.get("agent_id", ""))
         if strategy:
             # Position limit check
-            if abs(strategy.position) >= self.max_position:
+            if abs(strategy.position) >= strategy.max_position:
                 logger.warning(f"Position limit exceeded for {strategy.agent_id}")
                 return False
             
@@ -337,64 +773,146 @@ class HighFrequencyTradingEngine:
         if signal.quantity > self.order_size_limit:
             signal.quantity = self.order_size_limit
         
-        # Queue for execution
-        await self.execution_queue.put(signal)
+        # Queue for execution (with the enqueue time for queueing-delay tracking)
+        await self.execution_queue.put((time.perf_counter(), signal))
         return True
     
     async def execute_signals(self, exchange_interface) -> None:
-        """Execute signals from the queue"""
+        """
+        Execute signals from the queue in micro-batches
+        Blocks on the queue while idle, then drains every ready signal (up to
+        max_batch_size) into one batch; queue order is kept, so signals for the
+        same symbol reach the exchange in the order they were generated
+        """
+        queue = self.execution_queue
         while True:
+            batch = [await queue.get()]
+            
+            if self.batch_window_us > 0:
+                await asyncio.sleep(self.batch_window_us / 1_000_000)
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            
             try:
-                # Get signal from queue with timeout
-                signal = await asyncio.wait_for(self.execution_queue.get(), timeout=0.001)
-                
-                start_time = time.perf_counter()
-                
-                # Execute order through exchange interface
-                result = await self._execute_order(signal, exchange_interface)
-                
-                # Track execution metrics
-                end_time = time.perf_counter()
-                execution_latency = (end_time - start_time) * 1_000_000
-                
-                if result.get("success"):
-                    self.orders_executed += 1
-                    self.successful_trades += 1
-                    
-                    # Update strategy position
-                    strategy = self.strategies.get(signal.metadata.get("agent_id", ""))
-                    if strategy:
-                        executed_qty = Decimal(str(result.get("filled_quantity", 0)))
-                        executed_price = Decimal(str(result.get("price", 0)))
-                        strategy.update_position(executed_qty, executed_price)
-                
-                logger.debug(f"Order executed in {execution_latency:.0f}μs: {result}")
-                
-            except asyncio.TimeoutError:
-                # No signals in queue, continue
-                await asyncio.sleep(0.0001)  # 0.1ms sleep
+                await self._execute_batch(batch, exchange_interface)
             except Exception as e:
-                logger.error(f"Error executing signal: {e}")
+                logger.error(f"Error executing signal batch: {e}")
+    
+    async def _execute_batch(self, batch: List[Tuple[float, TradingSignal]], exchange_interface) -> None:
+        """Submit a micro-batch, through place_orders when the exchange supports it"""
+        start_time = time.perf_counter()
+        signals = []
+        for queued_at, signal in batch:
+            self.latency.record("queueing", (start_time - queued_at) * 1_000_000,
+                                signal.strategy.value, signal.symbol)
+            signals.append(signal)
+        
+        if hasattr(exchange_interface, "place_orders"):
+            results = await self._execute_orders(signals, exchange_interface)
+        else:
+            results = [await self._execute_order(signal, exchange_interface) for signal in signals]
+        
+        # Track execution metrics
+        execution_latency = (time.perf_counter() - start_time) * 1_000_000
+        self.batches_executed += 1
+        self.orders_submitted += len(signals)
+        
+        for signal, result in zip(signals, results):
+            self.latency.record("execution", execution_latency, signal.strategy.value, signal.symbol)
+            
+            # Accepted orders that only rest on the book have not executed yet
+            if not (result.get("success") or result.get("valid")):
+                continue
+            executed_qty = Decimal(str(result.get("filled_quantity", 0)))
+            if executed_qty <= 0:
+                continue
+            
+            self.orders_executed += 1
+            self.successful_trades += 1
+            
+            # Update strategy position (sells reduce it)
+            strategy = self.strategies.get(signal.metadata.get("agent_id", ""))
+            if strategy:
+                if signal.signal_type != SignalType.BUY:
+                    executed_qty = -executed_qty
+                strategy.update_position(executed_qty, self._fill_price(result, signal))
+        
+        logger.debug(f"Executed batch of {len(signals)} signals in {execution_latency:.0f}μs")
+    
+    @staticmethod
+    def _fill_price(result: Dict[str, Any], signal: TradingSignal) -> Decimal:
+        """Average fill price from a batch result's price or a single result's matches"""
+        if "price" in result:
+            return Decimal(str(result["price"]))
+        matches = result.get("matches") or []
+        filled = sum((Decimal(match["quantity"]) for match in matches), Decimal('0'))
+        if filled > 0:
+            return sum((Decimal(match["price"]) * Decimal(match["quantity"]) for match in matches), Decimal('0')) / filled
+        return signal.price or Decimal('0')
+    
+    def _build_order(self, signal: TradingSignal, exchange_interface):
+        """Convert a signal to an exchange order"""
+        from exchange.core_exchange import Order, OrderSide, OrderType
+        
+        order_side = OrderSide.BUY if signal.signal_type == SignalType.BUY else OrderSide.SELL
+        order_type = OrderType.MARKET if signal.price is None else OrderType.LIMIT
+        trading_pairs = getattr(exchange_interface, "trading_pairs", {})
+        
+        return Order(
+            id=str(uuid.uuid4()),
+            agent_id=signal.metadata.get("agent_id", "hft_agent"),
+            trading_pair=trading_pairs.get(signal.symbol),
+            side=order_side,
+            order_type=order_type,
+            quantity=signal.quantity,
+            price=signal.price
+        )
+    
+    async def _execute_orders(self, signals: List[TradingSignal], exchange_interface) -> List[Dict[str, Any]]:
+        """Execute a batch of orders with one place_orders call, returning per-signal results"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(signals)
+        orders = []
+        positions = []
+        for i, signal in enumerate(signals):
+            try:
+                order = self._build_order(signal, exchange_interface)
+            except Exception as e:
+                logger.error(f"Order execution failed: {e}")
+                results[i] = {"success": False, "error": str(e)}
+                continue
+            
+            if order.trading_pair is None:
+                results[i] = {"success": False, "error": f"Unknown trading pair: {signal.symbol}"}
+                continue
+            orders.append(order)
+            positions.append(i)
+        
+        if orders:
+            batch_result = await exchange_interface.place_orders(orders)
+            
+            # Volume-weighted fill price per order from the columnar trades
+            trades = batch_result["trades"]
+            notional = defaultdict(Decimal)
+            for order_index, price, quantity in zip(trades["order_index"], trades["price"], trades["quantity"]):
+                notional[order_index] += Decimal(price) * Decimal(quantity)
+            
+            for j, i in enumerate(positions):
+                filled = Decimal(batch_result["filled_quantity"][j])
+                results[i] = {
+                    "valid": batch_result["valid"][j],
+                    "reason": batch_result["reasons"][j],
+                    "order_id": batch_result["order_ids"][j],
+                    "status": batch_result["status"][j],
+                    "filled_quantity": str(filled),
+                    "price": str(notional[j] / filled) if filled > 0 else str(signals[i].price or 0)
+                }
+        
+        return results
     
     async def _execute_order(self, signal: TradingSignal, exchange_interface) -> Dict[str, Any]:
         """Execute individual order"""
         try:
-            # Convert signal to order format
-            from ..exchange.core_exchange import Order, OrderSide, OrderType
-            
-            order_side = OrderSide.BUY if signal.signal_type == SignalType.BUY else OrderSide.SELL
-            order_type = OrderType.MARKET if signal.price is None else OrderType.LIMIT
-            
-            # Create order object (simplified - would need proper trading pair)
-            order = Order(
-                id=str(uuid.uuid4()),
-                agent_id=signal.metadata.get("agent_id", "hft_agent"),
-                trading_pair=None,  # Would need proper trading pair
-                side=order_side,
-                order_type=order_type,
-                quantity=signal.quantity,
-                price=signal.price
-            )
+            order = self._build_order(signal, exchange_interface)
             
             # Execute through exchange
             result = await exchange_interface.place_order(order)
@@ -433,9 +951,20 @@ class HighFrequencyTradingEngine:
             "average_latency_us": round(avg_latency, 2),
             "daily_pnl": str(self.daily_pnl),
             "active_strategies": len([s for s in self.strategies.values() if s.is_active]),
-            "queue_size": self.execution_queue.qsize()
+            "queue_size": self.execution_queue.qsize(),
+            "batches_executed": self.batches_executed,
+            "orders_submitted": self.orders_submitted,
+            "average_batch_size": round(self.orders_submitted / max(1, self.batches_executed), 2),
+            "latency": self.latency.snapshot()
         }
     
+    def get_latency_report(self, by_tag: bool = False, reset: bool = False) -> Dict[str, Any]:
+        """Latency percentiles per stage (optionally per strategy/symbol), optionally starting a new interval"""
+        report = self.latency.snapshot(by_tag)
+        if reset:
+            self.latency.reset()
+        return report
+    
     async def start_hft_engine(self, exchange_interface) -> None:
         """Start the HFT engine with all components"""
         logger.info("Starting HFT engine...")
@@ -461,6 +990,12 @@ class HighFrequencyTradingEngine:
             if stats["average_latency_us"] > self.max_execution_latency_us:
                 logger.warning(f"High average latency: {stats['average_latency_us']:.0f}μs")
             
+            for stage, summary in stats["latency"].items():
+                logger.info(f"HFT {stage} latency: p50={summary['p50_us']}μs "
+                            f"p99={summary['p99_us']}μs p999={summary['p999_us']}μs max={summary['max_us']}μs")
+                if summary["p99_us"] is not None and summary["p99_us"] > self.max_execution_latency_us:
+                    logger.warning(f"High p99 {stage} latency: {summary['p99_us']}μs")
+            
             if stats["success_rate"] < 0.95:
                 logger.warning(f"Low success rate: {stats['success_rate']:.2%}")
 
@@ -0,0 +1,365 @@
+"""
+Test Suite for the High-Frequency Trading Engine
+Covers latency histograms, vectorised strategy evaluation, symbol
+subscriptions and micro-batched signal execution against the
+distributed exchange
+"""
+
+import asyncio
+import copy
+import math
+import os
+import random
+import sys
+import time
+import unittest
+import uuid
+from decimal import Decimal
+
+# The engine and the exchange are imported the way main.py does
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hft_engine import (
+    HighFrequencyTradingEngine, MarketMakingStrategy, MomentumStrategy, ArbitrageStrategy,
+    MarketMicrostructure, TradingSignal, SignalType, HFTStrategy, LatencyHistogram, LatencyRecorder
+)
+from exchange.core_exchange import (
+    DistributedExchange, TradingPair, MarketType, Order, OrderSide, OrderType
+)
+
+def make_exchange() -> DistributedExchange:
+    exchange = DistributedExchange(trade_tape_capacity=1024)
+    exchange.add_trading_pair(
+        TradingPair("BTC", "USD", MarketType.SPOT, Decimal('0.0001'), Decimal('100'), 2, 8)
+    )
+    for agent in ("mm_1", "counterparty"):
+        exchange.ledger.deposit(agent, "BTC", Decimal('100'))
+        exchange.ledger.deposit(agent, "USD", Decimal('1000000'))
+    return exchange
+
+def make_signal(signal_type: SignalType, price: Decimal, quantity: Decimal,
+                agent_id: str = "mm_1") -> TradingSignal:
+    return TradingSignal(
+        strategy=HFTStrategy.MARKET_MAKING,
+        signal_type=signal_type,
+        symbol="BTC/USD",
+        price=price,
+        quantity=quantity,
+        confidence=1.0,
+        urgency=5,
+        metadata={"agent_id": agent_id}
+    )
+
+async def rest_order(exchange: DistributedExchange, side: OrderSide,
+                     price: Decimal, quantity: Decimal) -> None:
+    result = await exchange.place_order(Order(
+        id=str(uuid.uuid4()),
+        agent_id="counterparty",
+        trading_pair=exchange.trading_pairs["BTC/USD"],
+        side=side,
+        order_type=OrderType.LIMIT,
+        quantity=quantity,
+        price=price
+    ))
+    assert result["valid"], result
+
+async def drain(engine: HighFrequencyTradingEngine, exchange: DistributedExchange) -> None:
+    """Run the execution loop until the queue is empty and the batch has settled"""
+    task = asyncio.create_task(engine.execute_signals(exchange))
+    try:
+        while not engine.execution_queue.empty():
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+
+def make_tick(rng: random.Random, symbol: str, mid: float) -> MarketMicrostructure:
+    """Random top of book, from one-cent spreads to spreads wide enough to quote inside"""
+    half_spread = mid * rng.choice((0.00005, 0.0002, 0.001))
+    bid = Decimal(str(round(mid - half_spread, 2)))
+    ask = Decimal(str(round(mid + half_spread, 2)))
+    last = Decimal('0') if rng.random() < 0.02 else Decimal(str(round(mid, 2)))
+    return MarketMicrostructure(
+        symbol=symbol, bid_price=bid, ask_price=ask, bid_size=Decimal('5'), ask_size=Decimal('5'),
+        last_price=last, volume=Decimal(rng.choice((1, 1, 2, 40))), timestamp=time.time(),
+        order_book_imbalance=0.0, price_impact=0.0, effective_spread=ask - bid
+    )
+
+def make_strategies(rng: random.Random) -> list:
+    """Agents of every synchronous strategy type with varied parameters and state"""
+    strategies = []
+    for i in range(30):
+        maker = MarketMakingStrategy(f"mm_{i}")
+        maker.target_spread_bps = rng.choice((1, 2, 5, 20))
+        maker.skew_factor = rng.choice((0.0, 0.001, 0.1))
+        maker.position = Decimal(rng.choice((-600, -500, -3, 0, 4, 500, 700)))
+        strategies.append(maker)
+        
+        momentum = MomentumStrategy(f"mom_{i}")
+        momentum.momentum_threshold = rng.choice((0.0005, 0.002, 0.01))
+        for _ in range(rng.randint(0, 12)):
+            momentum.price_history.append(rng.uniform(95, 105))
+            momentum.volume_history.append(float(rng.randint(1, 3)))
+        strategies.append(momentum)
+        
+        arbitrage = ArbitrageStrategy(f"arb_{i}")
+        arbitrage.min_profit_bps = rng.choice((5, 10, 29, 40))
+        if i % 4 == 0:
+            arbitrage.exchange_prices["exchange_d"] = Decimal('90')
+        strategies.append(arbitrage)
+    return strategies
+
+def signal_fields(signal):
+    """Everything a signal carries except its creation time"""
+    if signal is None:
+        return None
+    return (signal.strategy, signal.signal_type, signal.symbol, signal.price, signal.quantity,
+            signal.confidence, signal.urgency, signal.metadata)
+
+def exact_percentile(values: list, percentile: float) -> int:
+    """Nearest-rank percentile over the raw samples"""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * percentile / 100)) - 1]
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Log-bucketed percentiles stay within the bucket resolution of the exact values"""
+    
+    def test_percentiles_within_relative_error(self):
+        rng = random.Random(5)
+        samples = [int(rng.lognormvariate(4, 1.5)) for _ in range(20000)] + [3, 0, 2_500_000]
+        histogram = LatencyHistogram()
+        for value in samples:
+            histogram.record(value)
+        
+        for percentile in (1, 10, 50, 90, 99, 99.9, 100):
+            exact = exact_percentile(samples, percentile)
+            reported = histogram.percentile(percentile)
+            self.assertGreaterEqual(reported, exact)
+            self.assertLessEqual(reported, exact * (1 + 1 / LatencyHistogram.SUB_BUCKETS))
+        
+        self.assertEqual((histogram.count, histogram.min, histogram.max), (len(samples), 0, 2_500_000))
+        self.assertEqual(histogram.summary()["mean_us"], round(sum(samples) / len(samples), 2))
+    
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 2 * LatencyHistogram.SUB_BUCKETS + 1):
+            histogram.record(value + 0.7)
+        
+        self.assertEqual(histogram.percentile(50), LatencyHistogram.SUB_BUCKETS)
+        self.assertEqual(histogram.percentile(100), 2 * LatencyHistogram.SUB_BUCKETS)
+    
+    def test_merge_matches_recording_everything(self):
+        rng = random.Random(8)
+        first, second, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(5000):
+            value = rng.randint(0, 10 ** rng.randint(1, 6))
+            (first if i % 3 else second).record(value)
+            combined.record(value)
+        
+        first.merge(second)
+        
+        self.assertEqual(first.summary(), combined.summary())
+        first.reset()
+        self.assertEqual(first.count, 0)
+        self.assertIsNone(first.percentile(50))
+    
+    def test_recorder_snapshot_by_stage_and_tag(self):
+        recorder = LatencyRecorder()
+        for value in (10, 20, 30):
+            recorder.record("execution", value, "market_making", "BTC/USD")
+        recorder.record("execution", 500, "momentum", "ETH/USD")
+        recorder.record("validation", 4)
+        
+        snapshot = recorder.snapshot()
+        self.assertEqual(sorted(snapshot), ["execution", "validation"])
+        self.assertEqual(snapshot["execution"]["count"], 4)
+        self.assertEqual(snapshot["execution"]["max_us"], 500)
+        
+        tagged = recorder.snapshot(by_tag=True)
+        self.assertEqual(sorted(tagged["execution"]), ["market_making|BTC/USD", "momentum|ETH/USD"])
+        self.assertEqual(tagged["execution"]["market_making|BTC/USD"]["p50_us"], 20)
+        self.assertEqual(recorder.merged("execution", symbol="ETH/USD").count, 1)
+        
+        other = LatencyRecorder()
+        other.record("validation", 6)
+        recorder.merge(other)
+        self.assertEqual(recorder.merged("validation").count, 2)
+
+class TestVectorisedEvaluation(unittest.TestCase):
+    """evaluate_batch returns what evaluate returns for every agent"""
+    
+    def test_evaluate_batch_matches_evaluate(self):
+        rng = random.Random(12)
+        batched = make_strategies(rng)
+        single = copy.deepcopy(batched)
+        mid = 100.0
+        fired = set()
+        
+        for _ in range(300):
+            mid *= 1 + rng.gauss(0, 0.003)
+            tick = make_tick(rng, "BTC/USD", mid)
+            for strategy_class in (MarketMakingStrategy, MomentumStrategy, ArbitrageStrategy):
+                group = [s for s in batched if type(s) is strategy_class]
+                twins = [s for s in single if type(s) is strategy_class]
+                try:
+                    results = strategy_class.evaluate_batch(group, tick)
+                except ArithmeticError:
+                    # A zero last price has no venue spread on either path
+                    for twin in twins:
+                        self.assertRaises(ArithmeticError, twin.evaluate, tick)
+                    continue
+                
+                for result, twin in zip(results, twins):
+                    self.assertEqual(signal_fields(result), signal_fields(twin.evaluate(tick)))
+                    if result is not None:
+                        fired.add(strategy_class)
+        
+        self.assertEqual(len(fired), 3)
+        for strategy, twin in zip(batched, single):
+            self.assertEqual(getattr(strategy, "price_history", None), getattr(twin, "price_history", None))
+            self.assertEqual(getattr(strategy, "exchange_prices", None), getattr(twin, "exchange_prices", None))
+    
+    def test_vectorised_engine_queues_the_same_signals(self):
+        rng = random.Random(21)
+        strategies = make_strategies(rng)
+        engines = []
+        for vectorized in (True, False):
+            engine = HighFrequencyTradingEngine(vectorized=vectorized)
+            for i, strategy in enumerate(copy.deepcopy(strategies)):
+                engine.register_strategy(strategy, ["BTC/USD"] if i % 3 == 0 else None)
+            engines.append(engine)
+        
+        async def scenario():
+            mids = {"BTC/USD": 100.0, "ETH/USD": 50.0}
+            queued = [[], []]
+            for _ in range(150):
+                symbol = rng.choice(list(mids))
+                mids[symbol] *= 1 + rng.gauss(0, 0.003)
+                tick = make_tick(rng, symbol, mids[symbol])
+                for engine, signals in zip(engines, queued):
+                    await engine.process_market_data(tick)
+                    while not engine.execution_queue.empty():
+                        signals.append(signal_fields(engine.execution_queue.get_nowait()[1]))
+            return queued
+        
+        vectorised, per_agent = asyncio.run(scenario())
+        
+        self.assertGreater(len(vectorised), 50)
+        self.assertEqual(vectorised, per_agent)
+        self.assertEqual(engines[0].signals_generated, engines[1].signals_generated)
+
+class TestSymbolSubscriptions(unittest.TestCase):
+    """Strategies only see market data for the symbols they subscribe to"""
+    
+    def test_dispatch_follows_subscriptions(self):
+        engine = HighFrequencyTradingEngine()
+        eth_only = MomentumStrategy("mom_eth")
+        everything = MomentumStrategy("mom_all")
+        engine.register_strategy(eth_only, ["ETH/USD"])
+        engine.register_strategy(everything)
+        rng = random.Random(2)
+        
+        async def feed(symbol, count):
+            for _ in range(count):
+                await engine.process_market_data(make_tick(rng, symbol, 100.0))
+        
+        asyncio.run(feed("BTC/USD", 3))
+        self.assertEqual((len(eth_only.price_history), len(everything.price_history)), (0, 3))
+        
+        asyncio.run(feed("ETH/USD", 2))
+        self.assertEqual((len(eth_only.price_history), len(everything.price_history)), (2, 5))
+        
+        engine.subscribe("mom_eth", ["BTC/USD"])
+        asyncio.run(feed("BTC/USD", 1))
+        self.assertEqual(len(eth_only.price_history), 3)
+        
+        with self.assertRaises(KeyError):
+            engine.subscribe("unknown", None)
+    
+    def test_inactive_strategies_are_skipped(self):
+        engine = HighFrequencyTradingEngine(vectorized=True)
+        momentum = MomentumStrategy("mom_1")
+        momentum.is_active = False
+        engine.register_strategy(momentum)
+        
+        asyncio.run(engine.process_market_data(make_tick(random.Random(1), "BTC/USD", 100.0)))
+        
+        self.assertEqual(len(momentum.price_history), 0)
+
+class TestSignalExecution(unittest.TestCase):
+    """Signals queued by the engine reach the exchange and fill"""
+    
+    def setUp(self):
+        self.exchange = make_exchange()
+        self.engine = HighFrequencyTradingEngine()
+        self.strategy = MarketMakingStrategy("mm_1")
+        self.engine.register_strategy(self.strategy)
+    
+    def test_execute_signals_fills_against_exchange(self):
+        async def scenario():
+            await rest_order(self.exchange, OrderSide.SELL, Decimal('100'), Decimal('2'))
+            await rest_order(self.exchange, OrderSide.BUY, Decimal('90'), Decimal('1'))
+            
+            await self.engine._validate_and_queue_signal(make_signal(SignalType.BUY, Decimal('100'), Decimal('2')))
+            await self.engine._validate_and_queue_signal(make_signal(SignalType.SELL, Decimal('90'), Decimal('1')))
+            await drain(self.engine, self.exchange)
+        
+        asyncio.run(scenario())
+        
+        self.assertEqual(self.engine.orders_submitted, 2)
+        self.assertEqual(self.engine.orders_executed, 2)
+        self.assertEqual(self.exchange.total_trades, 2)
+        # Bought 2 and sold 1
+        self.assertEqual(self.strategy.position, Decimal('1'))
+        self.assertEqual(self.exchange.ledger.get_balance("mm_1", "BTC"), Decimal('101'))
+        
+        report = self.engine.get_latency_report(reset=True)
+        self.assertEqual(report["execution"]["count"], 2)
+        self.assertEqual(report["queueing"]["count"], 2)
+        self.assertEqual(self.engine.get_latency_report(), {})
+    
+    def test_resting_orders_are_not_counted_as_executed(self):
+        async def scenario():
+            await self.engine._validate_and_queue_signal(make_signal(SignalType.BUY, Decimal('95'), Decimal('1')))
+            await self.engine._validate_and_queue_signal(make_signal(SignalType.BUY, Decimal('94'), Decimal('1'), "unknown_agent"))
+            await drain(self.engine, self.exchange)
+        
+        asyncio.run(scenario())
+        
+        self.assertEqual(self.engine.orders_submitted, 2)
+        self.assertEqual(self.engine.orders_executed, 0)
+        self.assertEqual(self.strategy.position, Decimal('0'))
+        self.assertEqual(len(self.exchange.orders), 1)
+    
+    def test_batches_are_capped_and_match_per_order_placement(self):
+        class SingleOrderExchange:
+            """Exchange interface without place_orders, so each signal is placed on its own"""
+            def __init__(self, exchange):
+                self.trading_pairs = exchange.trading_pairs
+                self.place_order = exchange.place_order
+        
+        outcomes = []
+        for batched in (True, False):
+            exchange = make_exchange()
+            engine = HighFrequencyTradingEngine(max_batch_size=2)
+            strategy = MarketMakingStrategy("mm_1")
+            engine.register_strategy(strategy)
+            
+            async def scenario():
+                await rest_order(exchange, OrderSide.SELL, Decimal('100'), Decimal('3'))
+                for price in ('100', '99', '100', '101', '100'):
+                    await engine._validate_and_queue_signal(make_signal(SignalType.BUY, Decimal(price), Decimal('1')))
+                await drain(engine, exchange if batched else SingleOrderExchange(exchange))
+            
+            asyncio.run(scenario())
+            outcomes.append((engine.orders_submitted, engine.orders_executed, strategy.position,
+                             exchange.ledger.get_balance("mm_1", "BTC")))
+            if batched:
+                self.assertEqual(engine.batches_executed, 3)
+        
+        self.assertEqual(outcomes[0], (5, 3, Decimal('3'), Decimal('103')))
+        self.assertEqual(outcomes[0], outcomes[1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -69,9 +69,20 @@ class BaseVisualizationComponent(ABC):
         """Render component data for frontend"""
         pass
     
+    def render_delta(self) -> Dict[str, Any]:
+        """
+        Render what changed since the previous call (consumes pending changes)
+        Components with large state override this; the default is a full render
+        """
+        return self.render()
+    
     def add_update_callback(self, callback) -> None:
-        """Add callback for data updates"""
+        """Add callback for data updates (called with the component)"""
         self.update_callbacks.append(callback)
+    
+    async def _notify(self) -> None:
+        for callback in self.update_callbacks:
+            await callback(self)
 
 class PriceChartComponent(BaseVisualizationComponent):
     """Real-time price chart visualization"""
@@ -82,6 +93,7 @@ class PriceChartComponent(BaseVisualizationComponent):
         self.timeframe = timeframe
         self.ohlcv_data = deque(maxlen=500)  # OHLCV candlestick data
         self.current_candle = None
+        self._closed_candles: List[Dict[str, Any]] = []  # Closed since the last delta
         
     async def update(self, market_data: MarketDataPoint) -> None:
         """Update price chart with new market data"""
@@ -95,6 +107,7 @@ class PriceChartComponent(BaseVisualizationComponent):
             # Start new candle
             if self.current_candle is not None:
                 self.ohlcv_data.append(self.current_candle)
+                self._closed_candles.append(self.current_candle)
             
             self.current_candle = {
                 'timestamp': candle_time,
@@ -112,8 +125,7 @@ class PriceChartComponent(BaseVisualizationComponent):
             self.current_candle['volume'] += market_data.volume
         
         # Notify callbacks
-        for callback in self.update_callbacks:
-            await callback(self.render())
+        await self._notify()
     
     def _get_candle_time(self, timestamp: float) -> float:
         """Get candle start time based on timeframe"""
@@ -139,6 +151,22 @@ class PriceChartComponent(BaseVisualizationComponent):
             'data': candles,
             'last_update': time.time()
         }
+    
+    def render_delta(self) -> Dict[str, Any]:
+        """Candles closed since the last delta plus the current candle"""
+        closed = self._closed_candles[-self.ohlcv_data.maxlen:]
+        self._closed_candles = []
+        
+        return {
+            'component_type': 'price_chart',
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'delta': True,
+            'closed': closed,
+            'current': dict(self.current_candle) if self.current_candle else None,
+            'max_candles': self.ohlcv_data.maxlen,
+            'last_update': time.time()
+        }
 
 class OrderBookComponent(BaseVisualizationComponent):
     """Order book depth visualization"""
@@ -149,6 +177,10 @@ class OrderBookComponent(BaseVisualizationComponent):
         self.depth = depth
         self.current_snapshot = None
         
+        # Levels as of the last delta (price -> volume)
+        self._sent_bids: Dict[float, float] = {}
+        self._sent_asks: Dict[float, float] = {}
+        
     async def update(self, order_book: OrderBookSnapshot) -> None:
         """Update order book visualization"""
         if order_book.symbol != self.symbol:
@@ -157,8 +189,7 @@ class OrderBookComponent(BaseVisualizationComponent):
         self.current_snapshot = order_book
         
         # Notify callbacks
-        for callback in self.update_callbacks:
-            await callback(self.render())
+        await self._notify()
     
     def render(self) -> Dict[str, Any]:
         """Render order book data"""
@@ -170,8 +201,7 @@ class OrderBookComponent(BaseVisualizationComponent):
             }
         
         # Process order book for visualization
-        bids = sorted(self.current_snapshot.bids, key=lambda x: x[0], reverse=True)[:self.depth]
-        asks = sorted(self.current_snapshot.asks, key=lambda x: x[0])[:self.depth]
+        bids, asks = self._top_levels()
         
         # Calculate cumulative volumes
         bid_cumulative = []
@@ -197,6 +227,40 @@ class OrderBookComponent(BaseVisualizationComponent):
             'mid_price': self.current_snapshot.mid_price,
             'last_update': time.time()
         }
+    
+    def _top_levels(self) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
+        bids = sorted(self.current_snapshot.bids, key=lambda x: x[0], reverse=True)[:self.depth]
+        asks = sorted(self.current_snapshot.asks, key=lambda x: x[0])[:self.depth]
+        return bids, asks
+    
+    @staticmethod
+    def _diff_levels(levels: List[Tuple[float, float]], sent: Dict[float, float]) -> List[Dict[str, float]]:
+        """Changed levels since the last delta; removed levels carry volume 0"""
+        current = dict(levels)
+        changes = [{'price': price, 'volume': volume} for price, volume in levels if sent.get(price) != volume]
+        changes.extend({'price': price, 'volume': 0} for price in sent if price not in current)
+        
+        sent.clear()
+        sent.update(current)
+        return changes
+    
+    def render_delta(self) -> Dict[str, Any]:
+        """Changed book levels since the last delta"""
+        if not self.current_snapshot:
+            return self.render()
+        
+        bids, asks = self._top_levels()
+        return {
+            'component_type': 'orderbook',
+            'symbol': self.symbol,
+            'delta': True,
+            'timestamp': self.current_snapshot.timestamp,
+            'bids': self._diff_levels(bids, self._sent_bids),
+            'asks': self._diff_levels(asks, self._sent_asks),
+            'spread': self.current_snapshot.spread,
+            'mid_price': self.current_snapshot.mid_price,
+            'last_update': time.time()
+        }
 
 class TradingMetricsComponent(BaseVisualizationComponent):
     """Trading metrics dashboard"""
@@ -216,8 +280,7 @@ class TradingMetricsComponent(BaseVisualizationComponent):
         self.metrics_history.append(metrics)
         
         # Notify callbacks
-        for callback in self.update_callbacks:
-            await callback(self.render())
+        await self._notify()
     
     def render(self) -> Dict[str, Any]:
         """Render metrics data"""
@@ -274,8 +337,7 @@ class MarketOverviewComponent(BaseVisualizationComponent):
             self.symbol_data[symbol] = data
             
             # Notify callbacks
-            for callback in self.update_callbacks:
-                await callback(self.render())
+            await self._notify()
     
     def render(self) -> Dict[str, Any]:
         """Render market overview"""
@@ -306,6 +368,7 @@ class RealTimeTradesFeed(BaseVisualizationComponent):
         self.symbol = symbol
         self.max_trades = max_trades
         self.trades = deque(maxlen=max_trades)
+        self._new_trades = deque(maxlen=max_trades)  # Appended since the last delta
         
     async def update(self, trade_data: Dict[str, Any]) -> None:
         """Update with new trade"""
@@ -321,10 +384,10 @@ class RealTimeTradesFeed(BaseVisualizationComponent):
         }
         
         self.trades.append(trade)
+        self._new_trades.append(trade)
         
         # Notify callbacks
-        for callback in self.update_callbacks:
-            await callback(self.render())
+        await self._notify()
     
     def render(self) -> Dict[str, Any]:
         """Render trades feed"""
@@ -334,19 +397,44 @@ class RealTimeTradesFeed(BaseVisualizationComponent):
             'trades': list(self.trades),
             'last_update': time.time()
         }
+    
+    def render_delta(self) -> Dict[str, Any]:
+        """Trades appended since the last delta"""
+        new_trades = list(self._new_trades)
+        self._new_trades.clear()
+        
+        return {
+            'component_type': 'trades_feed',
+            'symbol': self.symbol,
+            'delta': True,
+            'trades': new_trades,
+            'max_trades': self.max_trades,
+            'last_update': time.time()
+        }
 
 class MarketVisualizationDashboard:
     """
     Main dashboard coordinating all visualization components
     """
     
-    def __init__(self):
+    def __init__(self, frame_interval: float = 0.1, max_pending_frames: int = 16):
         self.components: Dict[str, BaseVisualizationComponent] = {}
         self.websocket_clients = set()
         self.data_feeds = {}
         
+        # Broadcast pipeline: component updates are coalesced per frame, serialised
+        # once and queued per client; a client whose queue is full gets dropped
+        self.frame_interval = frame_interval
+        self.max_pending_frames = max_pending_frames
+        self._dirty_components: Dict[str, BaseVisualizationComponent] = {}
+        self._frame_task: Optional[asyncio.Task] = None
+        self._client_queues: Dict[Any, asyncio.Queue] = {}
+        self._client_writers: Dict[Any, asyncio.Task] = {}
+        
         # Performance metrics
         self.update_count = 0
+        self.frames_sent = 0
+        self.clients_dropped = 0
         self.start_time = time.time()
         
         logger.info("Market Visualization Dashboard initialized")
@@ -441,47 +529,109 @@ class MarketVisualizationDashboard:
                 if component.symbol == trade_data.get('symbol'):
                     await component.update(trade_data)
     
-    async def _broadcast_update(self, component_data: Dict[str, Any]) -> None:
-        """Broadcast component update to websocket clients"""
+    async def _broadcast_update(self, component: BaseVisualizationComponent) -> None:
+        """Mark a component changed; its update goes out with the next frame"""
+        self._dirty_components[component.component_id] = component
         
-        message = {
-            'type': 'component_update',
-            'data': component_data,
+        if self._frame_task is None:
+            self._frame_task = asyncio.create_task(self._frame_after_interval())
+    
+    async def _frame_after_interval(self) -> None:
+        try:
+            await asyncio.sleep(self.frame_interval)
+        finally:
+            self._frame_task = None
+        self._flush_frame()
+    
+    def _flush_frame(self) -> None:
+        """Serialise every coalesced component delta once and fan it out to all clients"""
+        dirty = self._dirty_components
+        if not dirty:
+            return
+        self._dirty_components = {}
+        
+        # Deltas are consumed even without clients so pending changes don't pile up
+        updates = [
+            {'component_id': component_id, 'data': component.render_delta()}
+            for component_id, component in dirty.items()
+        ]
+        if not self._client_queues:
+            return
+        
+        message_json = json.dumps({
+            'type': 'frame',
+            'updates': updates,
             'timestamp': time.time()
-        }
+        }, default=str)
         
-        # Send to all connected websocket clients
-        if self.websocket_clients:
-            message_json = json.dumps(message, default=str)
-            disconnected_clients = set()
-            
-            for client in self.websocket_clients:
-                try:
-                    await client.send(message_json)
-                except websockets.exceptions.ConnectionClosed:
-                    disconnected_clients.add(client)
-                except Exception as e:
-                    logger.error(f"Error sending to websocket client: {e}")
-                    disconnected_clients.add(client)
-            
-            # Remove disconnected clients
-            self.websocket_clients -= disconnected_clients
+        for client in list(self._client_queues):
+            self._enqueue(client, message_json)
+        self.frames_sent += 1
+    
+    def _enqueue(self, client, message_json: str) -> None:
+        queue = self._client_queues.get(client)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(message_json)
+        except asyncio.QueueFull:
+            logger.warning("Dropping slow websocket client (send queue full)")
+            self._drop_client(client)
+    
+    def _drop_client(self, client) -> None:
+        if self._client_queues.pop(client, None) is None:
+            return
+        self.websocket_clients.discard(client)
+        self.clients_dropped += 1
+        
+        writer = self._client_writers.pop(client, None)
+        if writer is not None:
+            writer.cancel()
+        asyncio.ensure_future(client.close())
+    
+    async def _client_writer(self, client, queue: asyncio.Queue) -> None:
+        """Send queued messages to one client; a slow client only delays itself"""
+        try:
+            while True:
+                message_json = await queue.get()
+                await client.send(message_json)
+        except asyncio.CancelledError:
+            raise
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending to websocket client: {e}")
+        
+        # Sending failed: forget the client without closing twice
+        if self._client_queues.pop(client, None) is not None:
+            self.websocket_clients.discard(client)
+            self._client_writers.pop(client, None)
+    
+    def _register_client(self, client) -> None:
+        # Flush pending changes first so the snapshot below is the base for later deltas
+        self._flush_frame()
+        
+        queue = asyncio.Queue(maxsize=self.max_pending_frames + len(self.components))
+        self._client_queues[client] = queue
+        self.websocket_clients.add(client)
+        
+        # Initial full render of every component
+        for component_id, component in self.components.items():
+            queue.put_nowait(json.dumps({
+                'type': 'component_update',
+                'component_id': component_id,
+                'data': component.render(),
+                'timestamp': time.time()
+            }, default=str))
+        
+        self._client_writers[client] = asyncio.create_task(self._client_writer(client, queue))
     
     async def handle_websocket_connection(self, websocket, path) -> None:
         """Handle new websocket connection"""
-        self.websocket_clients.add(websocket)
+        self._register_client(websocket)
         logger.info(f"New websocket client connected. Total: {len(self.websocket_clients)}")
         
         try:
-            # Send initial data for all components
-            for component in self.components.values():
-                initial_data = {
-                    'type': 'component_update',
-                    'data': component.render(),
-                    'timestamp': time.time()
-                }
-                await websocket.send(json.dumps(initial_data, default=str))
-            
             # Keep connection alive
             await websocket.wait_closed()
             
@@ -489,6 +639,10 @@ class MarketVisualizationDashboard:
             pass
         finally:
             self.websocket_clients.discard(websocket)
+            self._client_queues.pop(websocket, None)
+            writer = self._client_writers.pop(websocket, None)
+            if writer is not None:
+                writer.cancel()
             logger.info(f"Websocket client disconnected. Total: {len(self.websocket_clients)}")
     
     def get_dashboard_data(self, component_id: str = None) -> Dict[str, Any]:
@@ -511,7 +665,9 @@ class MarketVisualizationDashboard:
                 'update_count': self.update_count,
                 'uptime': time.time() - self.start_time,
                 'active_components': len(self.components),
-                'connected_clients': len(self.websocket_clients)
+                'connected_clients': len(self.websocket_clients),
+                'frames_sent': self.frames_sent,
+                'clients_dropped': self.clients_dropped
             }
         }
     
@@ -562,10 +718,11 @@ class MarketVisualizationDashboard:
             <div class="dashboard-container" id="dashboard">
                 <!-- Components will be inserted here -->
             </div>
-
+            
             <script>
                 const ws = new WebSocket('ws://localhost:8765');
                 let updateCount = 0;
+                const componentState = {};
                 
                 ws.onopen = function(event) {
                     document.getElementById('connection-status').textContent = 'Connected';
@@ -580,12 +737,71 @@ class MarketVisualizationDashboard:
                 ws.onmessage = function(event) {
                     const message = JSON.parse(event.data);
                     if (message.type === 'component_update') {
-                        updateComponent(message.data);
-                        updateCount++;
-                        document.getElementById('update-count').textContent = updateCount;
+                        applyUpdate(message.component_id, message.data);
+                    } else if (message.type === 'frame') {
+                        message.updates.forEach(update => applyUpdate(update.component_id, update.data));
                     }
                 };
                 
+                function applyUpdate(componentId, data) {
+                    if (data.delta) {
+                        const state = componentState[componentId];
+                        if (!state) return;
+                        mergeDelta(state, data);
+                    } else {
+                        componentState[componentId] = data;
+                    }
+                    
+                    updateComponent(componentState[componentId]);
+                    updateCount++;
+                    document.getElementById('update-count').textContent = updateCount;
+                }
+                
+                function mergeDelta(state, delta) {
+                    if (delta.component_type === 'price_chart') {
+                        const candles = state.data || (state.data = []);
+                        delta.closed.concat(delta.current ? [delta.current] : []).forEach(candle => {
+                            const last = candles[candles.length - 1];
+                            if (last && last.timestamp === candle.timestamp) {
+                                candles[candles.length - 1] = candle;
+                            } else {
+                                candles.push(candle);
+                            }
+                        });
+                        if (candles.length > delta.max_candles + 1) {
+                            candles.splice(0, candles.length - delta.max_candles - 1);
+                        }
+                    } else if (delta.component_type === 'orderbook') {
+                        state.bids = mergeLevels(state.bids || [], delta.bids, true);
+                        state.asks = mergeLevels(state.asks || [], delta.asks, false);
+                        state.spread = delta.spread;
+                        state.mid_price = delta.mid_price;
+                        state.timestamp = delta.timestamp;
+                    } else if (delta.component_type === 'trades_feed') {
+                        const trades = (state.trades || []).concat(delta.trades);
+                        state.trades = trades.slice(-delta.max_trades);
+                    }
+                    state.last_update = delta.last_update;
+                }
+                
+                function mergeLevels(levels, changes, descending) {
+                    const book = new Map(levels.map(level => [level.price, level.volume]));
+                    changes.forEach(change => {
+                        if (change.volume === 0) {
+                            book.delete(change.price);
+                        } else {
+                            book.set(change.price, change.volume);
+                        }
+                    });
+                    
+                    const prices = Array.from(book.keys()).sort((a, b) => descending ? b - a : a - b);
+                    let cumulative = 0;
+                    return prices.map(price => {
+                        cumulative += book.get(price);
+                        return {price: price, volume: book.get(price), cumulative: cumulative};
+                    });
+                }
+                
                 function updateComponent(data) {
                     const dashboard = document.getElementById('dashboard');
                     let componentDiv = document.getElementById(data.component_type + '_' + (data.symbol || 'general'));
@@ -0,0 +1,196 @@
+"""
+Test Suite for the Real-time Market Visualization Dashboard
+Covers delta frames, update coalescing and per-client backpressure
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from market_dashboard import (
+    MarketVisualizationDashboard, MarketDataPoint, OrderBookSnapshot, TradingMetrics
+)
+
+class FakeClient:
+    """Websocket stand-in that records messages, or blocks on send when slow"""
+    
+    def __init__(self, slow: bool = False):
+        self.slow = slow
+        self.messages = []
+        self.closed = False
+    
+    async def send(self, message_json: str) -> None:
+        if self.slow:
+            await asyncio.Event().wait()
+        self.messages.append(json.loads(message_json))
+    
+    async def close(self) -> None:
+        self.closed = True
+
+def merge_levels(levels: list, changes: list, descending: bool) -> list:
+    book = {level['price']: level['volume'] for level in levels}
+    for change in changes:
+        if change['volume'] == 0:
+            book.pop(change['price'], None)
+        else:
+            book[change['price']] = change['volume']
+    
+    cumulative = 0
+    merged = []
+    for price in sorted(book, reverse=descending):
+        cumulative += book[price]
+        merged.append({'price': price, 'volume': book[price], 'cumulative': cumulative})
+    return merged
+
+def merge_delta(state: dict, delta: dict) -> None:
+    """The browser's mergeDelta, applied to a component's last full render"""
+    if delta['component_type'] == 'price_chart':
+        candles = state.setdefault('data', [])
+        for candle in delta['closed'] + ([delta['current']] if delta['current'] else []):
+            if candles and candles[-1]['timestamp'] == candle['timestamp']:
+                candles[-1] = candle
+            else:
+                candles.append(candle)
+        del candles[:max(0, len(candles) - delta['max_candles'] - 1)]
+    elif delta['component_type'] == 'orderbook':
+        state['bids'] = merge_levels(state.get('bids', []), delta['bids'], True)
+        state['asks'] = merge_levels(state.get('asks', []), delta['asks'], False)
+        for key in ('spread', 'mid_price', 'timestamp'):
+            state[key] = delta[key]
+    elif delta['component_type'] == 'trades_feed':
+        state['trades'] = (state.get('trades', []) + delta['trades'])[-delta['max_trades']:]
+    state['last_update'] = delta['last_update']
+
+def client_view(client: FakeClient) -> dict:
+    """Component states a client rebuilds from its full renders and delta frames"""
+    states = {}
+    for message in client.messages:
+        if message['type'] == 'component_update':
+            updates = [message]
+        else:
+            updates = message['updates']
+        for update in updates:
+            if update['data'].get('delta'):
+                merge_delta(states[update['component_id']], update['data'])
+            else:
+                states[update['component_id']] = update['data']
+    return states
+
+def without_update_time(state: dict) -> dict:
+    return {key: value for key, value in state.items() if key not in ('last_update', 'delta')}
+
+def make_book(rng: random.Random, timestamp: float) -> OrderBookSnapshot:
+    bids = [(round(100 - rng.randint(1, 40) * 0.05, 2), float(rng.randint(1, 9))) for _ in range(rng.randint(5, 30))]
+    asks = [(round(100 + rng.randint(1, 40) * 0.05, 2), float(rng.randint(1, 9))) for _ in range(rng.randint(5, 30))]
+    bids, asks = list(dict(bids).items()), list(dict(asks).items())
+    return OrderBookSnapshot(timestamp, "BTC/USD", bids, asks, spread=0.1, mid_price=100.0)
+
+async def drain(dashboard: MarketVisualizationDashboard, *clients: FakeClient) -> None:
+    """Let the given clients' writers send what is queued"""
+    queues = dashboard._client_queues
+    while any(client in queues and not queues[client].empty() for client in clients):
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+class TestDeltaFrames(unittest.TestCase):
+    """Clients applying delta frames end up with the full render"""
+    
+    def test_deltas_rebuild_full_renders(self):
+        rng = random.Random(4)
+        # Frames are flushed by hand
+        dashboard = MarketVisualizationDashboard(frame_interval=3600)
+        dashboard.create_symbol_dashboard("BTC/USD")
+        client = FakeClient()
+        
+        async def scenario():
+            timestamp = 1_700_000_000.0
+            await dashboard.update_order_book(make_book(rng, timestamp))
+            dashboard._register_client(client)
+            
+            for i in range(3000):
+                timestamp += 25
+                kind = rng.random()
+                if kind < 0.4:
+                    await dashboard.update_market_data(MarketDataPoint(timestamp, "BTC/USD", rng.uniform(99, 101), 1.0))
+                elif kind < 0.6:
+                    await dashboard.update_order_book(make_book(rng, timestamp))
+                elif kind < 0.95:
+                    await dashboard.update_trade({'symbol': "BTC/USD", 'timestamp': timestamp, 'price': 100.0,
+                                                  'quantity': 1.0, 'side': 'buy', 'trade_id': f"t{i}"})
+                else:
+                    await dashboard.update_trading_metrics(TradingMetrics(timestamp, "BTC/USD", 1e6, 0.5, 0.02, 30, 2))
+                
+                if rng.random() < 0.1:
+                    dashboard._flush_frame()
+                    await drain(dashboard, client)
+            
+            dashboard._flush_frame()
+            await drain(dashboard, client)
+            dashboard._frame_task.cancel()
+        
+        asyncio.run(scenario())
+        
+        view = client_view(client)
+        self.assertEqual(set(view), set(dashboard.components))
+        for component_id, component in dashboard.components.items():
+            expected = json.loads(json.dumps(component.render(), default=str))
+            self.assertEqual(without_update_time(view[component_id]), without_update_time(expected), component_id)
+        
+        # The chart history was long enough to trim on both sides
+        self.assertEqual(len(view["price_chart_BTC/USD_1m"]["data"]), 501)
+
+class TestBroadcastPipeline(unittest.TestCase):
+    """Updates are coalesced per frame and slow clients are dropped"""
+    
+    def test_updates_coalesce_into_one_frame(self):
+        dashboard = MarketVisualizationDashboard(frame_interval=0.01)
+        dashboard.create_symbol_dashboard("BTC/USD")
+        client = FakeClient()
+        
+        async def scenario():
+            dashboard._register_client(client)
+            for i in range(50):
+                await dashboard.update_trade({'symbol': "BTC/USD", 'price': 100.0, 'quantity': 1.0,
+                                              'side': 'sell', 'trade_id': f"t{i}"})
+                await dashboard.update_market_data(MarketDataPoint(1_700_000_000.0 + i, "BTC/USD", 100.0, 1.0))
+            await asyncio.sleep(0.05)
+            await drain(dashboard, client)
+        
+        asyncio.run(scenario())
+        
+        frames = [message for message in client.messages if message['type'] == 'frame']
+        self.assertEqual(len(frames), 1)
+        updates = {update['component_id']: update['data'] for update in frames[0]['updates']}
+        self.assertEqual(sorted(updates), ["price_chart_BTC/USD_1m", "price_chart_BTC/USD_5m", "trades_BTC/USD"])
+        self.assertEqual(len(updates["trades_BTC/USD"]["trades"]), 50)
+        self.assertEqual(dashboard.frames_sent, 1)
+    
+    def test_slow_client_is_dropped_without_stalling_others(self):
+        dashboard = MarketVisualizationDashboard(frame_interval=3600, max_pending_frames=2)
+        dashboard.create_symbol_dashboard("BTC/USD")
+        fast, slow = FakeClient(), FakeClient(slow=True)
+        
+        async def scenario():
+            dashboard._register_client(fast)
+            dashboard._register_client(slow)
+            for i in range(10):
+                await dashboard.update_trade({'symbol': "BTC/USD", 'price': 100.0, 'quantity': 1.0,
+                                              'side': 'buy', 'trade_id': f"t{i}"})
+                dashboard._flush_frame()
+                await drain(dashboard, fast)
+            dashboard._frame_task.cancel()
+        
+        asyncio.run(scenario())
+        
+        self.assertEqual(len([message for message in fast.messages if message['type'] == 'frame']), 10)
+        self.assertEqual(dashboard.clients_dropped, 1)
+        self.assertTrue(slow.closed)
+        self.assertEqual(dashboard.websocket_clients, {fast})
+
+if __name__ == "__main__":
+    unittest.main()